@@ -0,0 +1,63 @@
+"""
+比较两次基准测试结果
+
+    python -m benchmarks.compare \
+        benchmarks/results/base.json benchmarks/results/head.json
+"""
+
+import argparse
+import json
+import sys
+
+
+def _metrics(result: dict) -> dict[str, float]:
+    """
+    提取用于比较的指标，值越小越好的以_ms/_mb结尾，其余为吞吐量
+    """
+    metrics = {
+        "compile_p50_ms": result["compile"]["cold"]["p50_ms"],
+        "conversation_p50_ms": result["latency"]["conversation"]["p50_ms"],
+        "conversation_p95_ms": result["latency"]["conversation"]["p95_ms"],
+    }
+    for item in result["throughput"]:
+        metrics[f"turns_per_s@{item['concurrency']}"] = item["turns_per_s"]
+    if "memory" in result:
+        metrics["peak_mb"] = result["memory"]["traced_peak_mb"]
+    return metrics
+
+
+def compare(base: dict, head: dict) -> list[str]:
+    lines = [
+        f"base {base['meta'].get('revision')}  head {head['meta'].get('revision')}",
+        f"{'scenario':<24}{'metric':<24}{'base':>12}{'head':>12}{'change':>10}",
+    ]
+    for name, head_result in head["scenarios"].items():
+        base_result = base["scenarios"].get(name)
+        if base_result is None or "error" in base_result or "error" in head_result:
+            continue
+        base_metrics = _metrics(base_result)
+        for metric, value in _metrics(head_result).items():
+            if metric not in base_metrics or not base_metrics[metric]:
+                continue
+            change = (value - base_metrics[metric]) / base_metrics[metric] * 100
+            lines.append(
+                f"{name:<24}{metric:<24}{base_metrics[metric]:>12.2f}"
+                f"{value:>12.2f}{change:>+9.1f}%"
+            )
+    return lines
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="比较两次基准测试结果")
+    parser.add_argument("base")
+    parser.add_argument("head")
+    args = parser.parse_args(argv)
+    with open(args.base, encoding="utf-8") as f:
+        base = json.load(f)
+    with open(args.head, encoding="utf-8") as f:
+        head = json.load(f)
+    sys.stdout.write("\n".join(compare(base, head)) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+import asyncio
+import itertools
+from typing import Any, Iterator, Optional, Sequence
+
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForLLMRun,
+    CallbackManagerForLLMRun,
+)
+from langchain_core.documents import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import (
+    AIMessage,
+    AIMessageChunk,
+    BaseMessage,
+    HumanMessage,
+)
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.runnables import RunnableLambda
+from langchain_core.tools import StructuredTool
+from langchain_core.vectorstores import InMemoryVectorStore
+from pydantic import Field, PrivateAttr
+
+__all__ = [
+    "FakeChatModel",
+    "fake_embedding",
+    "fake_mcp_tools",
+    "fake_vectorstore",
+]
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    离线基准测试用的确定性模型
+    - 按顺序循环返回responses，可通过latency模拟网络耗时
+    - 绑定工具后，最后一条消息为用户消息时先调用第一个工具
+    - 结构化输出(Supervisor路由)时，用户消息后选择第一个选项，否则FINISH
+    """
+
+    responses: list[str] = Field(
+        default_factory=lambda: ["这是一段用于基准测试的回复。"]
+    )
+    latency: float = 0.0
+    tools: list[str] = Field(default_factory=list)
+    route: Optional[str] = None
+    _counter: Any = PrivateAttr(default_factory=itertools.count)
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat-model"
+
+    def _reply(self, messages: list[BaseMessage]) -> AIMessage:
+        n = next(self._counter)
+        usage = {
+            "input_tokens": sum(len(str(m.content)) for m in messages),
+            "output_tokens": 0,
+            "total_tokens": 0,
+        }
+        if self.tools and messages and isinstance(messages[-1], HumanMessage):
+            tool_calls = [{"name": self.tools[0], "args": {}, "id": f"call_{n}"}]
+            return AIMessage(content="", tool_calls=tool_calls, usage_metadata=usage)
+        content = self.responses[n % len(self.responses)]
+        usage["output_tokens"] = len(content)
+        usage["total_tokens"] = usage["input_tokens"] + usage["output_tokens"]
+        return AIMessage(content=content, usage_metadata=usage)
+
+    def _generate(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        return ChatResult(generations=[ChatGeneration(message=self._reply(messages))])
+
+    async def _agenerate(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self._generate(messages, stop, **kwargs)
+
+    def _stream(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        message = self._reply(messages)
+        if message.tool_calls:
+            yield ChatGenerationChunk(
+                message=AIMessageChunk(
+                    content="",
+                    tool_call_chunks=[
+                        {"name": c["name"], "args": "{}", "id": c["id"], "index": 0}
+                        for c in message.tool_calls
+                    ],
+                    usage_metadata=message.usage_metadata,
+                )
+            )
+            return
+        for i, char in enumerate(message.content):
+            yield ChatGenerationChunk(
+                message=AIMessageChunk(
+                    content=char,
+                    usage_metadata=message.usage_metadata if i == 0 else None,
+                )
+            )
+
+    def bind_tools(self, tools: Sequence[Any], **kwargs: Any) -> "FakeChatModel":
+        names = [getattr(tool, "name", None) or tool["name"] for tool in tools]
+        return self.model_copy(update={"tools": names})
+
+    def with_structured_output(self, schema: Any, **kwargs: Any):
+        def route(value: Any):
+            messages = value.to_messages() if hasattr(value, "to_messages") else value
+            # 最后一条为路由提示词，其前一条为用户消息时选择route，否则结束
+            last = messages[-2] if len(messages) > 1 else None
+            choice = self.route if isinstance(last, HumanMessage) else "FINISH"
+            return schema(next=choice)
+
+        return RunnableLambda(route)
+
+
+def fake_embedding(size: int = 256) -> DeterministicFakeEmbedding:
+    return DeterministicFakeEmbedding(size=size)
+
+
+def fake_vectorstore(documents: int = 200) -> InMemoryVectorStore:
+    vs = InMemoryVectorStore(fake_embedding())
+    vs.add_documents(
+        [
+            Document(page_content=f"基准测试文档{i}：关于主题{i % 17}的说明。")
+            for i in range(documents)
+        ]
+    )
+    return vs
+
+
+def fake_mcp_tools() -> dict[str, dict[str, StructuredTool]]:
+    def current_time() -> str:
+        """返回当前时间"""
+        return "2025-01-01 00:00:00"
+
+    def search(query: str = "") -> str:
+        """搜索网页"""
+        return f"关于{query}的搜索结果"
+
+    time_tools = {
+        name: StructuredTool.from_function(current_time, name=name)
+        for name in ("current_time", "get_current_time")
+    }
+    return {
+        "time": time_tools,
+        "tavily_mcp": {
+            "tavily-search": StructuredTool.from_function(search, name="tavily-search")
+        },
+    }
@@ -0,0 +1,70 @@
+"""
+提示词调用链微基准
+
+比较每次调用时构建ChatPromptTemplate与调用链(旧实现)和
+节点初始化时构建一次后复用(当前实现)的单次调用耗时，模型为零耗时的假模型。
+
+    python -m benchmarks.prompt_chain --iterations 2000
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+
+from langchain_core.prompts import ChatPromptTemplate
+
+from .fakes import FakeChatModel
+
+SYSTEM_PROMPT = "你是一名诗人，请根据用户的主题写诗。当前已写: {{poet1}}"
+USER_PROMPT = "主题: {{topic}}，风格: {{style}}"
+ARGS = {"poet1": "床前明月光", "topic": "秋天", "style": "五言绝句"}
+
+
+def build_template() -> ChatPromptTemplate:
+    return ChatPromptTemplate.from_messages(
+        [("system", SYSTEM_PROMPT), ("human", USER_PROMPT)],
+        template_format="mustache",
+    )
+
+
+async def per_call(model: FakeChatModel, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        chain = build_template() | model
+        await chain.ainvoke(ARGS)
+    return time.perf_counter() - start
+
+
+async def prebuilt(model: FakeChatModel, iterations: int) -> float:
+    chain = build_template() | model
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await chain.ainvoke(ARGS)
+    return time.perf_counter() - start
+
+
+async def run(iterations: int):
+    model = FakeChatModel()
+    # 预热
+    await per_call(model, 10)
+    await prebuilt(model, 10)
+    results = {
+        "per_call": await per_call(model, iterations),
+        "prebuilt": await prebuilt(model, iterations),
+    }
+    out = sys.stdout
+    for name, elapsed in results.items():
+        out.write(f"{name:<10} {elapsed / iterations * 1e6:10.1f} us/call\n")
+    out.write(f"speedup    {results['per_call'] / results['prebuilt']:10.2f}x\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="提示词调用链微基准")
+    parser.add_argument("--iterations", type=int, default=2000, help="调用次数")
+    args = parser.parse_args(argv)
+    asyncio.run(run(args.iterations))
+
+
+if __name__ == "__main__":
+    main()
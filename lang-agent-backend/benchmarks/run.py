@@ -0,0 +1,336 @@
+"""
+离线端到端基准测试
+
+使用确定性的假模型、假Embedding、内存向量库与假MCP工具运行examples下的Agent，
+统计编译耗时、每轮会话耗时(含中断与恢复)、不同并发下的吞吐量与内存峰值，
+结果以JSON格式写入文件，便于不同提交之间比较(见benchmarks/compare.py)。
+
+    python -m benchmarks.run --concurrency 1,8,32 --output benchmarks/results/head.json
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from .scenarios import SCENARIOS, Scenario
+
+ROOT = Path(__file__).resolve().parent.parent
+EXAMPLES_DIR = ROOT.parent / "examples"
+
+
+def percentile(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    index = min(len(values) - 1, max(0, round(q / 100 * (len(values) - 1))))
+    return values[index]
+
+
+def summarize(values: list[float]) -> dict:
+    """
+    耗时统计，单位毫秒
+    """
+    if not values:
+        return {"count": 0}
+    return {
+        "count": len(values),
+        "mean_ms": statistics.fmean(values) * 1000,
+        "p50_ms": percentile(values, 50) * 1000,
+        "p95_ms": percentile(values, 95) * 1000,
+        "p99_ms": percentile(values, 99) * 1000,
+        "max_ms": max(values) * 1000,
+    }
+
+
+def load_example(name: str) -> dict:
+    with open(EXAMPLES_DIR / f"{name}.json", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT,
+            stderr=subprocess.DEVNULL,
+            text=True,
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Benchmark:
+    def __init__(self, args: argparse.Namespace):
+        self.args = args
+        self.agents: dict[str, dict] = {}
+        self._chat_seq = 0
+
+    def setup(self):
+        from lang_agent.data_schema.request_params import AgentParams
+        from lang_agent.db import database
+        from lang_agent.setting.manager import resource_manager
+
+        from .fakes import fake_embedding, fake_mcp_tools, fake_vectorstore
+
+        database.setup_database_connection()
+        database.db.get_engine().echo = False
+        ids = set()
+        for path in sorted(EXAMPLES_DIR.glob("*.json")):
+            example = load_example(path.stem)
+            # 部分示例的id相同，导入时改用文件名
+            if example["id"] in ids:
+                example["id"] = path.stem
+            ids.add(example["id"])
+            database.create_agent(AgentParams(**example))
+            self.agents[path.stem] = example
+
+        resource_manager.models["embedding"]["fake_embedding"] = fake_embedding()
+        resource_manager.vectorstore_map["postgres_vs"] = fake_vectorstore()
+        resource_manager.vectorstore_map["milvus_vs"] = fake_vectorstore()
+        resource_manager.mcp_map.update(fake_mcp_tools())
+
+    def use_models(self, scenario: Scenario):
+        from lang_agent.setting.graph_cache import graph_cache, subgraph_cache
+        from lang_agent.setting.manager import resource_manager
+
+        from .fakes import FakeChatModel
+
+        kwargs = {"latency": self.args.llm_latency, "route": "poet1"}
+        if scenario.responses:
+            kwargs["responses"] = scenario.responses
+        for name in ("qwen2.5", "qwen"):
+            resource_manager.models["llm"][name] = FakeChatModel(**kwargs)
+        resource_manager.models["vlm"]["o4-mini"] = FakeChatModel(**kwargs)
+        resource_manager.touch()
+        graph_cache.clear()
+        subgraph_cache.clear()
+
+    def next_chat_id(self, scenario: Scenario) -> str:
+        self._chat_seq += 1
+        return f"bench-{scenario.name}-{self._chat_seq}"
+
+    async def compile_times(self, scenario: Scenario) -> dict:
+        from lang_agent.graph.runner import get_graph_engine
+        from lang_agent.setting.graph_cache import graph_cache, subgraph_cache
+
+        agent = self.agents[scenario.example]
+        cold, warm = [], []
+        for _ in range(self.args.repeat):
+            graph_cache.clear()
+            subgraph_cache.clear()
+            start = time.perf_counter()
+            await get_graph_engine(agent["data"], agent["name"])
+            cold.append(time.perf_counter() - start)
+            start = time.perf_counter()
+            await get_graph_engine(agent["data"], agent["name"])
+            warm.append(time.perf_counter() - start)
+        return {"cold": summarize(cold), "cached": summarize(warm)}
+
+    async def conversation(self, scenario: Scenario, turn_times: list[list[float]]):
+        from lang_agent.graph.runner import compile_engine
+
+        agent = self.agents[scenario.example]
+        chat_id = self.next_chat_id(scenario)
+        for i, state in enumerate(scenario.turns):
+            start = time.perf_counter()
+            engine = await compile_engine(chat_id, agent["data"], agent["name"])
+            result = await engine.ainvoke(dict(state), engine.has_subgraphs)
+            turn_times[i].append(time.perf_counter() - start)
+            if i + 1 < len(scenario.turns) and "__interrupt__" not in result:
+                raise RuntimeError(
+                    f"{scenario.name}: turn {i} finished without interrupt"
+                )
+
+    async def run_conversations(
+        self, scenario: Scenario, total: int, concurrency: int
+    ) -> tuple[float, list[list[float]]]:
+        turn_times: list[list[float]] = [[] for _ in scenario.turns]
+        remaining = iter(range(total))
+
+        async def worker():
+            for _ in remaining:
+                await self.conversation(scenario, turn_times)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return time.perf_counter() - start, turn_times
+
+    async def latency(self, scenario: Scenario) -> dict:
+        await self.run_conversations(scenario, 1, 1)  # 预热
+        _, turn_times = await self.run_conversations(scenario, self.args.repeat, 1)
+        return {
+            "turns": [summarize(times) for times in turn_times],
+            "conversation": summarize([sum(t) for t in zip(*turn_times)]),
+        }
+
+    async def throughput(self, scenario: Scenario) -> list[dict]:
+        results = []
+        for concurrency in self.args.concurrency:
+            total = max(self.args.conversations, concurrency)
+            elapsed, turn_times = await self.run_conversations(
+                scenario, total, concurrency
+            )
+            turns = [t for times in turn_times for t in times]
+            results.append({
+                "concurrency": concurrency,
+                "conversations": total,
+                "elapsed_s": elapsed,
+                "conversations_per_s": total / elapsed,
+                "turns_per_s": len(turns) / elapsed,
+                "turn_latency": summarize(turns),
+            })
+        return results
+
+    async def memory(self, scenario: Scenario) -> dict:
+        concurrency = max(self.args.concurrency)
+        tracemalloc.start()
+        try:
+            await self.run_conversations(
+                scenario, max(self.args.conversations, concurrency), concurrency
+            )
+            current, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        return {
+            "concurrency": concurrency,
+            "traced_current_mb": current / 2**20,
+            "traced_peak_mb": peak / 2**20,
+        }
+
+    async def run_scenario(self, scenario: Scenario) -> dict:
+        self.use_models(scenario)
+        result = {
+            "example": scenario.example,
+            "turns": len(scenario.turns),
+            "compile": await self.compile_times(scenario),
+            "latency": await self.latency(scenario),
+            "throughput": await self.throughput(scenario),
+        }
+        if not self.args.skip_memory:
+            result["memory"] = await self.memory(scenario)
+        return result
+
+    async def run(self, report) -> dict:
+        from lang_agent.db import database  # noqa: F401 先于其它模块导入，避免循环导入
+        from lang_agent.graph.usage import usage_recorder
+        from lang_agent.setting import async_checkpointer_shutdown
+
+        names = self.args.scenarios
+        scenarios = [s for s in SCENARIOS if not names or s.name in names]
+        results = {}
+        try:
+            self.setup()
+            await usage_recorder.start()
+            for scenario in scenarios:
+                try:
+                    results[scenario.name] = await self.run_scenario(scenario)
+                except Exception as e:
+                    results[scenario.name] = {"error": f"{type(e).__name__}: {e}"}
+                report(scenario.name, results[scenario.name])
+        finally:
+            await usage_recorder.stop()
+            await async_checkpointer_shutdown()
+        return results
+
+
+def format_line(name: str, result: dict) -> str:
+    if "error" in result:
+        return f"{name:<24} ERROR {result['error']}"
+    best = max(result["throughput"], key=lambda r: r["turns_per_s"])
+    return (
+        f"{name:<24} compile {result['compile']['cold']['p50_ms']:8.2f}ms"
+        f"  conv p50 {result['latency']['conversation']['p50_ms']:8.2f}ms"
+        f"  best {best['turns_per_s']:8.1f} turns/s @ c={best['concurrency']}"
+        + (
+            f"  peak {result['memory']['traced_peak_mb']:7.1f}MB"
+            if "memory" in result
+            else ""
+        )
+    )
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Lang-Agent离线基准测试")
+    parser.add_argument(
+        "--scenarios",
+        type=lambda s: [x for x in s.split(",") if x],
+        default=[],
+        help="逗号分隔的场景名称，默认全部: "
+        + ",".join(s.name for s in SCENARIOS),
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=lambda s: [int(x) for x in s.split(",")],
+        default=[1, 8, 32],
+        help="逗号分隔的并发数",
+    )
+    parser.add_argument(
+        "--conversations", type=int, default=64, help="每个并发级别运行的会话数"
+    )
+    parser.add_argument("--repeat", type=int, default=10, help="编译与时延的重复次数")
+    parser.add_argument(
+        "--llm-latency", type=float, default=0.0, help="假模型每次调用的模拟耗时(秒)"
+    )
+    parser.add_argument("--skip-memory", action="store_true", help="跳过内存统计")
+    parser.add_argument("--output", type=str, default=None, help="结果JSON文件路径")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.output:
+        args.output = os.path.abspath(args.output)
+    out = sys.stdout
+    with tempfile.TemporaryDirectory(prefix="lang-agent-bench-") as tmp:
+        # 必须在导入lang_agent之前设置，保证数据库与checkpoint写入临时目录
+        os.environ["DB_URL"] = f"sqlite:///{tmp}/main.db"
+        os.environ["CHECKPOINT_PATH"] = f"{tmp}/checkpoint.db"
+        os.environ["RESOURCE_SYNC_INTERVAL"] = "0"
+        os.chdir(ROOT)
+        logging.disable(logging.WARNING)
+
+        def report(name: str, result: dict):
+            out.write(format_line(name, result) + "\n")
+            out.flush()
+
+        # 图编译时会打印ASCII结构，基准测试期间屏蔽标准输出
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            results = asyncio.run(Benchmark(args).run(report))
+
+    document = {
+        "meta": {
+            "revision": git_revision(),
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+            "args": vars(args),
+        },
+        "scenarios": results,
+    }
+    text = json.dumps(document, ensure_ascii=False, indent=2)
+    if args.output:
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.output).write_text(text, encoding="utf-8")
+        out.write(f"results written to {args.output}\n")
+    else:
+        out.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+from dataclasses import dataclass, field
+from typing import Optional
+
+__all__ = ["Scenario", "SCENARIOS"]
+
+
+@dataclass
+class Scenario:
+    """
+    基准测试场景：examples下的Agent及每轮会话的输入
+    第一轮之后的输入会作为中断恢复的内容
+    """
+
+    name: str
+    example: str
+    turns: list[dict] = field(default_factory=lambda: [{}])
+    responses: Optional[list[str]] = None
+
+
+SCENARIOS: list[Scenario] = [
+    Scenario("poet2", "poet2"),
+    Scenario("poet1", "poet1"),
+    Scenario("loop_demo", "loop_demo", turns=[{"loop_count": 0}]),
+    Scenario("transform_demo", "transform_demo", turns=[{"num": 0}], responses=["42"]),
+    Scenario("commenter", "commenter"),
+    Scenario(
+        "loop_chat",
+        "loop_chat",
+        turns=[
+            {},
+            {"messages": "你好"},
+            {"messages": "再说一遍"},
+            {"messages": "谢谢"},
+        ],
+    ),
+    Scenario(
+        "advance",
+        "advance",
+        turns=[{"retrieve_flag": True}, {"messages": "主题5"}],
+    ),
+    Scenario(
+        "vector_retriever_demo",
+        "vector_retriever_demo",
+        turns=[{}, {"messages": "主题3是什么"}],
+    ),
+    Scenario(
+        "react_agent_demo",
+        "react_agent_demo",
+        turns=[{}, {"messages": "现在几点了"}],
+    ),
+    Scenario(
+        "web_search_demo",
+        "web_search_demo",
+        turns=[{}, {"messages": "搜索LangGraph"}, {"messages": "现在几点了"}],
+    ),
+    Scenario(
+        "supervisor_demo",
+        "supervisor_demo",
+        turns=[{}, {"messages": "写一首关于荷花的诗"}],
+    ),
+]
@@ -1,5 +1,7 @@
 from .agent import router as agent_router
+from .job import router as job_router
 from .mcp import router as mcp_router
 from .model import router as model_router
 from .vectorstore import router as vectorstore_router
 from .document import router as document_router
+from .usage import router as usage_router
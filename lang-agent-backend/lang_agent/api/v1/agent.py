@@ -1,9 +1,20 @@
+import asyncio
+import json
+import os
 import traceback
 
 from fastapi import APIRouter, Body, HTTPException, Query
-
-from lang_agent.data_schema.request_params import AgentParams, AgentRunParams
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+
+from lang_agent.data_schema.request_params import (
+    AgentBatchItem,
+    AgentBatchParams,
+    AgentParams,
+    AgentRunParams,
+)
 from lang_agent.data_schema.response_models import (
+    AgentBatchResult,
     AgentResponse,
     ApiResponse,
 )
@@ -17,16 +28,19 @@ from lang_agent.db.database import (
     select_agent,
     update_agent,
 )
-from lang_agent.graph import GraphEngine
+from lang_agent.graph.runner import compile_engine, get_graph_engine, run_config
 from lang_agent.logger import get_logger
+from lang_agent.setting.graph_cache import graph_cache
 from lang_agent.util import (
+    error_to_str,
     obj_to_model,
     objs_to_models
 )
 
 AGENT_NOT_FOUND = "Agent Not Found"
 INVALID_AGENT_DATA = "Invalid Agent Data Format"
-GRAPH_COMPILE_FAILED = "Graph Compile Failed"
+DUPLICATE_CHAT_ID = "Duplicate chat_id In Batch"
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "8"))
 
 router = APIRouter(prefix="/agent", tags=["Agent"])
 logger = get_logger(__name__)
@@ -92,6 +106,14 @@ async def list_reuse():
     )
 
 
+@router.get("/cache_stats", status_code=200)
+async def cache_stats() -> ApiResponse:
+    return ApiResponse(
+        success=True,
+        data=graph_cache.stats()
+    )
+
+
 @router.post("/arun", status_code=200)
 async def arun(
     params: AgentRunParams = Body(...),
@@ -104,6 +126,38 @@ async def arun(
     return await compiled_engine.ainvoke(params.state,compiled_engine.has_subgraphs)
 
 
+@router.post("/astream", status_code=200)
+async def astream(
+    params: AgentRunParams = Body(...),
+) -> StreamingResponse:
+    compiled_engine = await compile_engine(
+        params.chat_id,
+        params.agent_data,
+        params.agent_name
+    )
+
+    async def event_stream():
+        try:
+            async for event, data in compiled_engine.astream(
+                params.state, compiled_engine.has_subgraphs
+            ):
+                yield sse_event(event, data)
+        except Exception as e:
+            logger.error(traceback.format_exc())
+            yield sse_event("error", {"error": error_to_str(e)})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def sse_event(event: str, data) -> str:
+    payload = json.dumps(jsonable_encoder(data), ensure_ascii=False)
+    return f"event: {event}\ndata: {payload}\n\n"
+
+
 @router.post("/arun_by_agent_id", status_code=200)
 async def arun_by_agent_id(
     chat_id: str,
@@ -124,26 +178,61 @@ async def arun_by_agent_id(
     )
 
 
-async def compile_engine(
-        chat_id: str,
-        agent_data: dict,
-        agent_name: str = None
-) -> GraphEngine:
-    from lang_agent.graph.callback import LoggerOutputCallback
-    callbacks = [LoggerOutputCallback()]
-    config = {
-        "configurable": {"thread_id": chat_id},
-        "recursion_limit": 50,
-        "callbacks": callbacks
-    }
-    graph_engine = GraphEngine(
-        agent_data = agent_data,
-        config = config,
-        agent_name = agent_name
+@router.post("/abatch", status_code=200)
+async def abatch(
+    params: AgentBatchParams = Body(...),
+):
+    agent_data, agent_name = params.agent_data, params.agent_name
+    if params.agent_id:
+        agent: Agent = select_agent(params.agent_id)
+        if not agent:
+            logger.error("Agent Not Found")
+            raise HTTPException(status_code=404, detail=AGENT_NOT_FOUND)
+        agent_data, agent_name = agent.data, agent.name
+    if not agent_data:
+        raise HTTPException(status_code=422, detail=INVALID_AGENT_DATA)
+    chat_ids = [item.chat_id for item in params.items]
+    if len(set(chat_ids)) != len(chat_ids):
+        raise HTTPException(status_code=422, detail=DUPLICATE_CHAT_ID)
+    graph_engine = await get_graph_engine(agent_data, agent_name)
+    semaphore = asyncio.Semaphore(params.concurrency or BATCH_CONCURRENCY)
+
+    async def run_item(item: AgentBatchItem) -> AgentBatchResult:
+        async with semaphore:
+            engine = graph_engine.with_config(run_config(item.chat_id, agent_name))
+            try:
+                result = await engine.ainvoke(item.state, engine.has_subgraphs)
+                return AgentBatchResult(
+                    chat_id=item.chat_id,
+                    success=True,
+                    data=jsonable_encoder(result),
+                )
+            except Exception as e:
+                logger.error(
+                    "Batch Item [%s] Failed: \n %s",
+                    item.chat_id,
+                    traceback.format_exc()
+                )
+                return AgentBatchResult(
+                    chat_id=item.chat_id,
+                    success=False,
+                    error=error_to_str(e),
+                )
+
+    if params.stream:
+        async def ndjson_stream():
+            tasks = [asyncio.ensure_future(run_item(item)) for item in params.items]
+            try:
+                for future in asyncio.as_completed(tasks):
+                    result: AgentBatchResult = await future
+                    yield json.dumps(result.model_dump(), ensure_ascii=False) + "\n"
+            finally:
+                for task in tasks:
+                    task.cancel()
+
+        return StreamingResponse(ndjson_stream(), media_type="application/x-ndjson")
+    results = await asyncio.gather(*[run_item(item) for item in params.items])
+    return ApiResponse(
+        success=True,
+        data=results
     )
-    try:
-        await graph_engine.compile()
-    except Exception as e:
-        logger.error(f"{GRAPH_COMPILE_FAILED}: \n %s", traceback.format_exc())
-        raise HTTPException(status_code=500, detail=GRAPH_COMPILE_FAILED) from e
-    return graph_engine
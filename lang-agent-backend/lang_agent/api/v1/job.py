@@ -0,0 +1,60 @@
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query
+
+from lang_agent.data_schema.request_params import JobParams
+from lang_agent.data_schema.response_models import ApiResponse, JobResponse
+from lang_agent.db.database import Agent, Job, list_jobs, select_agent, select_job
+from lang_agent.graph.job import JobQueueFullError, job_manager
+from lang_agent.logger import get_logger
+from lang_agent.util import obj_to_model, objs_to_models
+
+AGENT_NOT_FOUND = "Agent Not Found"
+JOB_NOT_FOUND = "Job Not Found"
+JOB_NOT_CANCELLABLE = "Job Not Cancellable"
+
+router = APIRouter(prefix="/agent/jobs", tags=["Job"])
+logger = get_logger(__name__)
+
+
+@router.post("/submit", status_code=200)
+async def submit(params: JobParams) -> ApiResponse:
+    agent: Agent = select_agent(params.agent_id)
+    if not agent:
+        logger.error("Agent Not Found")
+        raise HTTPException(status_code=404, detail=AGENT_NOT_FOUND)
+    try:
+        job_id = job_manager.submit(params, agent)
+    except JobQueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e)) from e
+    return ApiResponse(success=True, data=job_id)
+
+
+@router.get("/select", status_code=200)
+async def select(id: str = Query(..., description="Job ID")) -> ApiResponse:
+    job: Job = select_job(id)
+    if not job:
+        logger.error("Job Not Found")
+        raise HTTPException(status_code=404, detail=JOB_NOT_FOUND)
+    return ApiResponse(success=True, data=obj_to_model(job, JobResponse))
+
+
+@router.post("/cancel", status_code=200)
+async def cancel(id: str) -> ApiResponse:
+    if not select_job(id):
+        logger.error("Job Not Found")
+        raise HTTPException(status_code=404, detail=JOB_NOT_FOUND)
+    if not job_manager.cancel(id):
+        raise HTTPException(status_code=409, detail=JOB_NOT_CANCELLABLE)
+    return ApiResponse(success=True)
+
+
+@router.get("/list", status_code=200)
+async def jobs(
+    status: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+) -> ApiResponse:
+    return ApiResponse(
+        success=True,
+        data=objs_to_models(list_jobs(status, limit), JobResponse)
+    )
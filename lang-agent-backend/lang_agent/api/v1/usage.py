@@ -0,0 +1,35 @@
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Query
+
+from lang_agent.data_schema.response_models import ApiResponse, UsageResponse
+from lang_agent.db.database import summarize_model_usage
+from lang_agent.graph.usage import usage_recorder
+
+router = APIRouter(prefix="/usage", tags=["Usage"])
+
+
+@router.get("/summary", status_code=200)
+async def summary(
+    start: Optional[datetime] = Query(None, description="开始时间(含)"),
+    end: Optional[datetime] = Query(None, description="结束时间(不含)"),
+    group_by: Optional[str] = Query(
+        None, description="逗号分隔的分组列: agent_name,node,model,thread_id"
+    ),
+    agent_name: Optional[str] = Query(None, description="Agent名称"),
+    thread_id: Optional[str] = Query(None, description="会话ID"),
+) -> ApiResponse:
+    # 先写入内存中尚未入库的用量，保证查询包含最近的调用
+    await usage_recorder.flush()
+    rows = summarize_model_usage(
+        start=start,
+        end=end,
+        group_by=[c for c in (group_by or "").split(",") if c],
+        agent_name=agent_name,
+        thread_id=thread_id,
+    )
+    return ApiResponse(
+        success=True,
+        data=[UsageResponse(**row) for row in rows],
+    )
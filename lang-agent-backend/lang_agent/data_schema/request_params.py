@@ -28,6 +28,26 @@ class AgentRunParams(BaseModel):
     agent_name: Optional[str] = Field(default=None, description="Agent名称")
 
 
+class AgentBatchItem(BaseModel):
+    chat_id: str = Field(..., description="会话ID")
+    state: dict = Field(default_factory=dict, description="状态变量")
+
+
+class AgentBatchParams(BaseModel):
+    agent_id: Optional[str] = Field(default=None, description="AgentId")
+    agent_data: Optional[dict] = Field(default=None, description="Agent数据")
+    agent_name: Optional[str] = Field(default=None, description="Agent名称")
+    items: list[AgentBatchItem] = Field(..., description="批量运行项")
+    concurrency: Optional[int] = Field(default=None, ge=1, description="最大并发数")
+    stream: Optional[bool] = Field(default=False, description="是否以NDJSON流式返回")
+
+
+class JobParams(BaseModel):
+    agent_id: str = Field(..., description="AgentId")
+    chat_id: str = Field(..., description="会话ID")
+    state: dict = Field(default_factory=dict, description="状态变量")
+
+
 class MCPParams(BaseModel):
     id: Optional[str] = Field(None, description="MCPid")
     name: str = Field(..., description="MCP名称")
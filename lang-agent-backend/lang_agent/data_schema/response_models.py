@@ -1,3 +1,4 @@
+from datetime import datetime
 from typing import Optional, TypeVar, Union
 from pydantic import BaseModel, Field
 
@@ -19,6 +20,41 @@ class AgentResponse(BaseModel):
     disabled: Optional[bool] = Field(False, description="是否禁用")
 
 
+class AgentBatchResult(BaseModel):
+    chat_id: str = Field(..., description="会话ID")
+    success: bool = Field(..., description="是否运行成功")
+    data: Optional[dict] = Field(None, description="运行结果")
+    error: Optional[str] = Field(None, description="错误信息")
+
+
+class JobResponse(BaseModel):
+    id: str = Field(..., description="任务ID")
+    agent_id: str = Field(..., description="AgentId")
+    agent_name: Optional[str] = Field(None, description="Agent名称")
+    chat_id: str = Field(..., description="会话ID")
+    status: str = Field(..., description="任务状态")
+    result: Optional[dict] = Field(None, description="运行结果")
+    error: Optional[str] = Field(None, description="错误信息")
+    queued_at: Optional[datetime] = Field(None, description="入队时间")
+    started_at: Optional[datetime] = Field(None, description="开始时间")
+    finished_at: Optional[datetime] = Field(None, description="结束时间")
+    wait_time: Optional[float] = Field(None, description="排队耗时(秒)")
+    run_time: Optional[float] = Field(None, description="运行耗时(秒)")
+
+
+class UsageResponse(BaseModel):
+    agent_name: Optional[str] = Field(None, description="Agent名称")
+    node: Optional[str] = Field(None, description="节点名称")
+    model: Optional[str] = Field(None, description="模型名称")
+    thread_id: Optional[str] = Field(None, description="会话ID")
+    calls: int = Field(0, description="调用次数")
+    cached_calls: int = Field(0, description="命中响应缓存的调用次数")
+    errors: int = Field(0, description="调用失败次数")
+    input_tokens: int = Field(0, description="输入token数")
+    output_tokens: int = Field(0, description="输出token数")
+    seconds: float = Field(0, description="调用总耗时(秒)")
+
+
 class McpResponse(BaseModel):
     id: str = Field(..., description="MCP ID")
     name: str = Field(..., description="MCP名称")
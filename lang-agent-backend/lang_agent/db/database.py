@@ -1,25 +1,31 @@
 import logging
 import os
 from contextlib import contextmanager
+from datetime import datetime
 
 from dotenv import load_dotenv
 from langchain_text_splitters import CharacterTextSplitter
-from sqlalchemy import create_engine, delete, desc, select, update
+from sqlalchemy import create_engine, delete, desc, event, func, select, update
 from sqlalchemy.orm import sessionmaker
 from xid import XID
 
 from lang_agent.data_schema.request_params import (
     AgentParams,
     DocumentParams,
+    JobParams,
     MCPParams,
     ModelParams,
     VectorStoreParams
 )
+from lang_agent.setting.graph_cache import graph_cache, subgraph_cache
 from lang_agent.setting.manager import resource_manager
 from lang_agent.util import load_document
 from lang_agent.logger import get_logger
 
-from .models import Agent, Base, Chunk, Document, Mcp, Model, ModelType, VectorStore
+from .models import (
+    Agent, Base, Chunk, Document, Job, JobStatus, Mcp, Model, ModelType,
+    ModelUsage, ResourceEvent, VectorStore
+)
 
 load_dotenv()
 logging.basicConfig()
@@ -43,6 +49,16 @@ class Database:
             pool_pre_ping=True,
             echo=True,
         )
+        if db_url.startswith("sqlite"):
+            # 多进程共享sqlite时使用WAL并等待锁释放，避免database is locked
+            busy_timeout = int(float(os.getenv("SQLITE_BUSY_TIMEOUT", "30")) * 1000)
+
+            @event.listens_for(self.engine, "connect")
+            def _set_sqlite_pragma(dbapi_connection, _):
+                cursor = dbapi_connection.cursor()
+                cursor.execute("PRAGMA journal_mode=WAL")
+                cursor.execute(f"PRAGMA busy_timeout={busy_timeout}")
+                cursor.close()
         self._initialized = True
 
     def get_engine(self):
@@ -68,6 +84,10 @@ def setup_database_connection():
     db.init_database()
 
 
+def worker_id() -> str:
+    return str(os.getpid())
+
+
 @contextmanager
 def get_session():
     session = sessionmaker(bind=db.get_engine(), expire_on_commit=False)()
@@ -96,10 +116,12 @@ def create_model(
             model_args=model.model_args,
         )
         session.add(entity)
+        publish_resource_event(session, "model", entity.name)
         if resource_manager is not None:
             resource_manager.models[entity.type][entity.name] = (
                 resource_manager.init_model(entity)
             )
+            resource_manager.touch()
         return id
 
 
@@ -123,6 +145,8 @@ def update_model(
                     resource_manager.models[model.type][model.name] = (
                         resource_manager.init_model(model)
                     )
+                resource_manager.touch()
+        publish_resource_event(session, "model", entity.name, model.name)
         entity.name = model.name
         entity.type = model.type
         entity.channel = model.channel
@@ -143,6 +167,8 @@ def delete_model(id: str):
         entity = session.scalars(stmt).first()
         if resource_manager is not None and entity.disabled == False:
             del resource_manager.models[entity.type][entity.name]
+            resource_manager.touch()
+        publish_resource_event(session, "model", entity.name)
         session.delete(entity)
 
 
@@ -208,13 +234,21 @@ def update_agent(agent: AgentParams):
         entity.description = agent.description
         entity.data = agent.data
         entity.reuse_flag = agent.reuse_flag
+        publish_resource_event(session, "agent", entity.name)
+    # Supervisor等节点按名称引用其它Agent，嵌套的成员变更不会改变上层Agent的更新时间，
+    # 且更新时间只精确到秒，任一Agent变更都需清空已编译图与子图缓存
+    graph_cache.clear()
+    subgraph_cache.clear()
 
 
 def delete_agent(id: str):
     with get_session() as session:
         stmt = select(Agent).where(Agent.id == id)
         entity = session.scalars(stmt).first()
+        publish_resource_event(session, "agent", entity.name)
         session.delete(entity)
+    graph_cache.clear()
+    subgraph_cache.clear()
 
 
 def list_agents() -> list[Agent]:
@@ -252,6 +286,16 @@ def select_agent_by_name(name: str) -> Agent:
         return entity
 
 
+def select_agents_by_names(names: list[str]) -> list[Agent]:
+    """
+    一次查询获取多个Agent，按names的顺序返回，不存在的名称被忽略
+    """
+    with get_session() as session:
+        stmt = select(Agent).where(Agent.name.in_(names))
+        entities = {entity.name: entity for entity in session.scalars(stmt).all()}
+        return [entities[name] for name in names if name in entities]
+
+
 async def save_mcp(mcp: MCPParams):
     if not select_mcp(mcp.id):
         await create_mcp(mcp)
@@ -270,10 +314,12 @@ async def create_mcp(
             id=id, name=mcp.name, description=mcp.description, mcp_args=mcp.mcp_args
         )
         session.add(entity)
+        publish_resource_event(session, "mcp", entity.name)
         if resource_manager is not None and entity.disabled == False:
             resource_manager.mcp_map[entity.name] = await resource_manager.init_mcp(
                 entity
             )
+            resource_manager.touch()
         return id
 
 
@@ -294,7 +340,9 @@ async def update_mcp(
                     entity
                 )
             if entity.disabled == False and mcp.disabled == True:
-                del resource_manager.mcp_map[entity.name]
+                resource_manager.remove_mcp(entity.name)
+            resource_manager.touch()
+        publish_resource_event(session, "mcp", entity.name, mcp.name)
         entity.name = mcp.name
         entity.description = mcp.description
         entity.mcp_args = mcp.mcp_args
@@ -306,7 +354,9 @@ def delete_mcp(id: str):
         stmt = select(Mcp).where(Mcp.id == id)
         entity = session.scalars(stmt).first()
         if resource_manager is not None and entity.disabled == False:
-            del resource_manager.mcp_map[entity.name]
+            resource_manager.remove_mcp(entity.name)
+            resource_manager.touch()
+        publish_resource_event(session, "mcp", entity.name)
         session.delete(entity)
 
 
@@ -367,10 +417,12 @@ async def create_vectorstore(
             disabled=vectorstore.disabled
         )
         session.add(entity)
+        publish_resource_event(session, "vectorstore", entity.name)
         if resource_manager is not None and entity.disabled == False:
             vs = resource_manager.init_vectorstore(entity)
             if vs is not None:
                 resource_manager.vectorstore_map[entity.name] = vs
+            resource_manager.touch()
         return id
 
 def del_vs(name: str):
@@ -394,6 +446,8 @@ async def update_vectorstore(
                     del_vs(entity.name)
             else:
                 del_vs(entity.name)
+            resource_manager.touch()
+        publish_resource_event(session, "vectorstore", entity.name, vectorstore.name)
         entity.name = vectorstore.name
         entity.disabled = vectorstore.disabled
         entity.type = vectorstore.type
@@ -412,6 +466,8 @@ def delete_vectorstore(id: str):
         entity = session.scalars(stmt).first()
         if resource_manager is not None and entity.disabled is False:
             del_vs(entity.name)
+            resource_manager.touch()
+        publish_resource_event(session, "vectorstore", entity.name)
         session.delete(entity)
 
 
@@ -556,3 +612,235 @@ def list_chunks(doc_id: str) -> list[Chunk]:
         stmt = select(Chunk).where(Chunk.doc_id == doc_id)
         entities = session.scalars(stmt).all()
         return entities
+
+
+def create_job(params: JobParams, agent: Agent) -> str:
+    with get_session() as session:
+        id = XID().string()
+        entity = Job(
+            id=id,
+            agent_id=agent.id,
+            agent_name=agent.name,
+            chat_id=params.chat_id,
+            state=params.state,
+            status=JobStatus.PENDING.value,
+            queued_at=datetime.now(),
+        )
+        session.add(entity)
+        return id
+
+
+def select_job(id: str) -> Job:
+    with get_session() as session:
+        stmt = select(Job).where(Job.id == id)
+        entity = session.scalars(stmt).first()
+        return entity
+
+
+def list_jobs(status: str = None, limit: int = 100) -> list[Job]:
+    with get_session() as session:
+        stmt = select(Job)
+        if status:
+            stmt = stmt.where(Job.status == status)
+        stmt = stmt.order_by(desc(Job.queued_at)).limit(limit)
+        entities = session.scalars(stmt).all()
+        return entities
+
+
+def list_pending_job_ids() -> list[str]:
+    with get_session() as session:
+        stmt = select(Job.id).where(
+            Job.status == JobStatus.PENDING.value
+        ).order_by(Job.queued_at)
+        return list(session.scalars(stmt).all())
+
+
+def claim_job(id: str) -> Job:
+    """
+    将排队中的任务标记为运行中，任务已被取消或被其它进程领取时返回None
+    """
+    with get_session() as session:
+        stmt = select(Job).where(Job.id == id)
+        entity = session.scalars(stmt).first()
+        if entity is None or entity.status != JobStatus.PENDING.value:
+            return None
+        now = datetime.now()
+        result = session.execute(
+            update(Job).where(
+                Job.id == id, Job.status == JobStatus.PENDING.value
+            ).values(
+                status=JobStatus.RUNNING.value,
+                worker=worker_id(),
+                started_at=now,
+                wait_time=(now - entity.queued_at).total_seconds(),
+            )
+        )
+        if result.rowcount != 1:
+            return None
+        return entity
+
+
+def finish_job(id: str, status: JobStatus, result: dict = None, error: str = None):
+    with get_session() as session:
+        stmt = select(Job).where(Job.id == id)
+        entity = session.scalars(stmt).first()
+        now = datetime.now()
+        entity.status = status.value
+        entity.result = result
+        entity.error = error
+        entity.finished_at = now
+        if entity.started_at is not None:
+            entity.run_time = (now - entity.started_at).total_seconds()
+
+
+def cancel_pending_job(id: str) -> bool:
+    with get_session() as session:
+        result = session.execute(
+            update(Job).where(
+                Job.id == id, Job.status == JobStatus.PENDING.value
+            ).values(
+                status=JobStatus.CANCELLED.value,
+                finished_at=datetime.now(),
+            )
+        )
+        return result.rowcount == 1
+
+
+def request_job_cancel(id: str) -> bool:
+    """
+    请求取消其它worker进程中运行的任务，由执行进程收到job_cancel事件后取消
+    """
+    with get_session() as session:
+        stmt = select(Job).where(Job.id == id)
+        entity = session.scalars(stmt).first()
+        if (
+            entity is None
+            or entity.status != JobStatus.RUNNING.value
+            or entity.worker == worker_id()
+            or not _process_alive(entity.worker)
+        ):
+            return False
+        publish_resource_event(session, "job_cancel", id)
+        return True
+
+
+def requeue_running_jobs(worker: str = None):
+    """
+    将运行中的任务重置为排队状态，用于服务重启后恢复未完成的任务
+    指定worker时只处理该进程的任务，否则只处理执行进程已退出的任务
+    重置的任务发布job事件，其它运行中的worker进程收到后领取执行
+    """
+    with get_session() as session:
+        stmt = select(Job).where(Job.status == JobStatus.RUNNING.value)
+        if worker is not None:
+            stmt = stmt.where(Job.worker == worker)
+        ids = []
+        for entity in session.scalars(stmt).all():
+            if worker is None and _process_alive(entity.worker):
+                continue
+            entity.status = JobStatus.PENDING.value
+            entity.worker = None
+            entity.started_at = None
+            entity.wait_time = None
+            ids.append(entity.id)
+        publish_resource_event(session, "job", *ids)
+
+
+def _process_alive(pid: str) -> bool:
+    try:
+        os.kill(int(pid), 0)
+    except (TypeError, ValueError, ProcessLookupError):
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def publish_resource_event(session, kind: str, *names: str):
+    """
+    记录资源变更事件，其它worker进程据此同步本地的资源缓存
+    """
+    for name in dict.fromkeys(names):
+        session.add(ResourceEvent(kind=kind, name=name, origin=worker_id()))
+
+
+def list_resource_events(after_id: int) -> list[ResourceEvent]:
+    with get_session() as session:
+        stmt = select(ResourceEvent).where(
+            ResourceEvent.id > after_id
+        ).order_by(ResourceEvent.id)
+        entities = session.scalars(stmt).all()
+        return entities
+
+
+def latest_resource_event_id() -> int:
+    with get_session() as session:
+        return session.scalar(select(func.max(ResourceEvent.id))) or 0
+
+
+def prune_resource_events(keep: int = 10000):
+    """
+    只保留最近的keep条资源变更事件
+    """
+    with get_session() as session:
+        latest_id = session.scalar(select(func.max(ResourceEvent.id))) or 0
+        session.execute(
+            delete(ResourceEvent).where(ResourceEvent.id <= latest_id - keep)
+        )
+
+
+USAGE_GROUP_COLUMNS = ("agent_name", "node", "model", "thread_id")
+
+
+def save_model_usage(rows: list[dict]):
+    """
+    批量写入模型用量的聚合记录
+    """
+    if not rows:
+        return
+    with get_session() as session:
+        session.bulk_insert_mappings(ModelUsage, rows)
+
+
+def summarize_model_usage(
+    start: datetime = None,
+    end: datetime = None,
+    group_by: list[str] = None,
+    agent_name: str = None,
+    thread_id: str = None,
+) -> list[dict]:
+    """
+    统计[start, end)时段内的模型用量，按group_by中的列分组汇总
+    """
+    group_by = group_by or []
+    for column in group_by:
+        if column not in USAGE_GROUP_COLUMNS:
+            raise ValueError(f"Invalid Group Column: {column}")
+    columns = [getattr(ModelUsage, column) for column in group_by]
+    stmt = select(
+        *columns,
+        func.sum(ModelUsage.calls).label("calls"),
+        func.sum(ModelUsage.cached_calls).label("cached_calls"),
+        func.sum(ModelUsage.errors).label("errors"),
+        func.sum(ModelUsage.input_tokens).label("input_tokens"),
+        func.sum(ModelUsage.output_tokens).label("output_tokens"),
+        func.sum(ModelUsage.seconds).label("seconds"),
+    )
+    if start:
+        stmt = stmt.where(ModelUsage.bucket >= start)
+    if end:
+        stmt = stmt.where(ModelUsage.bucket < end)
+    if agent_name:
+        stmt = stmt.where(ModelUsage.agent_name == agent_name)
+    if thread_id:
+        stmt = stmt.where(ModelUsage.thread_id == thread_id)
+    if columns:
+        stmt = stmt.group_by(*columns)
+    stmt = stmt.order_by(desc("input_tokens"))
+    with get_session() as session:
+        rows = session.execute(stmt).mappings().all()
+    return [
+        {key: value if key in group_by else (value or 0) for key, value in row.items()}
+        for row in rows
+        if row["calls"] is not None
+    ]
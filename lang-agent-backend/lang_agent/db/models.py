@@ -1,5 +1,5 @@
 from enum import Enum
-from sqlalchemy import Boolean, Column, DateTime, String, func
+from sqlalchemy import Boolean, Column, DateTime, Float, Integer, String, func
 from sqlalchemy.orm import declarative_base
 
 from lang_agent.util.alchemy import JSONEncodedDict
@@ -11,6 +11,14 @@ class ModelType(str, Enum):
     EMBEDDING = "embedding"
     VLM = "vlm"
 
+class JobStatus(str, Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+    TIMEOUT = "timeout"
+
 class BaseEntity(Base):
     __abstract__ = True
     created_at = Column(DateTime, default=func.now(), nullable=False, comment="创建时间")
@@ -71,3 +79,48 @@ class Chunk(BaseEntity):
     meta_data = Column(JSONEncodedDict, comment="元数据")
     doc_id = Column(String, comment="文档ID")
     embedding_flag = Column(Boolean, default=False, comment="是否向量化")
+
+
+class Job(BaseEntity):
+    __tablename__ = "job"
+    id = Column(String, primary_key=True, unique=True, index=True, comment="任务ID")
+    agent_id = Column(String, comment="Agent ID")
+    agent_name = Column(String, comment="Agent名称")
+    chat_id = Column(String, comment="会话ID")
+    state = Column(JSONEncodedDict, comment="状态变量")
+    status = Column(String, index=True, comment="任务状态")
+    worker = Column(String, comment="执行进程")
+    result = Column(JSONEncodedDict, comment="运行结果")
+    error = Column(String, comment="错误信息")
+    queued_at = Column(DateTime, comment="入队时间")
+    started_at = Column(DateTime, comment="开始时间")
+    finished_at = Column(DateTime, comment="结束时间")
+    wait_time = Column(Float, comment="排队耗时(秒)")
+    run_time = Column(Float, comment="运行耗时(秒)")
+
+
+class ResourceEvent(Base):
+    __tablename__ = "resource_event"
+    id = Column(Integer, primary_key=True, autoincrement=True, comment="事件ID")
+    kind = Column(String, comment="资源类型")
+    name = Column(String, comment="资源名称")
+    origin = Column(String, comment="来源进程")
+    created_at = Column(
+        DateTime, default=func.now(), nullable=False, comment="创建时间"
+    )
+
+
+class ModelUsage(Base):
+    __tablename__ = "model_usage"
+    id = Column(Integer, primary_key=True, autoincrement=True, comment="记录ID")
+    bucket = Column(DateTime, index=True, comment="统计时段(按分钟)")
+    thread_id = Column(String, index=True, comment="会话ID")
+    agent_name = Column(String, index=True, comment="Agent名称")
+    node = Column(String, comment="节点名称")
+    model = Column(String, comment="模型名称")
+    calls = Column(Integer, default=0, comment="调用次数")
+    cached_calls = Column(Integer, default=0, comment="命中响应缓存的调用次数")
+    errors = Column(Integer, default=0, comment="调用失败次数")
+    input_tokens = Column(Integer, default=0, comment="输入token数")
+    output_tokens = Column(Integer, default=0, comment="输出token数")
+    seconds = Column(Float, default=0, comment="调用总耗时(秒)")
@@ -1,17 +1,42 @@
+from typing import Optional, Union
+
+from langgraph.types import Send
+
+from lang_agent.edge.expr import compile_condition
 from lang_agent.edge.util import Target
-from lang_agent.util import complete_content
 
 
 class ConditionEdge:
     def __init__(self, source: str, targets: list[Target]):
         self.source = source
         self.targets = targets
+        # 任一目标开启parallel时，返回所有满足条件的目标，在同一步中并行执行
+        self.parallel = any(target.parallel for target in targets)
+        # 条件表达式在建图时编译，相同表达式复用编译结果
+        self.conditions = [
+            compile_condition(target.expr) if target.expr else None
+            for target in targets
+        ]
 
-    def route(self, state: dict) -> str:
-        for target in self.targets:
-            if target.expr:
-                expr = complete_content(target.expr, state)
-                if eval(expr):
-                    return target.target_name
+    def route(self, state: dict) -> Optional[Union[str, list[Union[str, Send]]]]:
+        selected: list[Union[str, Send]] = []
+        for target, condition in zip(self.targets, self.conditions):
+            if condition is not None and not condition.evaluate(state):
                 continue
+            destination = self._dispatch(target, state)
+            if not self.parallel:
+                return destination
+            if isinstance(destination, list):
+                selected.extend(destination)
+            else:
+                selected.append(destination)
+        return selected if self.parallel else None
+
+    def _dispatch(self, target: Target, state: dict) -> Union[str, list[Send]]:
+        if target.map_over is None:
             return target.target_name
+        items = state.get(target.map_over) or []
+        return [
+            Send(target.target_name, {**state, target.map_as: item})
+            for item in items
+        ]
@@ -0,0 +1,131 @@
+import ast
+import re
+from functools import lru_cache
+from typing import Any
+
+from lang_agent.util import get_state_value
+
+__all__ = ["CompiledCondition", "compile_condition"]
+
+PLACEHOLDER_PATTERN = re.compile(r"{{(.+?)}}")
+MARKER_PATTERN = re.compile(r"__p\d+__")
+
+SAFE_FUNCTIONS = {
+    "abs": abs,
+    "bool": bool,
+    "float": float,
+    "int": int,
+    "len": len,
+    "max": max,
+    "min": min,
+    "str": str,
+}
+
+ALLOWED_NODES = (
+    ast.Expression,
+    ast.BoolOp, ast.And, ast.Or,
+    ast.UnaryOp, ast.Not, ast.USub, ast.UAdd,
+    ast.BinOp, ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod,
+    ast.Compare, ast.Eq, ast.NotEq, ast.Lt, ast.LtE, ast.Gt, ast.GtE,
+    ast.In, ast.NotIn, ast.Is, ast.IsNot,
+    ast.IfExp, ast.Call, ast.Name, ast.Load, ast.Constant,
+    ast.List, ast.Tuple, ast.Set, ast.Dict, ast.Subscript, ast.Slice,
+)
+
+
+def _literal(value: Any) -> Any:
+    """
+    未加引号的变量按其文本作为Python字面量解析，与原先替换后eval的行为一致
+    """
+    if isinstance(value, str):
+        try:
+            return ast.literal_eval(value.strip())
+        except (ValueError, SyntaxError, MemoryError, RecursionError):
+            return value
+    return value
+
+
+class _Interpolate(ast.NodeTransformer):
+    """
+    将包含变量的字符串常量改写为运行时格式化调用
+    """
+
+    def visit_Constant(self, node: ast.Constant):
+        if isinstance(node.value, str) and MARKER_PATTERN.search(node.value):
+            call = ast.Call(
+                func=ast.Name(id="__fmt__", ctx=ast.Load()),
+                args=[ast.Constant(value=node.value)],
+                keywords=[],
+            )
+            return ast.copy_location(call, node)
+        return node
+
+
+class CompiledCondition:
+    """
+    预编译的条件表达式，变量直接从state读取，不再拼接字符串后eval
+    """
+
+    def __init__(self, expr: str):
+        self.expr = expr
+        self.keys: dict[str, str] = {}  # 标识符 -> 变量名
+
+        def replace(match: re.Match) -> str:
+            marker = f"__p{len(self.keys)}__"
+            self.keys[marker] = match.group(1)
+            return marker
+
+        source = PLACEHOLDER_PATTERN.sub(replace, expr)
+        try:
+            tree = ast.parse(source.strip(), mode="eval")
+        except SyntaxError as e:
+            raise ValueError(f"Invalid Condition Expression: {expr}") from e
+        tree = ast.fix_missing_locations(_Interpolate().visit(tree))
+        self._validate(tree)
+        # 直接作为表达式使用(未在字符串中)的变量
+        self.names = {
+            node.id
+            for node in ast.walk(tree)
+            if isinstance(node, ast.Name) and node.id in self.keys
+        }
+        self.code = compile(tree, "<condition>", "eval")
+
+    def _validate(self, tree: ast.AST):
+        for node in ast.walk(tree):
+            if not isinstance(node, ALLOWED_NODES):
+                raise ValueError(
+                    f"Unsupported Syntax [{type(node).__name__}] "
+                    f"In Condition Expression: {self.expr}"
+                )
+            if isinstance(node, ast.Name) and not (
+                node.id in self.keys
+                or node.id in SAFE_FUNCTIONS
+                or node.id == "__fmt__"
+            ):
+                raise ValueError(
+                    f"Unknown Name [{node.id}] In Condition Expression: {self.expr}"
+                )
+            if isinstance(node, ast.Call) and not (
+                isinstance(node.func, ast.Name) and not node.keywords
+            ):
+                raise ValueError(
+                    f"Unsupported Call In Condition Expression: {self.expr}"
+                )
+
+    def evaluate(self, state: dict) -> bool:
+        values = {
+            marker: get_state_value(state, key) for marker, key in self.keys.items()
+        }
+
+        def fmt(template: str) -> str:
+            return MARKER_PATTERN.sub(lambda m: str(values[m.group(0)]), template)
+
+        namespace = {marker: _literal(values[marker]) for marker in self.names}
+        namespace["__fmt__"] = fmt
+        namespace["__builtins__"] = SAFE_FUNCTIONS
+        return bool(eval(self.code, namespace))
+
+
+@lru_cache(maxsize=1024)
+def compile_condition(expr: str) -> CompiledCondition:
+    return CompiledCondition(expr)
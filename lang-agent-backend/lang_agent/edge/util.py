@@ -8,6 +8,13 @@ class Target(BaseModel):
     target: str = Field(..., description="目标节点ID")
     target_name: str = Field(..., description="目标节点名称")
     expr: Optional[str] = Field(default=None, description="条件表达式")
+    parallel: bool = Field(
+        default=False, description="是否与其它满足条件的目标并行执行"
+    )
+    map_over: Optional[str] = Field(
+        default=None, description="按该状态字段(列表)中的每一项分别调用目标节点"
+    )
+    map_as: str = Field(default="item", description="每一项在目标节点状态中的字段名")
 
 
 class EdgeData(BaseModel):
@@ -1,3 +1,4 @@
 from .engine import GraphEngine
+from .state import build_state_class
 
-__all__ = ["GraphEngine"]
+__all__ = ["GraphEngine", "build_state_class"]
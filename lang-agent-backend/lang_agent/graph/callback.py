@@ -1,9 +1,23 @@
+import time
 from typing import Any, Optional
+from uuid import UUID
 
 from langchain_core.callbacks import BaseCallbackHandler
 from langchain_core.messages import BaseMessage
+from langchain_core.outputs import LLMResult
+from langgraph.errors import GraphInterrupt
 
 from lang_agent.logger import get_logger
+from lang_agent.metrics import (
+    LLM_CACHE_HITS,
+    LLM_CALL_SECONDS,
+    LLM_TOKENS,
+    NODE_ERRORS,
+    NODE_SECONDS,
+)
+from lang_agent.setting.response_cache import CACHED_FLAG
+
+from .usage import usage_recorder
 
 logger = get_logger(__name__)
 
@@ -46,3 +60,193 @@ class LoggerOutputCallback(BaseCallbackHandler):
                 )
             else:
                 logger.info("Content: %s",message)
+
+
+class MetricsCallback(BaseCallbackHandler):
+    """
+    统计节点耗时、模型调用耗时与token消耗
+    节点通过GraphEngine写入的node_type元数据识别，子图与Agent节点同样适用
+    """
+
+    run_inline = True
+
+    def __init__(self):
+        self._nodes: dict[UUID, tuple[float, str, str]] = {}
+        self._llms: dict[UUID, tuple[float, str]] = {}
+
+    def on_chain_start(
+        self,
+        serialized: dict[str, Any],
+        inputs: dict[str, Any],
+        *,
+        run_id: UUID,
+        metadata: Optional[dict[str, Any]] = None,
+        **kwargs: Any,
+    ):
+        metadata = metadata or {}
+        node_type = metadata.get("node_type")
+        node = metadata.get("langgraph_node")
+        if node_type is not None and node == kwargs.get("name"):
+            self._nodes[run_id] = (time.perf_counter(), node_type, node)
+
+    def on_chain_end(self, outputs: Any, *, run_id: UUID, **kwargs: Any):
+        entry = self._nodes.pop(run_id, None)
+        if entry is not None:
+            start, node_type, node = entry
+            NODE_SECONDS.observe(
+                time.perf_counter() - start, node_type=node_type, node=node
+            )
+
+    def on_chain_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any):
+        entry = self._nodes.pop(run_id, None)
+        if entry is not None and not isinstance(error, GraphInterrupt):
+            start, node_type, node = entry
+            NODE_SECONDS.observe(
+                time.perf_counter() - start, node_type=node_type, node=node
+            )
+            NODE_ERRORS.inc(node_type=node_type, node=node)
+
+    def _llm_start(self, serialized: dict, run_id: UUID, metadata: Optional[dict]):
+        model = (metadata or {}).get("ls_model_name") or (
+            (serialized or {}).get("kwargs", {}).get("model_name", "unknown")
+        )
+        self._llms[run_id] = (time.perf_counter(), model)
+
+    def on_chat_model_start(
+        self,
+        serialized: dict[str, Any],
+        messages: list,
+        *,
+        run_id: UUID,
+        metadata: Optional[dict[str, Any]] = None,
+        **kwargs: Any,
+    ):
+        self._llm_start(serialized, run_id, metadata)
+
+    def on_llm_start(
+        self,
+        serialized: dict[str, Any],
+        prompts: list[str],
+        *,
+        run_id: UUID,
+        metadata: Optional[dict[str, Any]] = None,
+        **kwargs: Any,
+    ):
+        self._llm_start(serialized, run_id, metadata)
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any):
+        entry = self._llms.pop(run_id, None)
+        if entry is None:
+            return
+        start, model = entry
+        LLM_CALL_SECONDS.observe(time.perf_counter() - start, model=model)
+        if is_cached(response):
+            LLM_CACHE_HITS.inc(model=model)
+            return
+        input_tokens, output_tokens = token_usage(response)
+        LLM_TOKENS.inc(input_tokens, model=model, kind="input")
+        LLM_TOKENS.inc(output_tokens, model=model, kind="output")
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any):
+        self._llms.pop(run_id, None)
+
+
+class UsageCallback(BaseCallbackHandler):
+    """
+    记录每次模型调用的token与耗时，按会话、Agent、节点与模型聚合后批量入库
+    Agent名称来自run_config写入的元数据，节点名称与会话ID来自LangGraph的元数据
+    """
+
+    run_inline = True
+
+    def __init__(self):
+        self._llms: dict[UUID, tuple[float, tuple]] = {}
+
+    def _llm_start(self, serialized: dict, run_id: UUID, metadata: Optional[dict]):
+        metadata = metadata or {}
+        model = metadata.get("ls_model_name") or (
+            (serialized or {}).get("kwargs", {}).get("model_name", "unknown")
+        )
+        labels = (
+            metadata.get("thread_id"),
+            metadata.get("agent_name"),
+            metadata.get("langgraph_node"),
+            model,
+        )
+        self._llms[run_id] = (time.perf_counter(), labels)
+
+    def on_chat_model_start(
+        self,
+        serialized: dict[str, Any],
+        messages: list,
+        *,
+        run_id: UUID,
+        metadata: Optional[dict[str, Any]] = None,
+        **kwargs: Any,
+    ):
+        self._llm_start(serialized, run_id, metadata)
+
+    def on_llm_start(
+        self,
+        serialized: dict[str, Any],
+        prompts: list[str],
+        *,
+        run_id: UUID,
+        metadata: Optional[dict[str, Any]] = None,
+        **kwargs: Any,
+    ):
+        self._llm_start(serialized, run_id, metadata)
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any):
+        entry = self._llms.pop(run_id, None)
+        if entry is None:
+            return
+        start, labels = entry
+        cached = is_cached(response)
+        input_tokens, output_tokens = (0, 0) if cached else token_usage(response)
+        usage_recorder.record(
+            *labels,
+            seconds=time.perf_counter() - start,
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            cached=cached,
+        )
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any):
+        entry = self._llms.pop(run_id, None)
+        if entry is not None:
+            start, labels = entry
+            usage_recorder.record(
+                *labels, seconds=time.perf_counter() - start, error=True
+            )
+
+
+def token_usage(response: LLMResult) -> tuple[int, int]:
+    """
+    从模型返回结果中读取(输入token数, 输出token数)
+    """
+    input_tokens = output_tokens = 0
+    for generations in response.generations:
+        for generation in generations:
+            message = getattr(generation, "message", None)
+            usage = getattr(message, "usage_metadata", None)
+            if usage:
+                input_tokens += usage.get("input_tokens", 0)
+                output_tokens += usage.get("output_tokens", 0)
+    if input_tokens == output_tokens == 0:
+        usage = (response.llm_output or {}).get("token_usage") or {}
+        input_tokens = usage.get("prompt_tokens", 0)
+        output_tokens = usage.get("completion_tokens", 0)
+    return input_tokens, output_tokens
+
+
+def is_cached(response: LLMResult) -> bool:
+    """
+    结果是否来自模型响应缓存
+    """
+    return any(
+        getattr(generation, "message", None) is not None
+        and generation.message.response_metadata.get(CACHED_FLAG, False)
+        for generations in response.generations
+        for generation in generations
+    )
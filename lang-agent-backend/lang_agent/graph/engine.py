@@ -1,29 +1,31 @@
+import asyncio
+import copy
+import time
 import traceback
 from typing import (
     Any,
+    AsyncIterator,
     Optional,
     Type,
 )
+from langchain_core.messages import AIMessageChunk
 from langgraph.graph import END, START, StateGraph
-from langgraph.graph.message import MessagesState
 from langgraph.graph.state import CompiledStateGraph
 from langgraph.types import Command,StateSnapshot
 
 from lang_agent.edge import ConditionEdge
 from lang_agent.edge.util import EdgeData, Target
+from lang_agent.metrics import AGENT_RUN_SECONDS, AGENT_RUNS
 from lang_agent.node import BaseNode
 from lang_agent.node.agent import BaseAgentNode
 from lang_agent.node.node_factory import NodeFactory
-from lang_agent.setting import async_checkpointer
-from lang_agent.util import parse_type,merge_json
+from lang_agent.setting import async_checkpointer, interrupt_index
+from lang_agent.util import merge_json
 from lang_agent.logger import get_logger
+from .state import build_state_class
 
 logger = get_logger(__name__)
 
-class DynamicState(MessagesState):
-    pass
-
-
 class GraphEngine:
     def __init__(
             self,
@@ -42,15 +44,19 @@ class GraphEngine:
         self.subgraph = subgraph    # 是否为子图
         self.agent_name = agent_name
 
+    def with_config(self, config: dict) -> "GraphEngine":
+        """
+        返回共享已编译图、仅运行配置不同的引擎副本，供缓存命中时复用
+        """
+        engine = copy.copy(self)
+        engine.graph_config = config
+        return engine
+
     async def compile(self):
         try:
             nodes: list[dict] = self.agent_data["nodes"]
             edges: list[dict] = self.agent_data["edges"]
-            for key, value in self.state_schema.items():
-                if key == "messages":
-                    continue
-                DynamicState.__annotations__[key] = parse_type(value)
-            graph_builder = StateGraph(DynamicState)
+            graph_builder = StateGraph(build_state_class(self.state_schema))
             start_node, end_nodes = await self._init_nodes(
                 graph_builder, nodes
             )
@@ -67,23 +73,36 @@ class GraphEngine:
     async def _init_nodes(self, graph_builder: StateGraph, nodes: list[dict]):
         start_node: str = None
         end_nodes: list[str] = []
-        for param in nodes:
-            node: BaseNode = NodeFactory.instance(
+        instances: list[BaseNode] = [
+            NodeFactory.instance(
                 param,
                 state_schema = self.state_schema,
                 subgraph=self.subgraph,
                 has_subgraphs=self.has_subgraphs,
                 agent_name = self.agent_name,
             )
+            for param in nodes
+        ]
+        # 互不依赖的节点(如多个子Agent)并发完成异步初始化
+        await asyncio.gather(*(node.ainit() for node in instances))
+        for node in instances:
             if node.__class__.type == "start":
                 start_node = node.name
             if node.__class__.type == "end":
                 end_nodes.append(node.name)
+            # node_type元数据供MetricsCallback识别节点并统计耗时
+            metadata = {"node_type": node.type}
             if isinstance(node, BaseAgentNode):
-                graph_builder.add_node(node.name, node.agent)
+                graph_builder.add_node(node.name, node.agent, metadata=metadata)
                 self.has_subgraphs = True
             else:
-                graph_builder.add_node(node.name, node.ainvoke)
+                # 汇合节点延迟到其它分支全部结束后执行，只等待实际分发的分支
+                graph_builder.add_node(
+                    node.name,
+                    node.ainvoke,
+                    metadata=metadata,
+                    defer=node.type == "join",
+                )
             self.node_map[node.name] = node
         return start_node, end_nodes
 
@@ -104,11 +123,15 @@ class GraphEngine:
                     target_name=param["target_name"],
                 )
             if param["type"] == "condition":
+                data: dict = param["data"]
                 edge_data.targets[param["target_name"]] = Target(
                     type=param["type"],
                     target=param["target"],
                     target_name=param["target_name"],
-                    expr=param["data"]["expr"],
+                    expr=data.get("expr"),
+                    parallel=data.get("parallel", False),
+                    map_over=data.get("map_over") or None,
+                    map_as=data.get("map_as") or "item",
                 )
             if param["source_name"] not in self.edge_map:
                 self.edge_map[edge_data.source_name] = edge_data
@@ -134,47 +157,201 @@ class GraphEngine:
             graph_builder.add_edge(end_node, END)
 
     async def ainvoke(self, state: dict, has_subgraphs: bool = False) -> dict:
+        start = time.perf_counter()
         try:
             if "messages" not in state:
                 state["messages"] = []
-            snapshot: StateSnapshot = await self.graph.aget_state(
-                config=self.graph_config, subgraphs=has_subgraphs
+            graph_input, config = await self._get_run_input(state, has_subgraphs)
+            result = await self.graph.ainvoke(
+                input=graph_input,
+                config=config,
+                subgraphs=has_subgraphs
             )
-            if snapshot.next == ():
-                result = await self.graph.ainvoke(
-                    input=state,
-                    config=self.graph_config,
-                    subgraphs=has_subgraphs
-                )
-                return result
-            return await self.aresume(state,has_subgraphs)
+            interrupted = isinstance(result, dict) and "__interrupt__" in result
+            await self._record_interrupt(interrupted, has_subgraphs)
+            self._observe_run(start, "interrupted" if interrupted else "completed")
+            return result
         except Exception as e:
             logger.info(traceback.format_exc())
+            self._observe_run(start, "error")
+            await self._forget_interrupt()
             raise e
+        except asyncio.CancelledError:
+            self._observe_run(start, "cancelled")
+            await self._forget_interrupt()
+            raise
 
     async def aresume(self, state: dict, has_subgraphs: bool = False) -> dict:
-        def _get_config(snapshot: StateSnapshot):
-            if has_subgraphs:
-                subgraphs_config = self._get_subgraphs_config(snapshot)
-                if subgraphs_config is not None:
-                    return merge_json(subgraphs_config,self.graph_config)
-            return merge_json(snapshot.config,self.graph_config)
         try:
-            snapshot: StateSnapshot = await self.graph.aget_state(
-                config=self.graph_config,
-                subgraphs=has_subgraphs
-            )
-            config = _get_config(snapshot)
+            config = await self._get_pending_config(has_subgraphs)
+            if config is None:
+                snapshot: StateSnapshot = await self.graph.aget_state(
+                    config=self.graph_config,
+                    subgraphs=has_subgraphs
+                )
+                config = self._get_resume_config(snapshot, has_subgraphs)
             if state is not None:
-                return await self.graph.ainvoke(
+                result = await self.graph.ainvoke(
                     input=Command(resume=state),
                     config=config,
                     subgraphs=has_subgraphs
                 )
+                await self._record_interrupt(
+                    isinstance(result, dict) and "__interrupt__" in result,
+                    has_subgraphs,
+                )
+                return result
         except Exception as e:
             logger.info(traceback.format_exc())
+            await self._forget_interrupt()
             raise e
 
+    async def astream(
+        self, state: dict, has_subgraphs: bool = False
+    ) -> AsyncIterator[tuple[str, Any]]:
+        """
+        流式运行图，依次产出(事件类型, 事件数据)：
+        token: LLM/VLM节点输出的增量内容
+        node_start/node_end: 节点开始与结束
+        interrupt: 等待用户输入的中断信息
+        end: 运行结束时的状态
+        """
+        start = time.perf_counter()
+        try:
+            if "messages" not in state:
+                state["messages"] = []
+            graph_input, config = await self._get_run_input(state, has_subgraphs)
+            token_nodes = self._get_token_nodes()
+            values = None
+            interrupted = False
+            async for chunk in self.graph.astream(
+                input=graph_input,
+                config=config,
+                stream_mode=["messages", "tasks", "updates", "values"],
+                subgraphs=True,
+            ):
+                namespace, mode, data = chunk
+                if mode == "messages":
+                    message, metadata = data
+                    node_name = metadata.get("langgraph_node")
+                    if isinstance(message, AIMessageChunk) and node_name in token_nodes:
+                        yield "token", {"node": node_name, "content": message.content}
+                elif mode == "tasks":
+                    if "result" in data:
+                        yield "node_end", {
+                            "node": data["name"],
+                            "namespace": list(namespace),
+                            "error": data.get("error"),
+                        }
+                    else:
+                        yield "node_start", {
+                            "node": data["name"],
+                            "namespace": list(namespace),
+                        }
+                elif mode == "updates" and namespace == ():
+                    # 子图中的中断会同时出现在子图与根图的更新中，只取根图的一次
+                    for interrupt in data.get("__interrupt__", ()):
+                        interrupted = True
+                        yield "interrupt", interrupt.value
+                elif mode == "values" and namespace == ():
+                    values = data
+            await self._record_interrupt(interrupted, has_subgraphs)
+            self._observe_run(start, "interrupted" if interrupted else "completed")
+            yield "end", values
+        except Exception as e:
+            logger.info(traceback.format_exc())
+            self._observe_run(start, "error")
+            await self._forget_interrupt()
+            raise e
+        except (asyncio.CancelledError, GeneratorExit):
+            self._observe_run(start, "cancelled")
+            await self._forget_interrupt()
+            raise
+
+    def _get_token_nodes(self) -> set[str]:
+        """
+        收集需要推送token的LLM/VLM节点名称，包括子图中的节点
+        """
+        names = set()
+        for name, node in self.node_map.items():
+            if node.type in ("llm", "vlm"):
+                names.add(name)
+            if isinstance(node, BaseAgentNode):
+                names |= node.token_nodes
+        return names
+
+    def _observe_run(self, start: float, status: str):
+        agent = self.agent_name or ""
+        AGENT_RUNS.inc(agent=agent, status=status)
+        AGENT_RUN_SECONDS.observe(time.perf_counter() - start, agent=agent)
+
+    def _get_thread_id(self) -> Optional[str]:
+        return (self.graph_config or {}).get("configurable", {}).get("thread_id")
+
+    async def _get_run_input(self, state: dict, has_subgraphs: bool):
+        """
+        返回本次运行的输入与配置，存在待恢复的中断时以Command(resume=...)恢复
+        """
+        config = await self._get_pending_config(has_subgraphs)
+        if config is None:
+            return state, self.graph_config
+        return Command(resume=state), config
+
+    async def _get_pending_config(self, has_subgraphs: bool) -> Optional[dict]:
+        """
+        优先查询中断索引，只有状态未知的会话才加载状态快照
+        """
+        thread_id = self._get_thread_id()
+        if thread_id is not None:
+            found, config = await interrupt_index.lookup(thread_id)
+            if not found:
+                return None
+            if config is not None:
+                return merge_json(config, self.graph_config)
+        snapshot: StateSnapshot = await self.graph.aget_state(
+            config=self.graph_config, subgraphs=has_subgraphs
+        )
+        if snapshot.next == ():
+            return None
+        return self._get_resume_config(snapshot, has_subgraphs)
+
+    async def _record_interrupt(self, interrupted: bool, has_subgraphs: bool):
+        """
+        运行结束后更新中断索引，中断时计算一次恢复配置并记录
+        """
+        thread_id = self._get_thread_id()
+        if thread_id is None:
+            return
+        if not interrupted:
+            await interrupt_index.remove(thread_id)
+            return
+        snapshot: StateSnapshot = await self.graph.aget_state(
+            config=self.graph_config, subgraphs=has_subgraphs
+        )
+        await interrupt_index.put(
+            thread_id, self._get_interrupt_config(snapshot, has_subgraphs)
+        )
+
+    async def _forget_interrupt(self):
+        """
+        运行异常中止时状态未知，标记后由下次运行读取快照判断
+        """
+        thread_id = self._get_thread_id()
+        if thread_id is not None:
+            await interrupt_index.put(thread_id, None)
+
+    def _get_resume_config(self, snapshot: StateSnapshot, has_subgraphs: bool):
+        return merge_json(
+            self._get_interrupt_config(snapshot, has_subgraphs), self.graph_config
+        )
+
+    def _get_interrupt_config(self, snapshot: StateSnapshot, has_subgraphs: bool):
+        if has_subgraphs:
+            subgraphs_config = self._get_subgraphs_config(snapshot)
+            if subgraphs_config is not None:
+                return subgraphs_config
+        return snapshot.config
+
     def _get_subgraphs_config(self,snapshot: StateSnapshot):
         for task in snapshot.tasks:
             if task.name == snapshot.next[0]:
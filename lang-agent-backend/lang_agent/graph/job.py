@@ -0,0 +1,153 @@
+import asyncio
+import os
+import traceback
+from typing import Optional
+
+from fastapi.encoders import jsonable_encoder
+
+from lang_agent.data_schema.request_params import JobParams
+from lang_agent.db.database import (
+    Agent,
+    cancel_pending_job,
+    claim_job,
+    create_job,
+    finish_job,
+    list_pending_job_ids,
+    request_job_cancel,
+    requeue_running_jobs,
+    select_agent,
+    worker_id,
+)
+from lang_agent.db.models import Job, JobStatus
+from lang_agent.logger import get_logger
+from lang_agent.util import error_to_str
+
+from .runner import compile_engine
+
+__all__ = ["JobManager", "JobQueueFullError", "job_manager"]
+
+logger = get_logger(__name__)
+
+
+class JobQueueFullError(Exception):
+    pass
+
+
+class JobManager:
+    """
+    进程内的Agent任务队列，任务状态持久化在job表中
+    """
+
+    def __init__(
+        self,
+        workers: int = 4,
+        queue_size: int = 100,
+        timeout: float = 600,
+    ):
+        self.workers = workers
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self.queue: Optional[asyncio.Queue] = None
+        self._worker_tasks: list[asyncio.Task] = []
+        self._running: dict[str, asyncio.Task] = {}
+        self._cancelled: set[str] = set()
+
+    async def start(self):
+        self.queue = asyncio.Queue()
+        requeue_running_jobs()
+        for job_id in list_pending_job_ids():
+            self.queue.put_nowait(job_id)
+        self._worker_tasks = [
+            asyncio.create_task(self._worker()) for _ in range(self.workers)
+        ]
+        logger.info(
+            "Job Manager Started: workers=%s, recovered=%s",
+            self.workers,
+            self.queue.qsize(),
+        )
+
+    async def stop(self):
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+        # 本进程未完成的任务重置为排队状态，下次启动时继续执行
+        requeue_running_jobs(worker_id())
+
+    def submit(self, params: JobParams, agent: Agent) -> str:
+        if self.queue.qsize() >= self.queue_size:
+            raise JobQueueFullError("Job Queue Is Full")
+        job_id = create_job(params, agent)
+        self.queue.put_nowait(job_id)
+        return job_id
+
+    def enqueue(self, job_id: str):
+        """
+        领取其它worker进程停止时重置为排队状态的任务
+        """
+        if self.queue is not None and self._worker_tasks:
+            self.queue.put_nowait(job_id)
+
+    def cancel(self, job_id: str) -> bool:
+        if cancel_pending_job(job_id):
+            return True
+        if self.cancel_running(job_id):
+            return True
+        # 任务在其它worker进程中运行，通知执行进程取消
+        return request_job_cancel(job_id)
+
+    def cancel_running(self, job_id: str) -> bool:
+        task = self._running.get(job_id)
+        if task is None:
+            return False
+        self._cancelled.add(job_id)
+        task.cancel()
+        return True
+
+    async def _worker(self):
+        while True:
+            job_id = await self.queue.get()
+            try:
+                await self._run(job_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.error("Job [%s] Failed: \n %s", job_id, traceback.format_exc())
+            finally:
+                self.queue.task_done()
+
+    async def _run(self, job_id: str):
+        job = claim_job(job_id)
+        if job is None:
+            return
+        task = asyncio.create_task(self._execute(job))
+        self._running[job_id] = task
+        try:
+            result = await asyncio.wait_for(task, timeout=self.timeout)
+            finish_job(job_id, JobStatus.SUCCEEDED, result=jsonable_encoder(result))
+        except asyncio.TimeoutError:
+            finish_job(job_id, JobStatus.TIMEOUT, error="Job Timeout")
+        except asyncio.CancelledError:
+            if job_id not in self._cancelled:
+                raise
+            finish_job(job_id, JobStatus.CANCELLED)
+        except Exception as e:
+            logger.error("Job [%s] Failed: \n %s", job_id, traceback.format_exc())
+            finish_job(job_id, JobStatus.FAILED, error=error_to_str(e))
+        finally:
+            self._running.pop(job_id, None)
+            self._cancelled.discard(job_id)
+
+    async def _execute(self, job: Job) -> dict:
+        agent: Agent = select_agent(job.agent_id)
+        if not agent:
+            raise ValueError("Agent Not Found")
+        engine = await compile_engine(job.chat_id, agent.data, agent.name)
+        return await engine.ainvoke(job.state or {}, engine.has_subgraphs)
+
+
+job_manager = JobManager(
+    workers=int(os.getenv("JOB_WORKERS", "4")),
+    queue_size=int(os.getenv("JOB_QUEUE_SIZE", "100")),
+    timeout=float(os.getenv("JOB_TIMEOUT", "600")),
+)
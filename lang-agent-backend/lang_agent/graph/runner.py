@@ -0,0 +1,61 @@
+import time
+import traceback
+
+from fastapi import HTTPException
+
+from lang_agent.logger import get_logger
+from lang_agent.metrics import GRAPH_COMPILE_SECONDS
+from lang_agent.setting.graph_cache import graph_cache
+from lang_agent.setting.manager import resource_manager
+
+from .callback import LoggerOutputCallback, MetricsCallback, UsageCallback
+from .engine import GraphEngine
+
+__all__ = ["compile_engine", "get_graph_engine", "run_config"]
+
+GRAPH_COMPILE_FAILED = "Graph Compile Failed"
+
+logger = get_logger(__name__)
+
+
+def run_config(chat_id: str, agent_name: str = None) -> dict:
+    callbacks = [LoggerOutputCallback(), MetricsCallback(), UsageCallback()]
+    return {
+        "configurable": {"thread_id": chat_id},
+        "metadata": {"agent_name": agent_name},
+        "recursion_limit": 50,
+        "callbacks": callbacks
+    }
+
+
+async def get_graph_engine(
+        agent_data: dict,
+        agent_name: str = None
+) -> GraphEngine:
+    key = graph_cache.make_key(agent_data, agent_name, resource_manager.version)
+    graph_engine: GraphEngine = graph_cache.get(key)
+    if graph_engine is None:
+        graph_engine = GraphEngine(
+            agent_data = agent_data,
+            agent_name = agent_name
+        )
+        start = time.perf_counter()
+        try:
+            await graph_engine.compile()
+            GRAPH_COMPILE_SECONDS.observe(
+                time.perf_counter() - start, agent=agent_name or ""
+            )
+        except Exception as e:
+            logger.error(f"{GRAPH_COMPILE_FAILED}: \n %s", traceback.format_exc())
+            raise HTTPException(status_code=500, detail=GRAPH_COMPILE_FAILED) from e
+        graph_cache.put(key, graph_engine)
+    return graph_engine
+
+
+async def compile_engine(
+        chat_id: str,
+        agent_data: dict,
+        agent_name: str = None
+) -> GraphEngine:
+    graph_engine = await get_graph_engine(agent_data, agent_name)
+    return graph_engine.with_config(run_config(chat_id, agent_name))
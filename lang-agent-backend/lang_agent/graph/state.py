@@ -0,0 +1,38 @@
+import hashlib
+import json
+from functools import lru_cache
+
+from langgraph.graph.message import MessagesState
+
+from lang_agent.util import parse_type
+
+__all__ = ["build_state_class"]
+
+
+@lru_cache(maxsize=256)
+def _build_state_class(fields: tuple[tuple[str, str], ...]) -> type:
+    digest = hashlib.sha1(
+        json.dumps(fields).encode("utf-8")
+    ).hexdigest()[:8]
+    annotations = {key: parse_type(value) for key, value in fields}
+    return type(MessagesState)(
+        f"DynamicState_{digest}",
+        (MessagesState,),
+        {"__annotations__": annotations, "__module__": __name__},
+    )
+
+
+def build_state_class(state_schema: dict) -> type:
+    """
+    根据state_schema构建独立的状态类，相同的schema复用同一个类
+
+    Args:
+        state_schema (dict): 状态变量名到类型名的映射
+
+    Returns:
+        type: 继承自MessagesState的状态类
+    """
+    fields = tuple(sorted(
+        (key, value) for key, value in state_schema.items() if key != "messages"
+    ))
+    return _build_state_class(fields)
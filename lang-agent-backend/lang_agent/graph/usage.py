@@ -0,0 +1,127 @@
+import asyncio
+import os
+import threading
+import traceback
+from datetime import datetime
+from typing import Optional
+
+from lang_agent.logger import get_logger
+
+__all__ = ["UsageRecorder", "usage_recorder"]
+
+logger = get_logger(__name__)
+
+USAGE_KEYS = ("bucket", "thread_id", "agent_name", "node", "model")
+USAGE_FIELDS = (
+    "calls", "cached_calls", "errors", "input_tokens", "output_tokens", "seconds"
+)
+
+
+class UsageRecorder:
+    """
+    在内存中按(分钟, 会话, Agent, 节点, 模型)聚合模型用量，定期批量写入model_usage表
+    写入失败的记录放回内存在下次重试，最多保留max_pending条，超出时丢弃最早的记录
+    """
+
+    def __init__(self, interval: float = 10.0, max_pending: int = 10000):
+        self.interval = interval
+        self.max_pending = max_pending
+        self._pending: dict[tuple, dict] = {}
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def record(
+        self,
+        thread_id: Optional[str],
+        agent_name: Optional[str],
+        node: Optional[str],
+        model: str,
+        seconds: float,
+        input_tokens: int = 0,
+        output_tokens: int = 0,
+        cached: bool = False,
+        error: bool = False,
+    ):
+        bucket = datetime.now().replace(second=0, microsecond=0)
+        key = (bucket, thread_id, agent_name, node, model)
+        with self._lock:
+            entry = self._pending.get(key)
+            if entry is None:
+                entry = self._pending[key] = dict.fromkeys(USAGE_FIELDS, 0)
+            entry["calls"] += 1
+            entry["cached_calls"] += int(cached)
+            entry["errors"] += int(error)
+            entry["input_tokens"] += input_tokens
+            entry["output_tokens"] += output_tokens
+            entry["seconds"] += seconds
+
+    def drain(self) -> list[dict]:
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        return [
+            {
+                "bucket": bucket,
+                "thread_id": thread_id,
+                "agent_name": agent_name,
+                "node": node,
+                "model": model,
+                **values,
+            }
+            for (bucket, thread_id, agent_name, node, model), values in pending.items()
+        ]
+
+    def requeue(self, rows: list[dict]):
+        with self._lock:
+            for row in rows:
+                key = tuple(row[column] for column in USAGE_KEYS)
+                entry = self._pending.get(key)
+                if entry is None:
+                    entry = self._pending[key] = dict.fromkeys(USAGE_FIELDS, 0)
+                for field in USAGE_FIELDS:
+                    entry[field] += row[field]
+            overflow = len(self._pending) - self.max_pending
+            if overflow > 0:
+                for key in sorted(self._pending, key=lambda k: k[0])[:overflow]:
+                    del self._pending[key]
+        if overflow > 0:
+            logger.warning("Model Usage Pending Overflow, Dropped %d Rows", overflow)
+
+    async def flush(self):
+        from lang_agent.db.database import save_model_usage
+
+        rows = self.drain()
+        if not rows:
+            return
+        try:
+            await asyncio.to_thread(save_model_usage, rows)
+        except Exception:
+            self.requeue(rows)
+            raise
+
+    async def start(self):
+        if self.interval > 0:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        try:
+            await self.flush()
+        except Exception:
+            logger.error("Flush Model Usage Failed: \n %s", traceback.format_exc())
+
+    async def _loop(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.flush()
+            except Exception:
+                logger.error("Flush Model Usage Failed: \n %s", traceback.format_exc())
+
+
+usage_recorder = UsageRecorder(
+    interval=float(os.getenv("USAGE_FLUSH_INTERVAL", "10")),
+    max_pending=int(os.getenv("USAGE_MAX_PENDING", "10000")),
+)
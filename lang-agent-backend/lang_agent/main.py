@@ -1,5 +1,8 @@
 import argparse
+import asyncio
 import os
+import time
+import traceback
 from pathlib import Path
 
 import uvicorn
@@ -7,31 +10,49 @@ from fastapi import FastAPI, HTTPException, Request
 from fastapi.concurrency import asynccontextmanager
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, RedirectResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, RedirectResponse
 from pydantic import ValidationError
 from sqlalchemy.exc import DatabaseError, IntegrityError
 
 from lang_agent.api import router_v1
 from lang_agent.data_schema.response_models import ApiResponse
 from lang_agent.db import setup_database_connection
+from lang_agent.graph.job import job_manager
+from lang_agent.graph.usage import usage_recorder
 from lang_agent.logger import get_logger
+from lang_agent.metrics import HTTP_REQUEST_SECONDS, HTTP_REQUESTS, registry
 from lang_agent.setting.checkpointer import async_checkpointer_shutdown
 from lang_agent.setting.manager import resource_manager
+from lang_agent.setting.sync import resource_sync
 from lang_agent.util import error_to_str
 
 logger = get_logger(__name__)
 
 
-async def resource_init():
-    logger.debug("init_mcps start......")
-    await resource_manager.init_mcp_map()
-    logger.debug("init_mcps end")
-    logger.debug("init_models start......")
-    resource_manager.init_models()
-    logger.debug("init_models end")
-    logger.debug("init_vectorstores start......")
-    resource_manager.init_vectorstore_map()
-    logger.debug("init_vectorstores end")
+STARTUP_WAIT = float(os.getenv("STARTUP_WAIT", "10"))
+
+
+def _log_init_failure(task: asyncio.Task):
+    if not task.cancelled() and task.exception() is not None:
+        logger.error(
+            "Resource Initialization Failed: \n %s",
+            "".join(traceback.format_exception(task.exception())),
+        )
+
+
+async def resource_init() -> asyncio.Task:
+    """
+    后台并发初始化资源，最多等待STARTUP_WAIT秒，未完成的资源继续在后台初始化，服务先行启动
+    """
+    task = asyncio.create_task(resource_manager.init_resources())
+    task.add_done_callback(_log_init_failure)
+    done, _ = await asyncio.wait([task], timeout=STARTUP_WAIT)
+    if not done:
+        logger.warning(
+            "Resources Still Initializing After %.0fs, Serving Before Ready",
+            STARTUP_WAIT,
+        )
+    return task
 
 
 @asynccontextmanager
@@ -40,8 +61,17 @@ async def lifespan(app: FastAPI):
     logger.debug("setup_database_connection start......")
     setup_database_connection()
     logger.debug("setup_database_connection end")
-    await resource_init()
+    init_task = await resource_init()
+    await resource_sync.start()
+    await job_manager.start()
+    await usage_recorder.start()
     yield
+    init_task.cancel()
+    await asyncio.gather(init_task, return_exceptions=True)
+    await job_manager.stop()
+    await usage_recorder.stop()
+    await resource_sync.stop()
+    await resource_manager.close_mcps()
     await async_checkpointer_shutdown()
 
 
@@ -135,7 +165,7 @@ def register_exception_handlers(app: FastAPI):
         )
 
 
-def run(host, port):
+def create_app() -> FastAPI:
     # 初始化FastAPI
     app = FastAPI(title="Lang-Agent集成API", version="1.0.0", lifespan=lifespan)
 
@@ -148,6 +178,21 @@ def run(host, port):
         allow_headers=["*"],
     )
 
+    @app.middleware("http")
+    async def metrics_middleware(request: Request, call_next):
+        start = time.perf_counter()
+        response = await call_next(request)
+        # 按路由模板统计，避免路径参数导致标签过多
+        route = request.scope.get("route")
+        path = route.path if route is not None else "unmatched"
+        HTTP_REQUESTS.inc(
+            method=request.method, path=path, status=response.status_code
+        )
+        HTTP_REQUEST_SECONDS.observe(
+            time.perf_counter() - start, method=request.method, path=path
+        )
+        return response
+
     @app.get("/")
     def docs():
         return RedirectResponse(url="/docs")
@@ -156,16 +201,49 @@ def run(host, port):
     def get_health():
         return {"status": "OK"}
 
+    @app.get("/ready")
+    def get_ready():
+        # 资源全部结束初始化前返回503，resources给出每个资源的状态与耗时
+        startup = resource_manager.startup
+        return JSONResponse(
+            status_code=200 if startup.ready else 503,
+            content={"ready": startup.ready, "resources": startup.report()},
+        )
+
+    @app.get("/metrics", response_class=PlainTextResponse)
+    def get_metrics():
+        return PlainTextResponse(
+            registry.render(), media_type="text/plain; version=0.0.4"
+        )
+
     # 全局异常处理
     register_exception_handlers(app)
 
     app.include_router(router_v1)
-    uvicorn.run(app, host=host, port=port)
+    return app
+
+
+def run(host, port, workers=1):
+    if workers > 1:
+        # 多worker模式下由父进程先建表，避免子进程并发建表冲突
+        setup_database_connection()
+        uvicorn.run(
+            "lang_agent.main:create_app",
+            factory=True,
+            host=host,
+            port=port,
+            workers=workers,
+        )
+    else:
+        uvicorn.run(create_app(), host=host, port=port)
 
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("--host", type=str, default=os.getenv("APP_HOST", "0.0.0.0"))
     parser.add_argument("--port", type=int, default=int(os.getenv("APP_PORT", "8810")))
+    parser.add_argument(
+        "--workers", type=int, default=int(os.getenv("APP_WORKERS", "1"))
+    )
     args = parser.parse_args()
-    run(args.host, args.port)
+    run(args.host, args.port, args.workers)
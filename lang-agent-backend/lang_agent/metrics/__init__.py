@@ -0,0 +1,2 @@
+from .metrics import *
+from .registry import Counter, Gauge, Histogram, Registry, registry
@@ -0,0 +1,194 @@
+from .registry import registry
+
+__all__ = [
+    "HTTP_REQUESTS",
+    "HTTP_REQUEST_SECONDS",
+    "AGENT_RUNS",
+    "AGENT_RUN_SECONDS",
+    "NODE_SECONDS",
+    "NODE_ERRORS",
+    "LLM_CALL_SECONDS",
+    "LLM_TOKENS",
+    "LLM_CACHE_HITS",
+    "MODEL_COALESCED",
+    "MODEL_QUEUE_DEPTH",
+    "MODEL_QUEUE_WAIT_SECONDS",
+    "MODEL_LIMIT_TIMEOUTS",
+    "MODEL_HEDGES",
+    "MODEL_FALLBACKS",
+    "TOOL_CALL_SECONDS",
+    "TOOL_QUEUE_DEPTH",
+    "MCP_SESSION_RESTARTS",
+    "CHECKPOINT_SECONDS",
+    "GRAPH_COMPILE_SECONDS",
+]
+
+
+def _graph_cache_stats() -> dict[tuple, float]:
+    from lang_agent.setting.graph_cache import graph_cache
+
+    return {(k,): v for k, v in graph_cache.stats().items()}
+
+
+def _subgraph_cache_stats() -> dict[tuple, float]:
+    from lang_agent.setting.graph_cache import subgraph_cache
+
+    return {(k,): v for k, v in subgraph_cache.stats().items()}
+
+
+def _mcp_pool_stats() -> dict[tuple, float]:
+    from lang_agent.setting.manager import resource_manager
+
+    return {
+        (name, k): v
+        for name, pool in list(resource_manager.mcp_pools.items())
+        for k, v in pool.stats().items()
+    }
+
+
+def _resource_ready() -> dict[tuple, float]:
+    from lang_agent.setting.manager import resource_manager
+
+    return {
+        (status.kind, status.name): float(status.state == "ready")
+        for status in list(resource_manager.startup.statuses.values())
+    }
+
+
+def _response_cache_stats() -> dict[tuple, float]:
+    from lang_agent.setting.response_cache import response_cache
+
+    return {(k,): v for k, v in response_cache.stats().items()}
+
+
+HTTP_REQUESTS = registry.counter(
+    "lang_agent_http_requests_total",
+    "HTTP请求数",
+    ("method", "path", "status"),
+)
+HTTP_REQUEST_SECONDS = registry.histogram(
+    "lang_agent_http_request_seconds",
+    "HTTP请求耗时",
+    ("method", "path"),
+)
+AGENT_RUNS = registry.counter(
+    "lang_agent_agent_runs_total",
+    "Agent运行次数，status为completed/interrupted/error",
+    ("agent", "status"),
+)
+AGENT_RUN_SECONDS = registry.histogram(
+    "lang_agent_agent_run_seconds",
+    "Agent单次运行耗时",
+    ("agent",),
+)
+NODE_SECONDS = registry.histogram(
+    "lang_agent_node_seconds",
+    "节点执行耗时",
+    ("node_type", "node"),
+)
+NODE_ERRORS = registry.counter(
+    "lang_agent_node_errors_total",
+    "节点执行异常次数(不含中断)",
+    ("node_type", "node"),
+)
+LLM_CALL_SECONDS = registry.histogram(
+    "lang_agent_llm_call_seconds",
+    "模型调用耗时",
+    ("model",),
+)
+LLM_TOKENS = registry.counter(
+    "lang_agent_llm_tokens_total",
+    "模型调用消耗的token数，kind为input/output",
+    ("model", "kind"),
+)
+LLM_CACHE_HITS = registry.counter(
+    "lang_agent_llm_cache_hits_total",
+    "命中响应缓存的模型调用次数，命中时不计入token消耗",
+    ("model",),
+)
+MODEL_COALESCED = registry.counter(
+    "lang_agent_model_coalesced_total",
+    "与进行中的相同请求合并、未单独调用上游的模型调用次数，kind为chat/embedding",
+    ("model", "kind"),
+)
+MODEL_QUEUE_DEPTH = registry.gauge(
+    "lang_agent_model_queue_depth",
+    "等待模型并发或速率额度的调用数",
+    ("model",),
+)
+MODEL_QUEUE_WAIT_SECONDS = registry.histogram(
+    "lang_agent_model_queue_wait_seconds",
+    "模型调用排队等待耗时",
+    ("model",),
+)
+MODEL_LIMIT_TIMEOUTS = registry.counter(
+    "lang_agent_model_limit_timeouts_total",
+    "排队超时被拒绝的模型调用次数",
+    ("model",),
+)
+MODEL_HEDGES = registry.counter(
+    "lang_agent_model_hedges_total",
+    "路由组超过对冲延迟后向model发起的对冲请求数",
+    ("group", "model"),
+)
+MODEL_FALLBACKS = registry.counter(
+    "lang_agent_model_fallbacks_total",
+    "路由组因请求失败降级到model的次数",
+    ("group", "model"),
+)
+TOOL_CALL_SECONDS = registry.histogram(
+    "lang_agent_tool_call_seconds",
+    "MCP工具调用耗时，status为ok、error或timeout",
+    ("mcp", "tool", "status"),
+)
+TOOL_QUEUE_DEPTH = registry.gauge(
+    "lang_agent_tool_queue_depth",
+    "等待MCP并发额度的工具调用数",
+    ("mcp",),
+)
+MCP_SESSION_RESTARTS = registry.counter(
+    "lang_agent_mcp_session_restarts_total",
+    "MCP会话因出错或健康检查失败被重建的次数",
+    ("mcp",),
+)
+CHECKPOINT_SECONDS = registry.histogram(
+    "lang_agent_checkpoint_seconds",
+    "checkpoint读写耗时",
+    ("operation",),
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+)
+GRAPH_COMPILE_SECONDS = registry.histogram(
+    "lang_agent_graph_compile_seconds",
+    "Agent图编译耗时",
+    ("agent",),
+)
+registry.gauge(
+    "lang_agent_graph_cache",
+    "已编译图缓存统计",
+    ("stat",),
+    collect=_graph_cache_stats,
+)
+registry.gauge(
+    "lang_agent_subgraph_cache",
+    "子Agent已编译图缓存统计",
+    ("stat",),
+    collect=_subgraph_cache_stats,
+)
+registry.gauge(
+    "lang_agent_mcp_sessions",
+    "MCP会话池统计",
+    ("mcp", "stat"),
+    collect=_mcp_pool_stats,
+)
+registry.gauge(
+    "lang_agent_resource_ready",
+    "启动时资源是否初始化成功，1为成功",
+    ("kind", "name"),
+    collect=_resource_ready,
+)
+registry.gauge(
+    "lang_agent_llm_cache",
+    "模型响应缓存统计",
+    ("stat",),
+    collect=_response_cache_stats,
+)
@@ -9,6 +9,8 @@ class BaseAgentNode(BaseNode):
     type: str = "agent"
     category: str = "agent"
     agent: CompiledStateGraph
+    # 子图中需要推送token的LLM/VLM节点名称
+    token_nodes: frozenset[str] = frozenset()
 
     def __init__(self, param: dict, **kwargs):
         super().__init__(param, **kwargs)
@@ -1,17 +1,16 @@
 import traceback
-import asyncio
+from datetime import datetime
 from typing import Optional, Union
 
-import nest_asyncio
 from pydantic import Field, TypeAdapter
 
 from lang_agent.logger import get_logger
+from lang_agent.setting.graph_cache import subgraph_cache
+from lang_agent.setting.manager import resource_manager
 
 from ..core import BaseNodeData, BaseNodeParam
 from .base_agent import BaseAgentNode
 
-nest_asyncio.apply()
-
 __all__ = ["ReuseAgentNode", "ReuseAgentNodeParam"]
 
 logger = get_logger(__name__)
@@ -19,6 +18,8 @@ logger = get_logger(__name__)
 
 class ReuseAgentNodeData(BaseNodeData):
     data: Optional[dict] = Field(None, description="Agent数据")
+    agent_id: Optional[str] = Field(default=None, description="Agent ID")
+    updated_at: Optional[datetime] = Field(default=None, description="Agent更新时间")
 
 
 class ReuseAgentNodeParam(BaseNodeParam):
@@ -32,19 +33,41 @@ class ReuseAgentNode(BaseAgentNode):
         adapter = TypeAdapter(ReuseAgentNodeParam)
         param = adapter.validate_python(param)
         super().__init__(param, **kwargs)
-        asyncio.run(self.compile(param))
+        self.param = param
+
+    async def ainit(self):
+        await self.compile(self.param)
+
+    @staticmethod
+    def cache_key(name: str, data: ReuseAgentNodeData) -> str:
+        """
+        已保存的Agent按ID与更新时间区分版本，内嵌在流程中的Agent按其数据区分
+        """
+        if data.agent_id and data.updated_at:
+            version = (data.agent_id, data.updated_at)
+        else:
+            version = data.data
+        return subgraph_cache.make_key(version, name, resource_manager.version)
 
     async def compile(self, param: ReuseAgentNodeParam):
         try:
+            key = self.cache_key(self.name, param.data)
+            cached = subgraph_cache.get(key)
+            if cached is not None:
+                self.agent, self.token_nodes = cached
+                return
             from lang_agent.graph.engine import GraphEngine
             data = param.data.data
-            self.engine = GraphEngine(
+            engine = GraphEngine(
                 agent_data = data,
                 subgraph = True,
                 agent_name = self.name
             )
-            await self.engine.compile()
-            self.agent = self.engine.graph
+            await engine.compile()
+            self.agent = engine.graph
+            # 子图中需要推送token的节点随已编译图一起缓存，供上层引擎合并
+            self.token_nodes = frozenset(engine._get_token_nodes())
+            subgraph_cache.put(key, (self.agent, self.token_nodes))
         except Exception as e:
             logger.info(traceback.format_exc())
             raise e
@@ -1,3 +1,4 @@
+import asyncio
 import traceback
 from typing import Optional, Union
 
@@ -8,9 +9,11 @@ from langgraph.graph.message import MessagesState
 from pydantic import BaseModel, Field, TypeAdapter
 
 from lang_agent.logger import get_logger
-from lang_agent.db import Agent, select_agent_by_name
+from lang_agent.db import Agent, select_agents_by_names
 from lang_agent.setting.manager import resource_manager
+from lang_agent.setting.response_cache import without_cache
 from ..core import BaseNodeData, BaseNodeParam
+from ..core.history import HistoryConfig, MessageHistory
 from .base_agent import BaseAgentNode
 from .reuse_agent_node import ReuseAgentNode, ReuseAgentNodeData, ReuseAgentNodeParam
 
@@ -19,6 +22,18 @@ logger = get_logger(__name__)
 __all__ = ["SupervisorAgentNode", "SupervisorAgentNodeParam"]
 
 
+SUPERVISOR_PROMPT = """
+    你是一名管理者，负责协调多个人员的工作。
+    你管辖的人员的情况如下：
+    {{members}}
+    这是你可以选择的选项：
+    {{options}}
+    你需要分析历史会话，选择最合适的人员来进行下一步的工作，
+    如果你认为目标已达成、用户的问题已被解决、或无法继续推进，请选择 'FINISH'。
+    请始终以JSON格式{"next":"xxxxxx"}输出结果，不要输出其它内容
+"""
+
+
 class SupervisorState(MessagesState):
     next: Optional[str] = Field(default="", description="下一个步骤")
     steps: int = Field(default=0, description="最大步数")
@@ -31,6 +46,12 @@ class RouteResponse(BaseModel):
 class SupervisorAgentNodeData(BaseNodeData):
     model: str = Field(..., description="模型名称")
     agents: Optional[list[str] | str] = Field(default=[], description="代理列表")
+    cache: Optional[bool] = Field(
+        default=True, description="路由决策是否使用模型响应缓存"
+    )
+    history: Optional[HistoryConfig] = Field(
+        default=None, description="路由决策使用的会话历史策略，为空时发送全部消息"
+    )
 
 
 class SupervisorAgentNodeParam(BaseNodeParam):
@@ -53,9 +74,32 @@ class SupervisorAgentNode(BaseAgentNode):
             self.model: BaseLanguageModel = resource_manager.models["llm"][
                 param.data.model
             ]
-            self.agents: list[Agent] = self.get_agents(param.data.agents)
+            if not param.data.cache:
+                self.model = without_cache(self.model)
+            self.history = None
+            if param.data.history is not None:
+                summary_model = param.data.history.summary_model
+                self.history = MessageHistory(
+                    param.data.history,
+                    resource_manager.models["llm"][summary_model]
+                    if summary_model
+                    else self.model,
+                )
+            self.agent_names = param.data.agents
+        except Exception as e:
+            logger.info(traceback.format_exc())
+            raise e
+
+    async def ainit(self):
+        try:
+            if self.history is not None:
+                await self.history.ainit()
+            self.agents: list[Agent] = await asyncio.to_thread(
+                self.get_agents, self.agent_names
+            )
             self._init_members()
-            self.agent = self.compile()
+            self._init_chain()
+            self.agent = await self.compile()
         except Exception as e:
             logger.info(traceback.format_exc())
             raise e
@@ -63,7 +107,12 @@ class SupervisorAgentNode(BaseAgentNode):
     def get_agents(self, agent_names: list[str] | str) -> list[Agent]:
         if isinstance(agent_names, str):
             agent_names = agent_names.split(",")
-        return [select_agent_by_name(agent_name) for agent_name in agent_names]
+        agent_names = [name.strip() for name in agent_names if name.strip()]
+        agents = select_agents_by_names(agent_names)
+        missing = set(agent_names) - {agent.name for agent in agents}
+        if missing:
+            raise ValueError(f"Agent Not Found: {', '.join(sorted(missing))}")
+        return agents
 
     def _init_members(self):
         errors, members, options = [], [], []
@@ -77,30 +126,27 @@ class SupervisorAgentNode(BaseAgentNode):
         self.members = "\n".join(members)
         self.options = ",".join(options + ["FINISH"])
 
-    def _supervisor(self, state: SupervisorState):
+    def _init_chain(self):
+        # 成员与选项在构造时已确定，路由提示词模板与结构化输出链只构建一次
+        self.template = ChatPromptTemplate.from_messages(
+            [
+                MessagesPlaceholder(variable_name="messages"),
+                ("user", SUPERVISOR_PROMPT),
+            ],
+            template_format="mustache",
+        ).partial(members=self.members, options=self.options)
+        self.chain = self.template | self.model.with_structured_output(
+            schema=RouteResponse
+        )
+
+    async def _supervisor(self, state: SupervisorState):
         try:
             messages = state.get("messages", [])
-            if "steps" not in state:
-                state["steps"] = 0
-            user_prompt = """
-                你是一名管理者，负责协调多个人员的工作。
-                你管辖的人员的情况如下：
-                {{members}}
-                这是你可以选择的选项：
-                {{options}}
-                你需要分析历史会话，选择最合适的人员来进行下一步的工作，
-                如果你认为目标已达成、用户的问题已被解决、或无法继续推进，请选择 'FINISH'。
-                请始终以JSON格式{"next":"xxxxxx"}输出结果，不要输出其它内容
-            """
-            template = ChatPromptTemplate.from_messages(
-                [MessagesPlaceholder(variable_name="messages"), ("user", user_prompt)],
-                template_format="mustache",
-            ).partial(members=self.members, options=self.options)
-            supervisor_chain = template | self.model.with_structured_output(
-                schema=RouteResponse
-            )
-            result: RouteResponse = supervisor_chain.invoke({"messages": messages})
-            return {"next": result.next, "steps": state["steps"] + 1}
+            if self.history is not None:
+                messages = await self.history.aselect(messages)
+            steps = state.get("steps", 0)
+            result: RouteResponse = await self.chain.ainvoke({"messages": messages})
+            return {"next": result.next, "steps": steps + 1}
         except Exception as e:
             logger.info(traceback.format_exc())
             raise e
@@ -115,21 +161,29 @@ class SupervisorAgentNode(BaseAgentNode):
             logger.info(traceback.format_exc())
             raise e
 
-    def compile(self):
+    async def compile(self):
         try:
-            graph_builder = StateGraph(SupervisorState)
-            graph_builder.add_node("Supervisor", self._supervisor)
+            members: list[ReuseAgentNode] = []
             for agent in self.agents:
                 param: ReuseAgentNodeParam = ReuseAgentNodeParam(id=agent.id)
                 param.data = ReuseAgentNodeData(
                     name=agent.name,
-                    data=agent.data
+                    data=agent.data,
+                    agent_id=agent.id,
+                    updated_at=agent.updated_at,
                 )
-                reuse_agent = ReuseAgentNode(
-                    param,
-                    state_schema = agent.data["state_schema"]
+                members.append(
+                    ReuseAgentNode(param, state_schema=agent.data["state_schema"])
                 )
-                graph_builder.add_node(agent.name, reuse_agent.ainvoke)
+            # 各成员Agent的子图互不依赖，并发编译
+            await asyncio.gather(*(member.ainit() for member in members))
+            self.token_nodes = frozenset().union(
+                *(member.token_nodes for member in members)
+            )
+            graph_builder = StateGraph(SupervisorState)
+            graph_builder.add_node("Supervisor", self._supervisor)
+            for member in members:
+                graph_builder.add_node(member.name, member.ainvoke)
             graph_builder.add_edge(START, "Supervisor")
             route = {agent.name: agent.name for agent in self.agents}
             route["FINISH"] = END
@@ -1,6 +1,7 @@
 from .base import BaseNode, BaseNodeData, BaseNodeParam
 from .end_node import EndNode, EndNodeParam
 from .input_node import InputNode, InputNodeParam
+from .join_node import JoinNode, JoinNodeParam
 from .llm_node import LLMNode, LLMNodeParam
 from .start_node import StartNode, StartNodeParam
 from .vlm_node import VLMNode, VLMNodeParam
@@ -27,6 +27,11 @@ class BaseNode(ABC):
         self.name = param.data.name
         self.kwargs = kwargs
 
+    async def ainit(self):
+        """
+        异步初始化，GraphEngine构造全部节点后并发等待，需要IO的准备工作(如编译子图)放在这里
+        """
+
     @abstractmethod
     async def ainvoke(self, state: MessagesState):
         """
@@ -0,0 +1,219 @@
+import asyncio
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Literal, Optional
+
+from langchain_core.language_models.base import BaseLanguageModel
+from langchain_core.messages import (
+    AIMessage,
+    BaseMessage,
+    HumanMessage,
+    SystemMessage,
+    ToolMessage,
+    trim_messages,
+)
+from pydantic import BaseModel, Field
+
+from lang_agent.logger import get_logger
+from lang_agent.setting.limiter import estimate_tokens
+
+__all__ = ["HistoryConfig", "MessageHistory", "count_tokens", "load_tokenizer"]
+
+logger = get_logger(__name__)
+
+HISTORY_TOKENIZER = os.getenv("HISTORY_TOKENIZER", "cl100k_base")
+
+SUMMARY_PROMPT = """
+你负责压缩对话历史。请把已有摘要与新增的对话合并为一段新的摘要，
+保留用户的目标、已确认的事实、已做出的决定和尚未解决的问题，省略寒暄与重复内容。
+只输出摘要本身。
+"""
+
+
+_encoding = None
+
+
+@lru_cache(maxsize=1)
+def _load_encoding() -> bool:
+    """
+    只加载一次分词器，首次加载可能需要下载词表，加载失败(如离线环境)时一直按字符数估算
+    """
+    global _encoding
+    try:
+        import tiktoken
+
+        _encoding = tiktoken.get_encoding(HISTORY_TOKENIZER)
+        return True
+    except Exception as e:
+        logger.warning(
+            "Load Tokenizer [%s] Failed, Fallback To Estimate: %s", HISTORY_TOKENIZER, e
+        )
+        return False
+
+
+async def load_tokenizer():
+    """
+    在线程中加载分词器，避免阻塞事件循环，由使用token预算的节点在ainit中调用
+    """
+    await asyncio.to_thread(_load_encoding)
+
+
+@lru_cache(maxsize=8192)
+def _encoded_tokens(text: str) -> int:
+    return len(_encoding.encode(text, disallowed_special=()))
+
+
+def count_tokens(text: str) -> int:
+    # 分词器尚未加载完成时按字符数估算，不在调用路径上加载
+    if _encoding is None:
+        return estimate_tokens(text)
+    return _encoded_tokens(text)
+
+
+def count_message_tokens(messages: list[BaseMessage]) -> int:
+    # 每条消息另计4个token的角色与分隔开销
+    return sum(count_tokens(str(message.content)) + 4 for message in messages)
+
+
+class HistoryConfig(BaseModel):
+    strategy: Literal["all", "last_n", "token_budget", "summary"] = Field(
+        default="all", description="历史消息策略"
+    )
+    max_messages: int = Field(default=20, gt=0, description="last_n策略保留的消息数")
+    max_tokens: int = Field(
+        default=4000, gt=0, description="token_budget与summary策略的历史token上限"
+    )
+    keep_last: int = Field(
+        default=6, ge=0, description="summary策略中保留原文的最近消息数"
+    )
+    summary_model: Optional[str] = Field(
+        default=None, description="生成摘要的模型名称，默认使用节点自身的模型"
+    )
+
+
+# 保留窗口不以工具结果开头，避免与对应的工具调用分离
+START_TYPES = [HumanMessage, AIMessage, SystemMessage]
+
+
+class MessageHistory:
+    """
+    按配置的策略从会话消息中选取送入模型的历史
+    - all: 全部消息
+    - last_n: 最近max_messages条
+    - token_budget: 从最近的消息开始保留，总token数不超过max_tokens
+    - summary: 超过max_tokens时，把较早的消息滚动压缩为摘要，最近keep_last条保留原文
+    摘要按最后一条被压缩的消息缓存，下一轮只需合并新增的消息
+    """
+
+    def __init__(
+        self,
+        config: Optional[HistoryConfig] = None,
+        model: Optional[BaseLanguageModel] = None,
+        cache_size: int = 1024,
+    ):
+        self.config = config or HistoryConfig()
+        self.model = model
+        self.cache_size = cache_size
+        self._summaries: OrderedDict[str, str] = OrderedDict()
+        self._lock = threading.Lock()
+
+    async def ainit(self):
+        if self.config.strategy in ("token_budget", "summary"):
+            await load_tokenizer()
+
+    def _trim(self, messages: list[BaseMessage]) -> list[BaseMessage]:
+        config = self.config
+        match config.strategy:
+            case "last_n":
+                return trim_messages(
+                    messages,
+                    max_tokens=config.max_messages,
+                    token_counter=len,
+                    strategy="last",
+                    start_on=START_TYPES,
+                )
+            case "token_budget":
+                return trim_messages(
+                    messages,
+                    max_tokens=config.max_tokens,
+                    token_counter=count_message_tokens,
+                    strategy="last",
+                    start_on=START_TYPES,
+                )
+        return list(messages)
+
+    @staticmethod
+    def _key(message: BaseMessage) -> str:
+        if message.id:
+            return message.id
+        raw = f"{message.type}:{message.name}:{message.content}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _plan(
+        self, messages: list[BaseMessage]
+    ) -> Optional[tuple[Optional[str], list[BaseMessage], list[BaseMessage], str]]:
+        """
+        返回(已缓存的摘要, 待合并进摘要的消息, 保留原文的消息, 新摘要的缓存键)
+        无需摘要时返回None
+        """
+        if count_message_tokens(messages) <= self.config.max_tokens:
+            return None
+        split = max(0, len(messages) - self.config.keep_last)
+        while 0 < split < len(messages) and isinstance(messages[split], ToolMessage):
+            split -= 1
+        older, recent = messages[:split], messages[split:]
+        if not older:
+            return None
+        previous, start = None, 0
+        with self._lock:
+            for index in range(len(older) - 1, -1, -1):
+                summary = self._summaries.get(self._key(older[index]))
+                if summary is not None:
+                    previous, start = summary, index + 1
+                    break
+        return previous, older[start:], recent, self._key(older[-1])
+
+    def _summary_input(
+        self, previous: Optional[str], pending: list[BaseMessage]
+    ) -> list[BaseMessage]:
+        lines = [f"{m.name or m.type}: {m.content}" for m in pending]
+        content = f"已有摘要：\n{previous or '无'}\n\n新增对话：\n" + "\n".join(lines)
+        return [SystemMessage(content=SUMMARY_PROMPT), HumanMessage(content=content)]
+
+    def _save(
+        self, key: str, summary: str, recent: list[BaseMessage]
+    ) -> list[BaseMessage]:
+        with self._lock:
+            self._summaries[key] = summary
+            self._summaries.move_to_end(key)
+            while len(self._summaries) > self.cache_size:
+                self._summaries.popitem(last=False)
+        return [SystemMessage(content=f"此前对话的摘要：\n{summary}")] + recent
+
+    def select(self, messages: list[BaseMessage]) -> list[BaseMessage]:
+        if self.config.strategy != "summary":
+            return self._trim(messages)
+        plan = self._plan(messages)
+        if plan is None:
+            return list(messages)
+        previous, pending, recent, key = plan
+        summary = previous
+        if pending:
+            summary = self.model.invoke(self._summary_input(previous, pending)).content
+        return self._save(key, summary, recent)
+
+    async def aselect(self, messages: list[BaseMessage]) -> list[BaseMessage]:
+        if self.config.strategy != "summary":
+            return self._trim(messages)
+        plan = self._plan(messages)
+        if plan is None:
+            return list(messages)
+        previous, pending, recent, key = plan
+        summary = previous
+        if pending:
+            message = await self.model.ainvoke(self._summary_input(previous, pending))
+            summary = message.content
+        return self._save(key, summary, recent)
@@ -0,0 +1,33 @@
+from typing import Union
+
+from pydantic import TypeAdapter
+
+from lang_agent.logger import get_logger
+
+from .base import BaseNode, BaseNodeParam
+
+logger = get_logger(__name__)
+
+__all__ = ["JoinNode", "JoinNodeParam"]
+
+
+class JoinNodeParam(BaseNodeParam):
+    pass
+
+
+class JoinNode(BaseNode):
+    """
+    汇合节点：等待本次运行中所有已分发的分支执行完成后再继续，只执行一次
+    并行条件边只选中部分分支时，只等待被选中的分支
+    """
+
+    type = "join"
+
+    def __init__(self, param: Union[JoinNodeParam, dict], **kwargs):
+        adapter = TypeAdapter(JoinNodeParam)
+        param = adapter.validate_python(param)
+        super().__init__(param, **kwargs)
+
+    async def ainvoke(self, state: dict):
+        # 各分支的输出已由状态的reducer合并，这里不再修改状态
+        return {}
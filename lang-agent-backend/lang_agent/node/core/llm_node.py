@@ -3,14 +3,16 @@ from typing import Optional, Union
 
 from langchain_core.language_models.base import BaseLanguageModel
 from langchain_core.messages import BaseMessage, AIMessage
-from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from pydantic import Field, TypeAdapter
 
 from lang_agent.logger import get_logger
 from lang_agent.setting.manager import resource_manager
-from lang_agent.util import parse_args
+from lang_agent.setting.response_cache import without_cache
+from lang_agent.util import compile_template
 
 from .base import BaseNode, BaseNodeData, BaseNodeParam
+from .history import HistoryConfig, MessageHistory
 
 logger = get_logger(__name__)
 
@@ -22,6 +24,10 @@ class LLMNodeData(BaseNodeData):
     system_prompt: Optional[str] = Field(default="", description="系统提示词")
     user_prompt: Optional[str] = Field(default="", description="用户提示词")
     message_show: Optional[bool] = Field(default=True, description="是否显示消息")
+    cache: Optional[bool] = Field(default=True, description="是否使用模型响应缓存")
+    history: Optional[HistoryConfig] = Field(
+        default=None, description="会话历史策略，为空时不发送历史消息"
+    )
 
 
 class LLMNodeParam(BaseNodeParam):
@@ -36,22 +42,51 @@ class LLMNode(BaseNode):
         param = adapter.validate_python(param)
         super().__init__(param, **kwargs)
         self.model: BaseLanguageModel = resource_manager.models["llm"][param.data.model]
+        if not param.data.cache:
+            self.model = without_cache(self.model)
         self.system_prompt = param.data.system_prompt
         self.user_prompt = param.data.user_prompt
+        self.prompt_plan = compile_template(self.system_prompt + self.user_prompt)
+        self.history = None
+        prompts = [("system", self.system_prompt)]
+        if param.data.history is not None:
+            summary_model = param.data.history.summary_model
+            self.history = MessageHistory(
+                param.data.history,
+                resource_manager.models["llm"][summary_model]
+                if summary_model
+                else self.model,
+            )
+            prompts.append(MessagesPlaceholder(variable_name="history"))
+        prompts.append(("human", self.user_prompt))
+        # 提示词模板与调用链只构建一次，缓存的已编译图复用同一节点实例
+        self.template = ChatPromptTemplate.from_messages(
+            prompts, template_format="mustache"
+        )
+        self.chain = self.template | self.model
         self.message_show = param.data.message_show
 
+    async def ainit(self):
+        if self.history is not None:
+            await self.history.ainit()
+
+    def _history_messages(self, messages: list[BaseMessage]) -> list[BaseMessage]:
+        # 提示词中引用的最新消息(如本轮用户输入)已渲染在用户消息中，不在历史中重复发送
+        rendered = set(self.prompt_plan.message_names.values())
+        end = len(messages)
+        while end > 0 and getattr(messages[end - 1], "name", None) in rendered:
+            rendered.discard(messages[end - 1].name)
+            end -= 1
+        return messages[:end]
+
     async def ainvoke(self, state: dict):
         try:
-            template = ChatPromptTemplate.from_messages(
-                [
-                    ("system", self.system_prompt),
-                    ("human", self.user_prompt),
-                ],
-                template_format="mustache",
-            )
-            chain = template | self.model
-            args = parse_args(self.system_prompt + self.user_prompt, state)
-            raw_message: BaseMessage = await chain.ainvoke(args)
+            args = self.prompt_plan.args(state)
+            if self.history is not None:
+                args["history"] = await self.history.aselect(
+                    self._history_messages(state.get("messages", []))
+                )
+            raw_message: BaseMessage = await self.chain.ainvoke(args)
             message: AIMessage = AIMessage(
                 content = raw_message.content,
                 name = self.name,
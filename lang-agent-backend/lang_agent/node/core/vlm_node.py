@@ -3,12 +3,12 @@ from typing import Optional, Union
 
 from langchain_core.language_models.base import BaseLanguageModel
 from langchain_core.messages import BaseMessage, AIMessage, HumanMessage, SystemMessage
-from langchain_core.prompts import ChatPromptTemplate
 from pydantic import Field, TypeAdapter
 
 from lang_agent.logger import get_logger
 from lang_agent.setting.manager import resource_manager
-from lang_agent.util import parse_args,complete_content
+from lang_agent.setting.response_cache import without_cache
+from lang_agent.util import compile_template
 
 from .base import BaseNode, BaseNodeData, BaseNodeParam
 
@@ -23,6 +23,7 @@ class VLMNodeData(BaseNodeData):
     user_prompt: Optional[str] = Field(default="", description="用户提示词")
     image_url: Optional[str] = Field(default="", description="图片URL")
     message_show: Optional[bool] = Field(default=True, description="是否显示消息")
+    cache: Optional[bool] = Field(default=True, description="是否使用模型响应缓存")
 
 
 class VLMNodeParam(BaseNodeParam):
@@ -37,33 +38,32 @@ class VLMNode(BaseNode):
         param = adapter.validate_python(param)
         super().__init__(param, **kwargs)
         self.model: BaseLanguageModel = resource_manager.models["vlm"][param.data.model]
+        if not param.data.cache:
+            self.model = without_cache(self.model)
         self.system_prompt = param.data.system_prompt
         self.user_prompt = param.data.user_prompt
         self.image_url = param.data.image_url
+        self.image_url_plan = compile_template(self.image_url or "")
         self.message_show = param.data.message_show
+        # 提示词原样发送，不作为模板渲染；系统消息只构建一次，每次调用只渲染图片地址
+        self.system_message = SystemMessage(content=self.system_prompt)
 
     async def ainvoke(self, state: dict):
         try:
-            template = ChatPromptTemplate.from_messages(
-                [
-                    SystemMessage(content=self.system_prompt),
-                    HumanMessage(
-                        content=[
-                            {"type": "text", "text": self.user_prompt},
-                            {
-                                "type": "image_url",
-                                "image_url": {
-                                    "url": complete_content(self.image_url,state),
-                                }
-                            },
-                        ]
-                    )
-                ],
-                template_format="mustache",
+            human_message = HumanMessage(
+                content=[
+                    {"type": "text", "text": self.user_prompt},
+                    {
+                        "type": "image_url",
+                        "image_url": {
+                            "url": self.image_url_plan.render(state),
+                        }
+                    },
+                ]
+            )
+            raw_message: BaseMessage = await self.model.ainvoke(
+                [self.system_message, human_message]
             )
-            chain = template | self.model
-            args = parse_args(self.system_prompt + self.user_prompt, state)
-            raw_message: BaseMessage = await chain.ainvoke(args)
             message: AIMessage = AIMessage(
                 content = raw_message.content,
                 name = self.name,
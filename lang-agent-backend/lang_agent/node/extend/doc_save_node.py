@@ -33,7 +33,8 @@ class DocSaveNode(BaseNode):
             content = complete_content(self.content, state)
             with open(self.save_path, "w", encoding="utf-8") as f:
                 f.write(content)
-            return state
+            # 不回写完整状态，避免与并行分支更新同一字段时冲突
+            return {}
         except Exception as e:
             logger.info(traceback.format_exc())
             raise e
@@ -32,11 +32,11 @@ class ExecutorNode(BaseNode):
 
     async def ainvoke(self, state: dict):
         try:
-            self.code = complete_content(self.code, state)
+            code = complete_content(self.code, state)
             pattern = r'```python\s*(.*?)\s*```'
-            match = re.search(pattern, self.code, re.DOTALL)
+            match = re.search(pattern, code, re.DOTALL)
             if match:
-                self.code = match.group(1)
+                code = match.group(1)
             else:
                 return {
                     "messages": AIMessage(
@@ -45,7 +45,7 @@ class ExecutorNode(BaseNode):
                         message_show = self.message_show
                     )
                 }
-            result = PythonREPL().run(self.code)
+            result = PythonREPL().run(code)
             return {
                 "messages": AIMessage(
                     content = result,
@@ -1 +1,2 @@
 from .checkpointer import async_checkpointer, async_checkpointer_shutdown
+from .interrupt_index import interrupt_index
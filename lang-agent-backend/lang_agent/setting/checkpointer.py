@@ -1,14 +1,65 @@
 import asyncio
+import os
 import sqlite3
-from typing import Optional
+import time
+from typing import Any, AsyncIterator, Optional
 
 import aiosqlite
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import CheckpointTuple
 from langgraph.checkpoint.sqlite import SqliteSaver
 from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
 
+from lang_agent.metrics import CHECKPOINT_SECONDS
+
 __all__ = ["async_checkpointer", "async_checkpointer_shutdown"]
 
-CHECKPOINT_PATH = "lang_agent/db/checkpoint.db"
+CHECKPOINT_PATH = os.getenv("CHECKPOINT_PATH", "lang_agent/db/checkpoint.db")
+# 多worker进程共享同一checkpoint库时，等待写锁的秒数
+SQLITE_BUSY_TIMEOUT = float(os.getenv("SQLITE_BUSY_TIMEOUT", "30"))
+
+
+class InstrumentedAsyncSqliteSaver(AsyncSqliteSaver):
+    """
+    记录checkpoint读写耗时的AsyncSqliteSaver
+    """
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        start = time.perf_counter()
+        try:
+            return await super().aget_tuple(config)
+        finally:
+            CHECKPOINT_SECONDS.observe(time.perf_counter() - start, operation="get")
+
+    async def alist(
+        self, config: Optional[RunnableConfig], **kwargs: Any
+    ) -> AsyncIterator[CheckpointTuple]:
+        start = time.perf_counter()
+        try:
+            async for item in super().alist(config, **kwargs):
+                yield item
+        finally:
+            CHECKPOINT_SECONDS.observe(time.perf_counter() - start, operation="list")
+
+    async def aput(
+        self, config: RunnableConfig, *args: Any, **kwargs: Any
+    ) -> RunnableConfig:
+        start = time.perf_counter()
+        try:
+            return await super().aput(config, *args, **kwargs)
+        finally:
+            CHECKPOINT_SECONDS.observe(time.perf_counter() - start, operation="put")
+
+    async def aput_writes(
+        self, config: RunnableConfig, *args: Any, **kwargs: Any
+    ) -> None:
+        start = time.perf_counter()
+        try:
+            return await super().aput_writes(config, *args, **kwargs)
+        finally:
+            CHECKPOINT_SECONDS.observe(
+                time.perf_counter() - start, operation="put_writes"
+            )
 
 
 class CheckpointerManager:
@@ -20,9 +71,11 @@ class CheckpointerManager:
         async with cls._lock:
             if cls._aiosqlite_conn is None:
                 cls._aiosqlite_conn = await aiosqlite.connect(
-                    CHECKPOINT_PATH, check_same_thread=False
+                    CHECKPOINT_PATH,
+                    check_same_thread=False,
+                    timeout=SQLITE_BUSY_TIMEOUT,
                 )
-            return AsyncSqliteSaver(cls._aiosqlite_conn)
+            return InstrumentedAsyncSqliteSaver(cls._aiosqlite_conn)
 
     @classmethod
     async def close_connection(cls):
@@ -32,7 +85,9 @@ class CheckpointerManager:
 
     @classmethod
     def get_sync_checkpointer(cls):
-        connection = sqlite3.connect(CHECKPOINT_PATH, check_same_thread=False)
+        connection = sqlite3.connect(
+            CHECKPOINT_PATH, check_same_thread=False, timeout=SQLITE_BUSY_TIMEOUT
+        )
         return SqliteSaver(connection)
 
 
@@ -41,6 +96,11 @@ async def async_checkpointer():
 
 
 async def async_checkpointer_shutdown():
+    from .interrupt_index import interrupt_index
+    from .response_cache import response_cache
+
+    await interrupt_index.close()
+    response_cache.close()
     await CheckpointerManager.close_connection()
 
 
@@ -0,0 +1,89 @@
+import asyncio
+import json
+from typing import Optional
+
+import aiosqlite
+
+from .checkpointer import CHECKPOINT_PATH, SQLITE_BUSY_TIMEOUT
+
+__all__ = ["InterruptIndex", "interrupt_index"]
+
+
+class InterruptIndex:
+    """
+    记录处于中断状态的会话及其恢复配置，避免每次运行前加载完整的状态快照
+    表中无记录: 新会话或已正常结束的会话，可直接运行
+    config非空: 等待恢复的中断，config为中断所在(子)图的配置
+    config为空: 状态未知(运行异常或索引建立前已存在的会话)，需读取快照判断
+    """
+
+    def __init__(self, path: str = CHECKPOINT_PATH):
+        self.path = path
+        self._conn: Optional[aiosqlite.Connection] = None
+        self._lock = asyncio.Lock()
+
+    async def _connection(self) -> aiosqlite.Connection:
+        async with self._lock:
+            if self._conn is None:
+                conn = await aiosqlite.connect(
+                    self.path, check_same_thread=False, timeout=SQLITE_BUSY_TIMEOUT
+                )
+                await self._setup(conn)
+                self._conn = conn
+            return self._conn
+
+    async def _setup(self, conn: aiosqlite.Connection):
+        async with conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' "
+            "AND name IN ('pending_interrupt', 'checkpoints')"
+        ) as cursor:
+            tables = {row[0] for row in await cursor.fetchall()}
+        await conn.execute(
+            "CREATE TABLE IF NOT EXISTS pending_interrupt ("
+            "thread_id TEXT PRIMARY KEY, config TEXT)"
+        )
+        if "pending_interrupt" not in tables and "checkpoints" in tables:
+            # 首次建立索引时，已有会话的状态未知，标记为需读取快照
+            await conn.execute(
+                "INSERT OR IGNORE INTO pending_interrupt (thread_id, config) "
+                "SELECT DISTINCT thread_id, NULL FROM checkpoints"
+            )
+        await conn.commit()
+
+    async def lookup(self, thread_id: str) -> tuple[bool, Optional[dict]]:
+        """
+        返回(是否有记录, 中断配置)
+        """
+        conn = await self._connection()
+        async with conn.execute(
+            "SELECT config FROM pending_interrupt WHERE thread_id = ?", (thread_id,)
+        ) as cursor:
+            row = await cursor.fetchone()
+        if row is None:
+            return False, None
+        return True, json.loads(row[0]) if row[0] is not None else None
+
+    async def put(self, thread_id: str, config: Optional[dict]):
+        conn = await self._connection()
+        await conn.execute(
+            "INSERT OR REPLACE INTO pending_interrupt (thread_id, config) "
+            "VALUES (?, ?)",
+            (thread_id, json.dumps(config) if config is not None else None),
+        )
+        await conn.commit()
+
+    async def remove(self, thread_id: str):
+        conn = await self._connection()
+        await conn.execute(
+            "DELETE FROM pending_interrupt WHERE thread_id = ?", (thread_id,)
+        )
+        await conn.commit()
+
+    async def close(self):
+        async with self._lock:
+            if self._conn is not None:
+                await self._conn.close()
+                self._conn = None
+
+
+interrupt_index = InterruptIndex()
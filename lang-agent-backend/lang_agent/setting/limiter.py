@@ -0,0 +1,255 @@
+import asyncio
+import math
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Optional
+
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import ChatGenerationChunk, ChatResult
+from pydantic import BaseModel, Field, PrivateAttr
+
+from lang_agent.metrics import (
+    MODEL_LIMIT_TIMEOUTS,
+    MODEL_QUEUE_DEPTH,
+    MODEL_QUEUE_WAIT_SECONDS,
+)
+
+__all__ = [
+    "LimitedChatModel",
+    "LimitedEmbeddings",
+    "ModelLimitError",
+    "ModelLimiter",
+    "ModelLimits",
+    "TokenBucket",
+]
+
+
+class ModelLimitError(Exception):
+    pass
+
+
+class ModelLimits(BaseModel):
+    """
+    模型调用限制，配置在model_args的limits字段中，如
+    {"model": "qwen", "limits": {"max_concurrency": 4, "rpm": 60, "tpm": 100000}}
+    """
+
+    max_concurrency: Optional[int] = Field(
+        default=None, gt=0, description="最大并发请求数"
+    )
+    rpm: Optional[int] = Field(default=None, gt=0, description="每分钟最大请求数")
+    tpm: Optional[int] = Field(default=None, gt=0, description="每分钟最大token数")
+    queue_timeout: float = Field(default=60, gt=0, description="排队等待的最长秒数")
+
+
+class TokenBucket:
+    """
+    令牌桶，容量为每分钟额度，按秒匀速补充
+    实际消耗超出预估时余额可以为负，后续请求需等待补足
+    """
+
+    def __init__(self, per_minute: int):
+        self.capacity = per_minute
+        self.rate = per_minute / 60
+        self.tokens = float(per_minute)
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """
+        余额足够扣除amount(超过容量时按容量计)前需要等待的秒数
+        """
+        self._refill()
+        need = min(amount, self.capacity) - self.tokens
+        return max(0.0, need / self.rate)
+
+    def take(self, amount: float):
+        self._refill()
+        self.tokens -= amount
+
+
+class ModelLimiter:
+    """
+    单个模型的并发与速率限制，使用该模型的所有节点共享
+    """
+
+    def __init__(self, name: str, limits: ModelLimits):
+        self.name = name
+        self.limits = limits
+        self.requests = TokenBucket(limits.rpm) if limits.rpm else None
+        self.tokens = TokenBucket(limits.tpm) if limits.tpm else None
+        self.waiting = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def _primitives(self) -> tuple[asyncio.Lock, Optional[asyncio.Semaphore]]:
+        # asyncio的同步原语绑定事件循环，循环变化时重新创建
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._lock = asyncio.Lock()
+            self._semaphore = (
+                asyncio.Semaphore(self.limits.max_concurrency)
+                if self.limits.max_concurrency
+                else None
+            )
+        return self._lock, self._semaphore
+
+    async def _acquire(
+        self, estimate: int, deadline: float
+    ) -> Optional[asyncio.Semaphore]:
+        lock, semaphore = self._primitives()
+        loop = asyncio.get_running_loop()
+        # 按到达顺序依次等待令牌，避免大请求被持续插队
+        async with asyncio.timeout_at(deadline):
+            async with lock:
+                while True:
+                    wait = max(
+                        self.requests.wait_time(1) if self.requests else 0,
+                        self.tokens.wait_time(estimate) if self.tokens else 0,
+                    )
+                    if wait == 0:
+                        break
+                    if loop.time() + wait > deadline:
+                        raise TimeoutError
+                    await asyncio.sleep(wait)
+                if self.requests:
+                    self.requests.take(1)
+                if self.tokens:
+                    self.tokens.take(estimate)
+            if semaphore is not None:
+                await semaphore.acquire()
+        return semaphore
+
+    @asynccontextmanager
+    async def slot(self, estimate: int = 0) -> AsyncIterator["ModelSlot"]:
+        """
+        获取一次调用的额度，estimate为预估token数，调用结束后按实际用量修正
+        """
+        start = time.perf_counter()
+        deadline = asyncio.get_running_loop().time() + self.limits.queue_timeout
+        self.waiting += 1
+        MODEL_QUEUE_DEPTH.set(self.waiting, model=self.name)
+        try:
+            semaphore = await self._acquire(estimate, deadline)
+        except TimeoutError as e:
+            MODEL_LIMIT_TIMEOUTS.inc(model=self.name)
+            raise ModelLimitError(f"Model [{self.name}] Queue Timeout") from e
+        finally:
+            self.waiting -= 1
+            MODEL_QUEUE_DEPTH.set(self.waiting, model=self.name)
+            MODEL_QUEUE_WAIT_SECONDS.observe(
+                time.perf_counter() - start, model=self.name
+            )
+        slot = ModelSlot(estimate)
+        try:
+            yield slot
+        finally:
+            if semaphore is not None:
+                semaphore.release()
+            if self.tokens and slot.used is not None:
+                self.tokens.take(slot.used - estimate)
+
+
+class ModelSlot:
+    def __init__(self, estimate: int):
+        self.estimate = estimate
+        self.used: Optional[int] = None
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    粗略估算token数，约4个字符一个token
+    """
+    return math.ceil(len(text) / 4)
+
+
+def _usage_tokens(message: Any) -> Optional[int]:
+    usage = getattr(message, "usage_metadata", None)
+    if usage:
+        return usage.get("input_tokens", 0) + usage.get("output_tokens", 0)
+    return None
+
+
+class LimitedChatModel(BaseModel):
+    """
+    对话模型混入类，调用上游前按ModelLimiter排队
+    """
+
+    _limiter: Optional[ModelLimiter] = PrivateAttr(default=None)
+
+    def _estimate(self, messages: list[BaseMessage]) -> int:
+        return estimate_tokens("".join(str(m.content) for m in messages))
+
+    async def _agenerate(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        if self._limiter is None:
+            return await super()._agenerate(
+                messages, stop=stop, run_manager=run_manager, **kwargs
+            )
+        async with self._limiter.slot(self._estimate(messages)) as slot:
+            result = await super()._agenerate(
+                messages, stop=stop, run_manager=run_manager, **kwargs
+            )
+            used = [_usage_tokens(g.message) for g in result.generations]
+            if used and None not in used:
+                slot.used = sum(used)
+            return result
+
+    async def _astream(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        if self._limiter is None:
+            async for chunk in super()._astream(
+                messages, stop=stop, run_manager=run_manager, **kwargs
+            ):
+                yield chunk
+            return
+        estimate = self._estimate(messages)
+        async with self._limiter.slot(estimate) as slot:
+            output = 0
+            async for chunk in super()._astream(
+                messages, stop=stop, run_manager=run_manager, **kwargs
+            ):
+                used = _usage_tokens(chunk.message)
+                if used is not None:
+                    slot.used = (slot.used or 0) + used
+                output += estimate_tokens(str(chunk.message.content))
+                yield chunk
+            if slot.used is None:
+                slot.used = estimate + output
+
+
+class LimitedEmbeddings(BaseModel):
+    """
+    Embedding模型混入类，调用上游前按ModelLimiter排队
+    """
+
+    _limiter: Optional[ModelLimiter] = PrivateAttr(default=None)
+
+    async def aembed_documents(
+        self, texts: list[str], chunk_size: Optional[int] = None, **kwargs: Any
+    ) -> list[list[float]]:
+        if self._limiter is None:
+            return await super().aembed_documents(
+                texts, chunk_size=chunk_size, **kwargs
+            )
+        async with self._limiter.slot(estimate_tokens("".join(texts))):
+            return await super().aembed_documents(
+                texts, chunk_size=chunk_size, **kwargs
+            )
@@ -1,6 +1,9 @@
+import asyncio
 import traceback
 import json
 import os
+import time
+from functools import lru_cache
 from typing import Any, Dict, List
 
 from langchain_core.tools import BaseTool
@@ -11,6 +14,18 @@ from langchain_openai import ChatOpenAI, OpenAIEmbeddings
 from lang_agent.db.models import Mcp, Model, ModelType, VectorStore
 from lang_agent.logger import get_logger
 
+from .response_cache import LLM_CACHE_ENABLED, response_cache
+from .model_group import ModelGroup
+from .limiter import LimitedChatModel, LimitedEmbeddings, ModelLimiter, ModelLimits
+from .mcp_pool import MCP_SESSION_POOL, McpPoolConfig, McpSessionPool
+from .startup import ResourceStartup
+from .tool_limiter import ToolLimiter, ToolLimits
+from .single_flight import (
+    MODEL_SINGLE_FLIGHT,
+    SingleFlightChatModel,
+    SingleFlightEmbeddings,
+)
+
 logger = get_logger(__name__)
 
 
@@ -18,26 +33,100 @@ class ResourceInitializationError(Exception):
     pass
 
 
+@lru_cache(maxsize=None)
+def _compose(cls: type, mixins: tuple[type, ...]) -> type:
+    return type(cls.__name__, (*mixins, cls), {"__module__": cls.__module__})
+
+
 class ResourceManager:
     def __init__(self):
         self.models = {model_type.value: {} for model_type in ModelType}
         self.mcp_map: Dict[str, Dict[str, BaseTool]] = {}
+        self.mcp_pools: Dict[str, McpSessionPool] = {}
+        self.startup = ResourceStartup(
+            timeout=float(os.getenv("RESOURCE_INIT_TIMEOUT", "60"))
+        )
         self.vectorstore_map: Dict[str, VS] = {}
+        # 资源版本号，模型、MCP、向量库发生变更时递增，用于失效已编译图缓存
+        self.version = 0
 
-    def init_models(self):
-        from lang_agent.db.database import list_available_models
+    def touch(self):
+        self.version += 1
 
+    async def init_resources(self):
+        """
+        并发初始化全部资源，单个资源超时或失败不影响其它资源，结束后输出启动报告
+        模型无IO，先行构造；向量库依赖Embedding模型，与MCP并发初始化
+        """
+        startup = self.startup
+        startup.started = time.perf_counter()
+        # 初始化中途出错时也结束启动过程，避免就绪检查一直等待
+        try:
+            await self._init_resources(startup)
+        finally:
+            startup.finished = time.perf_counter()
+            self.touch()
+            startup.log_report()
+
+    async def _init_resources(self, startup: ResourceStartup):
+        from lang_agent.db.database import (
+            list_available_mcps,
+            list_available_models,
+            list_available_vectorstores,
+        )
+
+        mcps: List[Mcp] = list_available_mcps()
         model_list: List[Model] = list_available_models()
-        for model in model_list:
-            try:
-                self.models[model.type][model.name] = self.init_model(model)
-            except ResourceInitializationError:
-                logger.error(
-                    "Initialize Model [%s] Failed: \n %s",
-                    model.name,
-                    traceback.format_exc()
-                )
-                continue
+        vectorstore_list: List[VectorStore] = list_available_vectorstores()
+        for mcp in mcps:
+            startup.begin("mcp", mcp.name)
+        for vectorstore in vectorstore_list:
+            startup.begin("vectorstore", vectorstore.name)
+
+        # 路由组引用其它模型，放在最后初始化
+        for model in sorted(model_list, key=lambda m: m.channel == "group"):
+            llm = startup.run_sync("model", model.name, lambda: self.init_model(model))
+            if llm is not None:
+                self.models[model.type][model.name] = llm
+
+        async def init_mcp(mcp: Mcp):
+            tools_map = await startup.run("mcp", mcp.name, lambda: self.init_mcp(mcp))
+            if tools_map is not None:
+                self.mcp_map[mcp.name] = tools_map
+
+        async def init_vectorstore(vectorstore: VectorStore):
+            vs = await startup.run(
+                "vectorstore",
+                vectorstore.name,
+                lambda: asyncio.to_thread(self.init_vectorstore, vectorstore),
+            )
+            if vs is not None:
+                self.vectorstore_map[vectorstore.name] = vs
+
+        await asyncio.gather(
+            *(init_mcp(mcp) for mcp in mcps),
+            *(init_vectorstore(vectorstore) for vectorstore in vectorstore_list),
+        )
+
+    @staticmethod
+    def _model_class(cls: type, single_flight: type, limited: type) -> type:
+        """
+        返回混入了请求合并与调用限制的模型类，相同请求合并后只占用一次额度
+        """
+        mixins = (single_flight, limited) if MODEL_SINGLE_FLIGHT else (limited,)
+        return _compose(cls, mixins)
+
+    @staticmethod
+    def _limiter(name: str, args: dict) -> ModelLimiter | None:
+        limits = args.pop("limits", None)
+        if not limits:
+            return None
+        try:
+            return ModelLimiter(name, ModelLimits(**limits))
+        except (TypeError, ValueError) as e:
+            raise ResourceInitializationError(
+                f"Invalid limits for {name}"
+            ) from e
 
     def init_model(self, model: Model) -> Any:
         try:
@@ -46,38 +135,50 @@ class ResourceManager:
             raise ResourceInitializationError(
                 f"Invalid arguments for {model.name}"
             ) from je
+        limiter = self._limiter(model.name, args)
         match model.type:
             case ModelType.LLM.value | ModelType.VLM.value:
+                if model.channel == "group":
+                    # 路由组的limits限制整个组的调用，成员模型的limits仍各自生效
+                    try:
+                        group = _compose(ModelGroup, (LimitedChatModel,))(
+                            name=model.name, model_type=model.type, **args
+                        )
+                    except (TypeError, ValueError) as e:
+                        raise ResourceInitializationError(
+                            f"Invalid arguments for {model.name}"
+                        ) from e
+                    group._limiter = limiter
+                    return group
                 if model.channel == "openai":
-                    return ChatOpenAI(**args)
+                    # 模型参数中的cache为false时该模型不使用响应缓存
+                    if args.pop("cache", True) and LLM_CACHE_ENABLED:
+                        args["cache"] = response_cache
+                    llm = self._model_class(
+                        ChatOpenAI, SingleFlightChatModel, LimitedChatModel
+                    )(**args)
+                    llm._limiter = limiter
+                    return llm
                 raise ResourceInitializationError(
                     f"Unsupported LLM channel: {model.channel} for {model.name}"
                 )
             case ModelType.EMBEDDING.value:
                 if model.channel == "openai":
-                    return OpenAIEmbeddings(
+                    embedding = self._model_class(
+                        OpenAIEmbeddings, SingleFlightEmbeddings, LimitedEmbeddings
+                    )(
                         tiktoken_enabled=False,
                         tiktoken_model_name="BEE-spoke-data/cl100k_base",
                         **args
                     )
+                    embedding._limiter = limiter
+                    return embedding
                 raise ResourceInitializationError(
                     f"Unsupported LLM channel: {model.channel} for {model.name}"
                 )
             case _:
                 raise ResourceInitializationError(f"Unknown Model Type: {model.type}")
 
-    async def init_mcp_map(self):
-        from lang_agent.db.database import list_available_mcps
-
-        mcps: List[Mcp] = list_available_mcps()
-        for mcp in mcps:
-            try:
-                tools_map = await self.init_mcp(mcp)
-                self.mcp_map[mcp.name] = tools_map
-            except ResourceInitializationError:
-                continue
-        logger.info("Initialize MCP Success: %s", self.mcp_map)
-
     async def init_mcp(self, mcp: Mcp) -> Dict[str, BaseTool]:
         try:
             mcp_args = json.loads(mcp.mcp_args)
@@ -86,34 +187,102 @@ class ResourceManager:
                 f"Invalid arguments for {mcp.name}"
             ) from je
         try:
-            tools: List[BaseTool] = await load_mcp_tools(
-                session=None, connection=mcp_args
-            )
-            return {tool.name: tool for tool in tools}
-        except ExceptionGroup as e:
+            limits = ToolLimits(**mcp_args.pop("limits", None) or {})
+            limiter = ToolLimiter(mcp.name, limits)
+            pool_args = mcp_args.pop("pool", {})
+            pool_config = McpPoolConfig(**pool_args) if pool_args is not False else None
+        except (TypeError, ValueError) as e:
+            raise ResourceInitializationError(
+                f"Invalid limits for {mcp.name}"
+            ) from e
+        # 重新初始化时先关闭旧的会话池
+        await self.close_mcp_pool(mcp.name)
+        pool = None
+        if MCP_SESSION_POOL and pool_config is not None:
+            pool = McpSessionPool(mcp.name, mcp_args, pool_config)
+        try:
+            try:
+                if pool is not None:
+                    await pool.start()
+                tools: List[BaseTool] = await load_mcp_tools(
+                    session=pool, connection=mcp_args, server_name=mcp.name
+                )
+            except BaseException:
+                # 包括启动超时导致的取消，关闭已启动的会话与健康检查任务，避免子进程泄漏
+                if pool is not None:
+                    await pool.close()
+                raise
+        except Exception as e:
             logger.error(
                 "Initialize MCP [%s] Error: \n %s", mcp.name, traceback.format_exc()
             )
             raise ResourceInitializationError(f"Failed to initialize {mcp.name}") from e
+        if pool is not None:
+            self.mcp_pools[mcp.name] = pool
+        return {tool.name: limiter.wrap(tool) for tool in tools}
 
-    def init_vectorstore_map(self):
-        from lang_agent.db.database import list_available_vectorstores
+    async def close_mcp_pool(self, name: str):
+        pool = self.mcp_pools.pop(name, None)
+        if pool is not None:
+            await pool.close()
 
-        vectorstore_list: List[VectorStore] = list_available_vectorstores()
-        for vectorstore in vectorstore_list:
+    def remove_mcp(self, name: str):
+        """
+        移除MCP的工具，会话池在当前事件循环中后台关闭
+        """
+        self.mcp_map.pop(name, None)
+        pool = self.mcp_pools.pop(name, None)
+        if pool is not None:
+            asyncio.get_running_loop().create_task(pool.close())
+
+    async def close_mcps(self):
+        await asyncio.gather(
+            *(self.close_mcp_pool(name) for name in list(self.mcp_pools))
+        )
+
+    def reload_model(self, name: str):
+        """
+        按数据库中的最新配置重新加载模型，模型已删除或禁用时移除
+        """
+        from lang_agent.db.database import select_model_by_name
+
+        for models in self.models.values():
+            models.pop(name, None)
+        model: Model = select_model_by_name(name)
+        if model is not None and not model.disabled:
             try:
-                vs = self.init_vectorstore(
-                        vectorstore
-                    )
-                if vs is not None:
-                    self.vectorstore_map[vectorstore.name] = vs
+                self.models[model.type][model.name] = self.init_model(model)
             except ResourceInitializationError:
                 logger.error(
-                    "Initialize VectorStore [%s] Failed: \n %s",
-                    vectorstore.name,
-                    traceback.format_exc()
+                    "Reload Model [%s] Failed: \n %s", name, traceback.format_exc()
                 )
-                continue
+        self.touch()
+
+    async def reload_mcp(self, name: str):
+        from lang_agent.db.database import select_mcp_by_name
+
+        self.mcp_map.pop(name, None)
+        await self.close_mcp_pool(name)
+        mcp: Mcp = select_mcp_by_name(name)
+        if mcp is not None and not mcp.disabled:
+            try:
+                self.mcp_map[mcp.name] = await self.init_mcp(mcp)
+            except ResourceInitializationError:
+                logger.error(
+                    "Reload MCP [%s] Failed: \n %s", name, traceback.format_exc()
+                )
+        self.touch()
+
+    def reload_vectorstore(self, name: str):
+        from lang_agent.db.database import select_vectorstore_by_name
+
+        self.vectorstore_map.pop(name, None)
+        vectorstore: VectorStore = select_vectorstore_by_name(name)
+        if vectorstore is not None and not vectorstore.disabled:
+            vs = self.init_vectorstore(vectorstore)
+            if vs is not None:
+                self.vectorstore_map[vectorstore.name] = vs
+        self.touch()
 
     def init_vectorstore(self, vectorstore: VectorStore) -> VS:
         if vectorstore.embedding_name not in self.models.get("embedding", {}):
@@ -0,0 +1,261 @@
+import asyncio
+import os
+import time
+import traceback
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Optional
+
+import anyio
+from langchain_mcp_adapters.sessions import create_session
+from mcp import ClientSession
+from mcp.shared.exceptions import McpError
+from mcp.types import CONNECTION_CLOSED
+from pydantic import BaseModel, Field
+
+from lang_agent.logger import get_logger
+from lang_agent.metrics import MCP_SESSION_RESTARTS
+
+__all__ = ["MCP_SESSION_POOL", "McpPoolConfig", "McpSessionPool"]
+
+logger = get_logger(__name__)
+
+MCP_SESSION_POOL = os.getenv("MCP_SESSION_POOL", "true").lower() == "true"
+
+
+class McpPoolError(Exception):
+    pass
+
+
+class McpPoolConfig(BaseModel):
+    """
+    MCP会话池配置，配置在mcp_args的pool字段中，如
+    {"transport": "stdio", "command": "npx", "args": [...], "pool": {"max_sessions": 2}}
+    pool为false时该MCP不使用会话池，每次调用新建连接
+    """
+
+    max_sessions: int = Field(
+        default=4, gt=0, description="最大会话数(stdio为最大子进程数)"
+    )
+    min_sessions: int = Field(default=1, ge=0, description="保持预热的最少会话数")
+    acquire_timeout: float = Field(
+        default=30, gt=0, description="等待空闲会话的最长秒数"
+    )
+    health_interval: float = Field(
+        default=30, ge=0, description="空闲会话健康检查间隔(秒)，0表示不检查"
+    )
+    ping_timeout: float = Field(default=5, gt=0, description="健康检查的超时秒数")
+
+
+class PooledSession:
+    """
+    常驻的MCP会话，连接在独立任务中建立与关闭，满足anyio作用域必须在同一任务中进出的要求
+    """
+
+    def __init__(self, connection: dict):
+        self.connection = connection
+        self.session: Optional[ClientSession] = None
+        self._ready = asyncio.Event()
+        self._closing = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._error: Optional[BaseException] = None
+
+    async def open(self, timeout: float):
+        self._task = asyncio.create_task(self._run())
+        try:
+            async with asyncio.timeout(timeout):
+                await self._ready.wait()
+        except BaseException:
+            await self.close()
+            raise
+        if self._error is not None:
+            raise self._error
+
+    async def _run(self):
+        try:
+            async with create_session(self.connection) as session:
+                await session.initialize()
+                self.session = session
+                self._ready.set()
+                await self._closing.wait()
+        except Exception as e:
+            self._error = e
+        finally:
+            self.session = None
+            self._ready.set()
+
+    @property
+    def alive(self) -> bool:
+        return self.session is not None and not self._closing.is_set()
+
+    async def close(self):
+        self._closing.set()
+        if self._task is not None:
+            await asyncio.gather(self._task, return_exceptions=True)
+
+
+class McpSessionPool:
+    """
+    单个MCP的会话池，可作为session传给load_mcp_tools，工具调用时从池中取出空闲会话
+    - 会话按需创建，总数不超过max_sessions，超过时排队等待
+    - 传输层出错的会话被关闭，下次调用时重新建立
+    - 后台定期ping空闲会话，移除失效会话并补足min_sessions
+    """
+
+    def __init__(
+        self, name: str, connection: dict, config: Optional[McpPoolConfig] = None
+    ):
+        self.name = name
+        self.connection = connection
+        self.config = config or McpPoolConfig()
+        self.restarts = 0
+        self._idle: deque[PooledSession] = deque()
+        self._in_use = 0
+        self._semaphore = asyncio.Semaphore(self.config.max_sessions)
+        self._health_task: Optional[asyncio.Task] = None
+        self._closed = False
+
+    async def start(self):
+        await self._fill()
+        if self.config.health_interval > 0:
+            self._health_task = asyncio.create_task(self._health_loop())
+
+    async def _open(self) -> PooledSession:
+        session = PooledSession(self.connection)
+        start = time.perf_counter()
+        await session.open(self.config.acquire_timeout)
+        logger.info(
+            "Open MCP [%s] Session In %.2fs", self.name, time.perf_counter() - start
+        )
+        return session
+
+    async def _fill(self):
+        missing = self.config.min_sessions - len(self._idle) - self._in_use
+        if missing <= 0:
+            return
+        results = await asyncio.gather(
+            *(self._open() for _ in range(missing)), return_exceptions=True
+        )
+        opened = [r for r in results if isinstance(r, PooledSession)]
+        errors = [r for r in results if not isinstance(r, PooledSession)]
+        if errors:
+            # 部分会话打开失败时关闭已打开的会话，避免遗留子进程
+            await asyncio.gather(*(pooled.close() for pooled in opened))
+            raise McpPoolError(f"Open MCP [{self.name}] Session Failed") from errors[0]
+        self._idle.extend(opened)
+
+    def _full(self) -> bool:
+        return len(self._idle) + self._in_use >= self.config.max_sessions
+
+    @asynccontextmanager
+    async def session(self) -> AsyncIterator[ClientSession]:
+        if self._closed:
+            raise McpPoolError(f"MCP [{self.name}] Session Pool Closed")
+        try:
+            async with asyncio.timeout(self.config.acquire_timeout):
+                await self._semaphore.acquire()
+        except TimeoutError as e:
+            raise McpPoolError(f"MCP [{self.name}] Session Pool Exhausted") from e
+        self._in_use += 1
+        pooled: Optional[PooledSession] = None
+        broken = False
+        try:
+            while self._idle and pooled is None:
+                candidate = self._idle.pop()
+                if candidate.alive:
+                    pooled = candidate
+                else:
+                    await candidate.close()
+            if pooled is None:
+                pooled = await self._open()
+            yield pooled.session
+        except McpError as e:
+            # 服务端返回的错误不影响会话本身，连接断开除外
+            broken = e.error.code == CONNECTION_CLOSED
+            raise
+        except asyncio.CancelledError:
+            raise
+        except BaseException:
+            broken = True
+            raise
+        finally:
+            self._in_use -= 1
+            self._semaphore.release()
+            if pooled is not None:
+                if broken or not pooled.alive or self._closed or self._full():
+                    if broken:
+                        self.restarts += 1
+                        MCP_SESSION_RESTARTS.inc(mcp=self.name)
+                        logger.warning(
+                            "MCP [%s] Session Broken, Restart On Next Call", self.name
+                        )
+                    await pooled.close()
+                else:
+                    self._idle.append(pooled)
+
+    async def _request(self, method: str, *args: Any, **kwargs: Any) -> Any:
+        # 请求未能发出(连接已关闭)时换一个会话重试一次，已发出的请求不重试
+        for attempt in range(2):
+            try:
+                async with self.session() as session:
+                    return await getattr(session, method)(*args, **kwargs)
+            except (anyio.ClosedResourceError, anyio.BrokenResourceError):
+                if attempt:
+                    raise
+
+    async def list_tools(self, cursor: Optional[str] = None) -> Any:
+        return await self._request("list_tools", cursor=cursor)
+
+    async def call_tool(
+        self, name: str, arguments: Optional[dict] = None, **kwargs: Any
+    ) -> Any:
+        return await self._request("call_tool", name, arguments, **kwargs)
+
+    async def _check(self):
+        checked = len(self._idle)
+        for _ in range(checked):
+            if not self._idle:
+                break
+            pooled = self._idle.popleft()
+            try:
+                async with asyncio.timeout(self.config.ping_timeout):
+                    await pooled.session.send_ping()
+                if self._full():
+                    await pooled.close()
+                else:
+                    self._idle.append(pooled)
+            except Exception:
+                self.restarts += 1
+                MCP_SESSION_RESTARTS.inc(mcp=self.name)
+                logger.warning("MCP [%s] Session Health Check Failed", self.name)
+                await pooled.close()
+        await self._fill()
+
+    async def _health_loop(self):
+        while True:
+            await asyncio.sleep(self.config.health_interval)
+            try:
+                await self._check()
+            except Exception:
+                logger.error(
+                    "MCP [%s] Health Check Failed: \n %s",
+                    self.name,
+                    traceback.format_exc(),
+                )
+
+    async def close(self):
+        self._closed = True
+        if self._health_task is not None:
+            self._health_task.cancel()
+            await asyncio.gather(self._health_task, return_exceptions=True)
+            self._health_task = None
+        idle, self._idle = list(self._idle), deque()
+        await asyncio.gather(*(pooled.close() for pooled in idle))
+
+    def stats(self) -> dict:
+        return {
+            "idle": len(self._idle),
+            "in_use": self._in_use,
+            "max_sessions": self.config.max_sessions,
+            "restarts": self.restarts,
+        }
@@ -0,0 +1,266 @@
+import asyncio
+import time
+import traceback
+from collections import deque
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional, Sequence
+
+from langchain_core.callbacks import (
+    AsyncCallbackManager,
+    AsyncCallbackManagerForLLMRun,
+    CallbackManager,
+    CallbackManagerForLLMRun,
+)
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from pydantic import Field, PrivateAttr
+
+from lang_agent.logger import get_logger
+from lang_agent.metrics import MODEL_FALLBACKS, MODEL_HEDGES
+
+from .response_cache import without_cache
+
+__all__ = ["ModelGroup"]
+
+logger = get_logger(__name__)
+
+
+class ModelGroup(BaseChatModel):
+    """
+    模型路由组，渠道为group的模型，model_args如
+    {"models": ["qwen-a", "qwen-b"], "hedge_delay": 2, "hedge_percentile": 95}
+    - 先请求首个模型，超过对冲延迟仍未返回时向下一个模型发起对冲请求，取最先返回的结果
+    - 对冲延迟取首个模型近期耗时的分位数，样本不足时使用hedge_delay
+    - 请求失败时依次降级到后续模型，全部失败时抛出最后一个异常
+    成员模型在调用时按名称从ResourceManager获取，成员重新加载后无需重建路由组
+    """
+
+    name: str = Field(..., description="路由组名称")
+    model_type: str = Field(default="llm", description="成员模型类型")
+    models: list[str] = Field(
+        ..., min_length=1, description="成员模型名称，按优先级排列"
+    )
+    hedge_delay: float = Field(
+        default=2.0, gt=0, description="耗时样本不足时的对冲延迟(秒)"
+    )
+    hedge_percentile: float = Field(
+        default=95, gt=0, le=100, description="对冲延迟取首个模型耗时的分位数"
+    )
+    min_samples: int = Field(
+        default=20, ge=1, description="按分位数计算对冲延迟所需的最少样本数"
+    )
+    max_parallel: int = Field(
+        default=2, ge=1, description="同时进行的最大请求数，1表示只做失败降级"
+    )
+    no_cache: bool = Field(
+        default=False, description="成员模型不使用响应缓存，由without_cache设置"
+    )
+    _latencies: dict[str, deque] = PrivateAttr(default_factory=dict)
+
+    @property
+    def _llm_type(self) -> str:
+        return "model-group"
+
+    def _get_ls_params(self, stop: Optional[list[str]] = None, **kwargs: Any) -> dict:
+        params = super()._get_ls_params(stop=stop, **kwargs)
+        params["ls_model_name"] = self.name
+        return params
+
+    def _members(self) -> list[tuple[str, BaseChatModel]]:
+        from .manager import resource_manager
+
+        available = resource_manager.models.get(self.model_type, {})
+        members = [(name, available[name]) for name in self.models if name in available]
+        if not members:
+            raise ValueError(f"No Available Model In Group [{self.name}]")
+        if self.no_cache:
+            members = [(name, without_cache(model)) for name, model in members]
+        return members
+
+    def bind_tools(self, tools: Sequence[Any], **kwargs: Any):
+        # 成员均为OpenAI兼容模型，由首个成员转换工具格式后绑定到路由组
+        _, primary = self._members()[0]
+        bound = primary.bind_tools(tools, **kwargs)
+        return self.bind(**bound.kwargs)
+
+    def _record(self, key: str, seconds: float):
+        samples = self._latencies.setdefault(key, deque(maxlen=200))
+        samples.append(seconds)
+
+    def _delay(self, key: str) -> float:
+        samples = self._latencies.get(key)
+        if not samples or len(samples) < self.min_samples:
+            return self.hedge_delay
+        ordered = sorted(samples)
+        index = min(len(ordered) - 1, int(len(ordered) * self.hedge_percentile / 100))
+        return ordered[index]
+
+    async def _race(
+        self,
+        members: list[tuple[str, BaseChatModel]],
+        call: Callable[[str, BaseChatModel], Awaitable[Any]],
+        mode: str,
+        discard: Optional[Callable[[Any], Awaitable[None]]] = None,
+    ) -> Any:
+        """
+        mode区分完整调用与流式调用，两者分别统计耗时(流式为首个分片的耗时)
+        """
+        delay = self._delay(f"{mode}:{members[0][0]}")
+        pending: dict[asyncio.Task, str] = {}
+        launched = 0
+        error: Optional[BaseException] = None
+
+        async def timed(name: str, model: BaseChatModel):
+            start = time.perf_counter()
+            result = await call(name, model)
+            self._record(f"{mode}:{name}", time.perf_counter() - start)
+            return result
+
+        def launch():
+            nonlocal launched
+            name, model = members[launched]
+            pending[asyncio.ensure_future(timed(name, model))] = name
+            launched += 1
+
+        launch()
+        try:
+            while pending:
+                can_hedge = launched < len(members) and len(pending) < self.max_parallel
+                done, _ = await asyncio.wait(
+                    pending,
+                    timeout=delay if can_hedge else None,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if not done:
+                    MODEL_HEDGES.inc(group=self.name, model=members[launched][0])
+                    launch()
+                    continue
+                for task in done:
+                    name = pending.pop(task)
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+                    logger.warning(
+                        "Model [%s] In Group [%s] Failed: %s", name, self.name, error
+                    )
+                    if launched < len(members):
+                        MODEL_FALLBACKS.inc(group=self.name, model=members[launched][0])
+                        launch()
+            raise error
+        finally:
+            for task in pending:
+                if not task.done():
+                    # 被取消的调用仍可能以异常结束，结束时取回异常
+                    task.add_done_callback(_retrieve)
+                    task.cancel()
+                elif task.cancelled() or task.exception() is not None:
+                    continue
+                elif discard is not None:
+                    await discard(task.result())
+
+    async def _agenerate(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        callbacks = _member_callbacks(AsyncCallbackManager, run_manager)
+
+        async def call(name: str, model: BaseChatModel) -> AIMessage:
+            return await model.ainvoke(
+                messages, config={"callbacks": callbacks}, stop=stop, **kwargs
+            )
+
+        message = await self._race(self._members(), call, "generate")
+        return _group_result(message)
+
+    def _generate(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        # 同步调用只做失败降级
+        callbacks = _member_callbacks(CallbackManager, run_manager)
+        error = None
+        for name, model in self._members():
+            try:
+                message = model.invoke(
+                    messages, config={"callbacks": callbacks}, stop=stop, **kwargs
+                )
+                return _group_result(message)
+            except Exception as e:
+                error = e
+                logger.warning(
+                    "Model [%s] In Group [%s] Failed: \n %s",
+                    name,
+                    self.name,
+                    traceback.format_exc(),
+                )
+        raise error
+
+    async def _astream(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        """
+        以首个分片的到达时间对冲，开始输出后不再切换模型
+        """
+
+        async def call(name: str, model: BaseChatModel):
+            stream = model.astream(messages, stop=stop, **kwargs)
+            try:
+                return stream, await anext(stream)
+            except BaseException:
+                await stream.aclose()
+                raise
+
+        async def discard(result):
+            await result[0].aclose()
+
+        stream, first = await self._race(self._members(), call, "stream", discard)
+        try:
+            yield _group_chunk(first)
+            async for chunk in stream:
+                yield _group_chunk(chunk)
+        finally:
+            await stream.aclose()
+
+
+def _member_callbacks(manager_class: type, run_manager) -> Any:
+    """
+    成员模型的调用作为路由组调用的子运行，继承其回调、标签与元数据
+    """
+    if run_manager is None:
+        return None
+    return manager_class(
+        handlers=run_manager.inheritable_handlers,
+        inheritable_handlers=run_manager.inheritable_handlers,
+        parent_run_id=run_manager.run_id,
+        tags=run_manager.inheritable_tags,
+        inheritable_tags=run_manager.inheritable_tags,
+        metadata=run_manager.inheritable_metadata,
+        inheritable_metadata=run_manager.inheritable_metadata,
+    )
+
+
+def _group_result(message: AIMessage) -> ChatResult:
+    # token消耗已记录在成员模型的调用上，路由组不再重复计算
+    message = message.model_copy(update={"usage_metadata": None, "id": None})
+    return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+def _group_chunk(chunk) -> ChatGenerationChunk:
+    # 流式调用不向成员模型传递回调，token消耗随分片记录在路由组上
+    return ChatGenerationChunk(message=chunk.model_copy(update={"id": None}))
+
+
+def _retrieve(task: asyncio.Task):
+    # 取回落后调用的异常，避免事件循环报告Task exception was never retrieved
+    if not task.cancelled():
+        task.exception()
@@ -0,0 +1,231 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Optional
+
+from langchain_core.caches import RETURN_VAL_TYPE, BaseCache
+from langchain_core.messages import message_to_dict, messages_from_dict
+from langchain_core.outputs import ChatGeneration, Generation
+
+from lang_agent.logger import get_logger
+
+__all__ = ["ResponseCache", "response_cache", "without_cache"]
+
+logger = get_logger(__name__)
+
+# 命中缓存的消息在response_metadata中带有该标记
+CACHED_FLAG = "cached"
+
+
+class ResponseCache(BaseCache):
+    """
+    基于本地SQLite文件的模型响应缓存
+    - 键为模型配置(模型名称、参数、绑定的工具等)与渲染后消息的摘要，精确匹配
+    - 超过ttl秒的条目视为过期，条目数或总字节数超限时按最近访问时间淘汰
+    """
+
+    def __init__(
+        self,
+        path: str,
+        ttl: float = 86400,
+        max_entries: int = 10000,
+        max_bytes: int = 256 * 2**20,
+    ):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(prompt: str, llm_string: str) -> str:
+        raw = f"{llm_string}\x00{prompt}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_response_cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, "
+                "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_llm_response_cache_accessed "
+                "ON llm_response_cache (accessed_at)"
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        key = self.make_key(prompt, llm_string)
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute(
+                "SELECT value, created_at FROM llm_response_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and now - row[1] > self.ttl:
+                conn.execute("DELETE FROM llm_response_cache WHERE key = ?", (key,))
+                conn.commit()
+                self.evictions += 1
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            conn.execute(
+                "UPDATE llm_response_cache SET accessed_at = ? WHERE key = ?",
+                (now, key),
+            )
+            conn.commit()
+        try:
+            generations = _loads(row[0])
+        except Exception:
+            logger.warning("Invalid Cached Response Dropped: %s", key)
+            self._delete(key)
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        for generation in generations:
+            message = getattr(generation, "message", None)
+            if message is not None:
+                message.response_metadata[CACHED_FLAG] = True
+        return generations
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE):
+        key = self.make_key(prompt, llm_string)
+        value = _dumps(return_val)
+        size = len(value.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_response_cache "
+                "(key, value, size, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, value, size, now, now),
+            )
+            self._evict(conn, now)
+            conn.commit()
+
+    def _evict(self, conn: sqlite3.Connection, now: float):
+        expired = conn.execute(
+            "DELETE FROM llm_response_cache WHERE created_at < ?", (now - self.ttl,)
+        ).rowcount
+        count, total = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_response_cache"
+        ).fetchone()
+        removed = 0
+        if count > self.max_entries or total > self.max_bytes:
+            # 按最近访问时间从旧到新淘汰，直到条目数与总大小都不超限
+            rows = conn.execute(
+                "SELECT key, size FROM llm_response_cache ORDER BY accessed_at"
+            )
+            keys = []
+            for key, size in rows:
+                if count <= self.max_entries and total <= self.max_bytes:
+                    break
+                keys.append((key,))
+                count -= 1
+                total -= size
+            conn.executemany("DELETE FROM llm_response_cache WHERE key = ?", keys)
+            removed = len(keys)
+        self.evictions += expired + removed
+
+    def _delete(self, key: str):
+        with self._lock:
+            conn = self._connection()
+            conn.execute("DELETE FROM llm_response_cache WHERE key = ?", (key,))
+            conn.commit()
+
+    def clear(self, **kwargs: Any):
+        with self._lock:
+            conn = self._connection()
+            conn.execute("DELETE FROM llm_response_cache")
+            conn.commit()
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            entries = size = 0
+            if self._conn is not None:
+                entries, size = self._conn.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_response_cache"
+                ).fetchone()
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": entries,
+                "bytes": size,
+            }
+
+
+def _dumps(generations: RETURN_VAL_TYPE) -> str:
+    items = []
+    for generation in generations:
+        item = {"text": generation.text, "generation_info": generation.generation_info}
+        if isinstance(generation, ChatGeneration):
+            item["message"] = message_to_dict(generation.message)
+        items.append(item)
+    return json.dumps(items, ensure_ascii=False, default=str)
+
+
+def _loads(value: str) -> list[Generation]:
+    generations = []
+    for item in json.loads(value):
+        if "message" in item:
+            message = messages_from_dict([item["message"]])[0]
+            generations.append(
+                ChatGeneration(message=message, generation_info=item["generation_info"])
+            )
+        else:
+            generations.append(
+                Generation(text=item["text"], generation_info=item["generation_info"])
+            )
+    return generations
+
+
+def without_cache(model: Any) -> Any:
+    """
+    返回不使用响应缓存的模型副本，用于关闭了缓存的节点
+    模型路由组设置no_cache，由其在调用时对成员模型关闭缓存
+    """
+    if getattr(model, "no_cache", None) is False:
+        return model.model_copy(update={"no_cache": True})
+    if isinstance(getattr(model, "cache", None), BaseCache):
+        return model.model_copy(update={"cache": False})
+    return model
+
+
+# 默认关闭，设置LLM_CACHE_ENABLED=true后ResourceManager构建的对话模型使用该缓存
+LLM_CACHE_ENABLED = (
+    os.getenv("LLM_CACHE_ENABLED", "false").lower() in ("1", "true", "yes")
+)
+
+response_cache = ResponseCache(
+    path=os.getenv("LLM_CACHE_PATH", "lang_agent/db/llm_cache.db"),
+    ttl=float(os.getenv("LLM_CACHE_TTL", "86400")),
+    max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", "10000")),
+    max_bytes=int(float(os.getenv("LLM_CACHE_MAX_MB", "256")) * 2**20),
+)
@@ -0,0 +1,206 @@
+import asyncio
+import copy
+import json
+import os
+from typing import Any, AsyncIterator, Awaitable, Callable, Hashable, Optional
+
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun
+from langchain_core.load import dumps
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import ChatGenerationChunk, ChatResult
+
+from lang_agent.metrics import MODEL_COALESCED
+
+__all__ = [
+    "SingleFlight",
+    "SingleFlightChatModel",
+    "SingleFlightEmbeddings",
+]
+
+# 默认开启，设置MODEL_SINGLE_FLIGHT=false后ResourceManager构建的模型不合并请求
+MODEL_SINGLE_FLIGHT = os.getenv("MODEL_SINGLE_FLIGHT", "true").lower() in (
+    "1", "true", "yes"
+)
+
+
+class _Flight:
+    """
+    一次进行中的上游调用，流式调用时记录已产生的分片供后来者重放
+    """
+
+    def __init__(self):
+        self.task: Optional[asyncio.Task] = None
+        self.waiters = 0
+        self.chunks: list = []
+        self.changed = asyncio.Event()
+
+
+class SingleFlight:
+    """
+    合并同一事件循环中键相同的并发调用，只向上游发起一次请求，结果分发给所有调用方
+    所有调用方都取消后，上游请求随之取消
+    """
+
+    def __init__(self):
+        self._flights: dict[Hashable, _Flight] = {}
+
+    def _join(self, key: Hashable) -> tuple[_Flight, bool]:
+        flight = self._flights.get(key)
+        leader = flight is None
+        if leader:
+            flight = _Flight()
+            self._flights[key] = flight
+        flight.waiters += 1
+        return flight, leader
+
+    def _leave(self, key: Hashable, flight: _Flight):
+        flight.waiters -= 1
+        if flight.waiters == 0 and not flight.task.done():
+            flight.task.cancel()
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+
+    def _finish(self, key: Hashable, flight: _Flight):
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+    async def call(
+        self,
+        key: Hashable,
+        fn: Callable[[], Awaitable[Any]],
+        on_shared: Optional[Callable[[], None]] = None,
+    ) -> Any:
+        """
+        调用方可能修改返回值(如写入消息id)，每个调用方得到结果的深拷贝
+        复用了其他调用方的请求时调用on_shared
+        """
+        key = (id(asyncio.get_running_loop()), key)
+        flight, leader = self._join(key)
+        if leader:
+            flight.task = asyncio.ensure_future(fn())
+            flight.task.add_done_callback(lambda _: self._finish(key, flight))
+        elif on_shared is not None:
+            on_shared()
+        try:
+            result = await asyncio.shield(flight.task)
+        finally:
+            self._leave(key, flight)
+        return copy.deepcopy(result)
+
+    async def stream(
+        self,
+        key: Hashable,
+        fn: Callable[[], AsyncIterator[Any]],
+        on_shared: Optional[Callable[[], None]] = None,
+    ) -> AsyncIterator[Any]:
+        """
+        流式调用，后加入的调用方先重放已产生的分片再继续接收
+        """
+        key = (id(asyncio.get_running_loop()), key)
+        flight, leader = self._join(key)
+        if leader:
+
+            async def produce():
+                try:
+                    async for chunk in fn():
+                        flight.chunks.append(chunk)
+                        flight.changed.set()
+                finally:
+                    flight.changed.set()
+
+            flight.task = asyncio.ensure_future(produce())
+            flight.task.add_done_callback(lambda _: self._finish(key, flight))
+        elif on_shared is not None:
+            on_shared()
+        try:
+            index = 0
+            while True:
+                while index < len(flight.chunks):
+                    yield copy.deepcopy(flight.chunks[index])
+                    index += 1
+                if flight.task.done():
+                    if index < len(flight.chunks):
+                        continue
+                    flight.task.result()
+                    return
+                flight.changed.clear()
+                await flight.changed.wait()
+        finally:
+            self._leave(key, flight)
+
+
+_chat_flights = SingleFlight()
+_embedding_flights = SingleFlight()
+
+
+class SingleFlightChatModel:
+    """
+    对话模型混入类，合并参数与消息完全相同的并发调用
+    位于响应缓存之后，未命中缓存的相同请求只调用一次上游
+    """
+
+    def _flight_key(self, messages: list[BaseMessage], stop, kwargs: dict) -> str:
+        return dumps(messages) + self._get_llm_string(stop=stop, **kwargs)
+
+    def _flight_model(self) -> str:
+        return self._get_ls_params().get("ls_model_name") or self._llm_type
+
+    async def _agenerate(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        key = ("generate", self._flight_key(messages, stop, kwargs))
+        # 上游请求由多个调用方共享，不绑定某一调用方的回调
+        return await _chat_flights.call(
+            key,
+            lambda: super(SingleFlightChatModel, self)._agenerate(
+                messages, stop=stop, **kwargs
+            ),
+            lambda: MODEL_COALESCED.inc(model=self._flight_model(), kind="chat"),
+        )
+
+    async def _astream(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        key = ("stream", self._flight_key(messages, stop, kwargs))
+        async for chunk in _chat_flights.stream(
+            key,
+            lambda: super(SingleFlightChatModel, self)._astream(
+                messages, stop=stop, **kwargs
+            ),
+            lambda: MODEL_COALESCED.inc(model=self._flight_model(), kind="chat"),
+        ):
+            yield chunk
+
+
+class SingleFlightEmbeddings:
+    """
+    Embedding模型混入类，合并文本与参数完全相同的并发调用
+    """
+
+    async def aembed_documents(
+        self, texts: list[str], chunk_size: Optional[int] = None, **kwargs: Any
+    ) -> list[list[float]]:
+        key = (
+            id(self),
+            tuple(texts),
+            chunk_size,
+            json.dumps(kwargs, sort_keys=True, default=str),
+        )
+        return await _embedding_flights.call(
+            key,
+            lambda: super(SingleFlightEmbeddings, self).aembed_documents(
+                texts, chunk_size=chunk_size, **kwargs
+            ),
+            lambda: MODEL_COALESCED.inc(
+                model=getattr(self, "model", type(self).__name__), kind="embedding"
+            ),
+        )
+
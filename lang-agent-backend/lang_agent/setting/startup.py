@@ -0,0 +1,113 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Literal, Optional
+
+from pydantic import BaseModel, Field
+
+from lang_agent.logger import get_logger
+
+__all__ = ["ResourceStartup", "ResourceStatus"]
+
+logger = get_logger(__name__)
+
+
+class ResourceStatus(BaseModel):
+    kind: str = Field(..., description="资源类型: mcp、model、vectorstore")
+    name: str = Field(..., description="资源名称")
+    state: Literal["pending", "ready", "failed", "timeout"] = Field(
+        default="pending", description="初始化状态"
+    )
+    seconds: Optional[float] = Field(default=None, description="初始化耗时(秒)")
+    error: Optional[str] = Field(default=None, description="失败原因")
+
+
+def _reason(error: BaseException) -> str:
+    # 初始化错误通常层层包装，报告最内层的原因
+    while error.__cause__ is not None:
+        error = error.__cause__
+    return f"{type(error).__name__}: {error}"
+
+
+class ResourceStartup:
+    """
+    记录启动时各资源的初始化状态与耗时，供启动报告与就绪检查使用
+    """
+
+    def __init__(self, timeout: float = 60):
+        self.timeout = timeout
+        self.statuses: dict[tuple[str, str], ResourceStatus] = {}
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+
+    def begin(self, kind: str, name: str):
+        self.statuses[(kind, name)] = ResourceStatus(kind=kind, name=name)
+
+    def _finish(
+        self,
+        kind: str,
+        name: str,
+        start: float,
+        state: str,
+        error: Optional[str] = None,
+    ):
+        status = self.statuses[(kind, name)]
+        status.state = state
+        status.seconds = round(time.perf_counter() - start, 3)
+        status.error = error
+
+    def run_sync(self, kind: str, name: str, fn: Callable[[], Any]) -> Any:
+        """
+        执行无IO的初始化(如构造模型客户端)，异常记录后返回None
+        """
+        self.begin(kind, name)
+        start = time.perf_counter()
+        try:
+            result = fn()
+        except Exception as e:
+            self._finish(kind, name, start, "failed", _reason(e))
+            return None
+        self._finish(kind, name, start, "ready" if result is not None else "failed")
+        return result
+
+    async def run(self, kind: str, name: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        在超时时间内执行异步初始化，超时或异常记录后返回None
+        """
+        self.begin(kind, name)
+        start = time.perf_counter()
+        try:
+            async with asyncio.timeout(self.timeout):
+                result = await fn()
+        except TimeoutError:
+            self._finish(kind, name, start, "timeout", f"Timeout After {self.timeout}s")
+            return None
+        except Exception as e:
+            self._finish(kind, name, start, "failed", _reason(e))
+            return None
+        self._finish(kind, name, start, "ready" if result is not None else "failed")
+        return result
+
+    @property
+    def ready(self) -> bool:
+        """
+        全部资源已结束初始化(成功或失败)
+        """
+        return self.finished is not None
+
+    def report(self) -> list[dict]:
+        return [status.model_dump() for status in self.statuses.values()]
+
+    def log_report(self):
+        lines = [
+            f"{s.kind:<12} {s.name:<32} {s.state:<8} "
+            f"{s.seconds if s.seconds is not None else '-':>8}s"
+            + (f"  {s.error}" if s.error else "")
+            for s in self.statuses.values()
+        ]
+        failed = sum(s.state in ("failed", "timeout") for s in self.statuses.values())
+        logger.info(
+            "Resource Initialized In %.2fs, %d Failed: \n %s",
+            (self.finished or time.perf_counter()) - (self.started or 0),
+            failed,
+            "\n ".join(lines),
+        )
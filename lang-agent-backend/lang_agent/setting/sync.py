@@ -0,0 +1,82 @@
+import asyncio
+import os
+import traceback
+from typing import Optional
+
+from lang_agent.logger import get_logger
+
+from .graph_cache import graph_cache, subgraph_cache
+from .manager import resource_manager
+
+__all__ = ["ResourceSync", "resource_sync"]
+
+logger = get_logger(__name__)
+
+
+class ResourceSync:
+    """
+    轮询resource_event表，把其它worker进程对模型、MCP、向量库和Agent的修改同步到本进程
+    任务事件用于领取其它进程重置的任务，以及取消本进程中运行的任务
+    """
+
+    def __init__(self, interval: float = 2.0):
+        self.interval = interval
+        self.last_id = 0
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        from lang_agent.db.database import (
+            latest_resource_event_id,
+            prune_resource_events,
+        )
+
+        prune_resource_events()
+        self.last_id = latest_resource_event_id()
+        if self.interval > 0:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _loop(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.poll()
+            except Exception:
+                logger.error("Resource Sync Failed: \n %s", traceback.format_exc())
+
+    async def poll(self):
+        from lang_agent.db.database import list_resource_events, worker_id
+
+        for event in list_resource_events(self.last_id):
+            self.last_id = event.id
+            if event.origin == worker_id():
+                continue
+            logger.info("Resource Changed: %s [%s]", event.kind, event.name)
+            match event.kind:
+                case "model":
+                    resource_manager.reload_model(event.name)
+                case "mcp":
+                    await resource_manager.reload_mcp(event.name)
+                case "vectorstore":
+                    resource_manager.reload_vectorstore(event.name)
+                case "agent":
+                    graph_cache.clear()
+                    subgraph_cache.clear()
+                case "job":
+                    from lang_agent.graph.job import job_manager
+
+                    job_manager.enqueue(event.name)
+                case "job_cancel":
+                    from lang_agent.graph.job import job_manager
+
+                    job_manager.cancel_running(event.name)
+
+
+resource_sync = ResourceSync(
+    interval=float(os.getenv("RESOURCE_SYNC_INTERVAL", "2"))
+)
@@ -0,0 +1,108 @@
+import asyncio
+import functools
+import time
+from typing import Any, Optional
+
+from langchain_core.tools import BaseTool, StructuredTool, ToolException
+from pydantic import BaseModel, Field
+
+from lang_agent.metrics import TOOL_CALL_SECONDS, TOOL_QUEUE_DEPTH
+
+__all__ = ["ToolLimiter", "ToolLimits"]
+
+
+class ToolLimits(BaseModel):
+    """
+    MCP工具调用限制，配置在mcp_args的limits字段中，如
+    {"transport": "sse", "url": "...",
+     "limits": {"max_concurrency": 4, "timeout": 30, "tool_timeouts": {"search": 60}}}
+    """
+
+    max_concurrency: Optional[int] = Field(
+        default=None, gt=0, description="该MCP的最大并发调用数"
+    )
+    timeout: Optional[float] = Field(
+        default=None, gt=0, description="工具调用的超时秒数"
+    )
+    tool_timeouts: dict[str, float] = Field(
+        default_factory=dict, description="按工具名称单独设置的超时秒数"
+    )
+
+
+class ToolLimiter:
+    """
+    单个MCP的工具调用限制，该MCP的所有工具、所有会话共享并发额度
+    不同MCP的额度相互独立，慢的MCP不会占用其它MCP的并发
+    """
+
+    def __init__(self, mcp: str, limits: Optional[ToolLimits] = None):
+        self.mcp = mcp
+        self.limits = limits or ToolLimits()
+        self.waiting = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def _get_semaphore(self) -> Optional[asyncio.Semaphore]:
+        # asyncio的同步原语绑定事件循环，循环变化时重新创建
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._semaphore = (
+                asyncio.Semaphore(self.limits.max_concurrency)
+                if self.limits.max_concurrency
+                else None
+            )
+        return self._semaphore
+
+    def timeout(self, tool_name: str) -> Optional[float]:
+        return self.limits.tool_timeouts.get(tool_name, self.limits.timeout)
+
+    async def _acquire(self) -> Optional[asyncio.Semaphore]:
+        semaphore = self._get_semaphore()
+        if semaphore is None:
+            return None
+        self.waiting += 1
+        TOOL_QUEUE_DEPTH.set(self.waiting, mcp=self.mcp)
+        try:
+            await semaphore.acquire()
+        finally:
+            self.waiting -= 1
+            TOOL_QUEUE_DEPTH.set(self.waiting, mcp=self.mcp)
+        return semaphore
+
+    def wrap(self, tool: BaseTool) -> BaseTool:
+        """
+        返回在额度内执行、超时抛出ToolException并记录耗时的工具副本，仅支持异步的StructuredTool
+        """
+        if not isinstance(tool, StructuredTool) or tool.coroutine is None:
+            return tool
+        coroutine = tool.coroutine
+        timeout = self.timeout(tool.name)
+
+        @functools.wraps(coroutine)
+        async def call(*args: Any, **kwargs: Any) -> Any:
+            semaphore = await self._acquire()
+            start = time.perf_counter()
+            status = "ok"
+            try:
+                async with asyncio.timeout(timeout):
+                    return await coroutine(*args, **kwargs)
+            except TimeoutError as e:
+                status = "timeout"
+                raise ToolException(
+                    f"Tool [{tool.name}] Timeout After {timeout}s"
+                ) from e
+            except BaseException:
+                status = "error"
+                raise
+            finally:
+                if semaphore is not None:
+                    semaphore.release()
+                TOOL_CALL_SECONDS.observe(
+                    time.perf_counter() - start,
+                    mcp=self.mcp,
+                    tool=tool.name,
+                    status=status,
+                )
+
+        return tool.model_copy(update={"coroutine": call})
@@ -3,60 +3,172 @@ import contextlib
 import os
 import subprocess
 import re
+import threading
+import weakref
+from collections import OrderedDict
 from collections.abc import Awaitable
-from typing import Any, Callable, List, Optional, Set
-
-import nest_asyncio
+from functools import lru_cache
+from typing import Any, Callable, List, Optional
 
 from langchain_core.messages import BaseMessage
 from pydantic import BaseModel, Field
 
-nest_asyncio.apply()
+TEMPLATE_PATTERN = re.compile(r"{{(.+?)}}")
+
+
+def _message_name(key: str) -> Optional[str]:
+    if key.startswith("messages['") and key.endswith("']"):
+        return key[len("messages['"):-len("']")]
+    return None
+
+
+class MessageIndex:
+    """
+    消息名称到最新消息的索引，从列表末尾按需向前扫描，已找到的名称直接返回
+    """
+
+    def __init__(self, messages: List[BaseMessage]):
+        self.messages = messages
+        self._latest: dict[str, BaseMessage] = {}
+        self._length = len(messages)
+        self._position = self._length - 1
+
+    def get(self, name: str) -> Optional[BaseMessage]:
+        self._sync()
+        message = self._latest.get(name)
+        if message is not None:
+            return message
+        while self._position >= 0:
+            message = self.messages[self._position]
+            self._position -= 1
+            message_name = getattr(message, "name", None)
+            if message_name and message_name not in self._latest:
+                self._latest[message_name] = message
+                if message_name == name:
+                    return message
+        return None
+
+    def _sync(self):
+        # 列表被追加新消息时，新消息比已索引的消息更新
+        length = len(self.messages)
+        if length > self._length:
+            for message in self.messages[self._length:]:
+                message_name = getattr(message, "name", None)
+                if message_name:
+                    self._latest[message_name] = message
+            self._length = length
+        elif length < self._length:
+            self.__init__(self.messages)
+
+
+# 索引缓存绑定到当前asyncio任务(一次节点调用或一次图运行)
+# 任务结束后随之释放，不在全局持有消息列表
+_TaskIndexes = OrderedDict[int, MessageIndex]
+_message_indexes: "weakref.WeakKeyDictionary[asyncio.Task, _TaskIndexes]" = (
+    weakref.WeakKeyDictionary()
+)
+_message_indexes_lock = threading.Lock()
+
+
+def message_index(state: dict) -> MessageIndex:
+    """
+    获取state中消息列表的索引，同一任务内对同一消息列表的多次读取复用索引
+    """
+    messages = state.get("messages") or []
+    try:
+        task = asyncio.current_task()
+    except RuntimeError:
+        task = None
+    if task is None:
+        return MessageIndex(messages)
+    key = id(messages)
+    with _message_indexes_lock:
+        indexes = _message_indexes.get(task)
+        if indexes is None:
+            indexes = _message_indexes[task] = OrderedDict()
+        index = indexes.get(key)
+        if index is None or index.messages is not messages:
+            index = MessageIndex(messages)
+            indexes[key] = index
+            while len(indexes) > 8:
+                indexes.popitem(last=False)
+        else:
+            indexes.move_to_end(key)
+    return index
+
+
+class TemplatePlan:
+    """
+    预编译的模板：记录文本片段与变量，渲染时不再重复解析模板
+    """
+
+    def __init__(self, content: str):
+        self.content = content
+        # 奇数位置为变量名，偶数位置为文本片段
+        self.parts: List[str] = TEMPLATE_PATTERN.split(content)
+        self.keys: tuple[str, ...] = tuple(dict.fromkeys(self.parts[1::2]))
+        self.message_names: dict[str, str] = {
+            key: _message_name(key) for key in self.keys if _message_name(key)
+        }
+
+    def args(self, state: dict) -> dict:
+        """
+        返回模板变量到state中对应值的映射，未找到的消息变量不包含在内
+        """
+        if not state:
+            return {}
+        args = {}
+        index = message_index(state) if self.message_names else None
+        for key in self.keys:
+            name = self.message_names.get(key)
+            if name is None:
+                args[key] = state[key]
+                continue
+            message = index.get(name)
+            if message is not None:
+                args[key] = message.content
+        return args
+
+    def render(self, state: dict) -> str:
+        """
+        使用state中对应的值替换模板变量，未找到的消息变量保持原样
+        """
+        if not state or not self.keys:
+            return self.content
+        args = self.args(state)
+        parts = list(self.parts)
+        for i in range(1, len(parts), 2):
+            key = parts[i]
+            parts[i] = str(args[key]) if key in args else f"{{{{{key}}}}}"
+        return "".join(parts)
+
+
+@lru_cache(maxsize=1024)
+def compile_template(content: str) -> TemplatePlan:
+    return TemplatePlan(content)
+
 
 def parse_args(content: str, state: dict):
     """
     解析提示词，使用state中对应的值替换掉提示词中的变量
     """
-    if not state:
-        return {}
-    args = {}
-    key_set: Set[str] = set(re.findall(r"{{(.+?)}}", content))
-    messages: List[BaseMessage] = list(reversed(state["messages"]))
-    remaining_keys = set(key_set)
-    for key in key_set:
-        if not remaining_keys:
-            break
-        # 如果key是messages['xxxx']这种形式，那么取messages列表里面对应的content
-        if key.startswith("messages['") and key.endswith("']"):
-            node_name = re.findall(r"\['(.+?)'\]", key)
-            for message in messages:
-                if message.name == node_name[0]:
-                    args[key] = message.content
-                    remaining_keys.discard(key)
-                    break
-        else:
-            args[key] = state[key]
-            remaining_keys.discard(key)
-    return args
+    return compile_template(content).args(state)
 
 def complete_content(content: str, state: dict) -> str:
     """
     解析文本内容，使用state中对应的值替换掉文本内容中的变量
     """
-    if not state:
-        return content
-    keys: List[str] = re.findall(r"{{(.+?)}}", content)
-    messages: List[BaseMessage] = list(reversed(state["messages"]))
-    for key in keys:
-        if key.startswith("messages['") and key.endswith("']"):
-            node_name = re.findall(r"\['(.+?)'\]", key)
-            for message in messages:
-                if message.name and message.name == node_name[0]:
-                    content = content.replace(f"{{{{{key}}}}}", message.content)
-                    break
-        else:
-            content = content.replace(f"{{{{{key}}}}}", str(state[key]))
-    return content
+    return compile_template(content).render(state)
+
+def get_state_value(state: dict, key: str) -> Any:
+    """
+    读取模板变量的值，messages['xxxx']取名称为xxxx的最新消息内容，不存在时返回None
+    """
+    name = _message_name(key)
+    if name is not None:
+        message = message_index(state).get(name)
+        return message.content if message is not None else None
+    return state[key]
 
 def sync_wrapper(coro: Callable[..., Awaitable[Any]]):
     """
@@ -0,0 +1,38 @@
+from langgraph.types import Send
+
+from lang_agent.edge import ConditionEdge
+from lang_agent.edge.util import Target
+
+
+def _target(name: str, expr: str = None, **kwargs) -> Target:
+    return Target(type="condition", target=name, target_name=name, expr=expr, **kwargs)
+
+
+def test_route_first_match():
+    edge = ConditionEdge("a", [_target("b", "{{n}}>1"), _target("c", "{{n}}>0")])
+    assert edge.route({"messages": [], "n": 2}) == "b"
+    assert edge.route({"messages": [], "n": 1}) == "c"
+    assert edge.route({"messages": [], "n": 0}) is None
+
+
+def test_route_parallel_targets():
+    edge = ConditionEdge(
+        "a",
+        [
+            _target("b", "{{n}}>1", parallel=True),
+            _target("c", "{{n}}>0"),
+            _target("d", "{{n}}<0"),
+        ],
+    )
+    assert edge.route({"messages": [], "n": 2}) == ["b", "c"]
+    assert edge.route({"messages": [], "n": -1}) == ["d"]
+
+
+def test_route_map_over():
+    edge = ConditionEdge("a", [_target("b", map_over="topics", map_as="topic")])
+    state = {"messages": [], "topics": ["x", "y"]}
+    assert edge.route(state) == [
+        Send("b", {**state, "topic": "x"}),
+        Send("b", {**state, "topic": "y"}),
+    ]
+    assert edge.route({"messages": [], "topics": []}) == []
@@ -0,0 +1,69 @@
+import asyncio
+import uuid
+
+import lang_agent.db  # noqa: F401  先加载db，避免setting.manager的循环导入
+from lang_agent.graph.engine import GraphEngine
+from lang_agent.setting.checkpointer import async_checkpointer_shutdown
+
+
+def edge(source: str, target: str) -> dict:
+    return {
+        "source": source,
+        "target": target,
+        "type": "default",
+        "source_name": source,
+        "target_name": target,
+    }
+
+
+INNER = {
+    "state_schema": {"messages": "list"},
+    "nodes": [
+        {"id": "start", "type": "start", "data": {"name": "start"}},
+        {
+            "id": "ask",
+            "type": "user_input",
+            "data": {
+                "name": "ask",
+                "guiding_words": "请输入",
+                "state_field": "messages",
+            },
+        },
+        {"id": "end", "type": "end", "data": {"name": "end"}},
+    ],
+    "edges": [edge("start", "ask"), edge("ask", "end")],
+}
+
+OUTER = {
+    "state_schema": {"messages": "list"},
+    "nodes": [
+        {"id": "start", "type": "start", "data": {"name": "start"}},
+        {
+            "id": "inner",
+            "type": "reuse_agent",
+            "data": {"name": "inner", "data": INNER},
+        },
+        {"id": "end", "type": "end", "data": {"name": "end"}},
+    ],
+    "edges": [edge("start", "inner"), edge("inner", "end")],
+}
+
+
+def test_subgraph_interrupt_is_streamed_once():
+    async def run() -> list:
+        try:
+            engine = GraphEngine(agent_data=OUTER, agent_name="outer")
+            await engine.compile()
+            engine = engine.with_config(
+                {"configurable": {"thread_id": f"test-{uuid.uuid4().hex}"}}
+            )
+            return [
+                data
+                async for event, data in engine.astream({}, engine.has_subgraphs)
+                if event == "interrupt"
+            ]
+        finally:
+            await async_checkpointer_shutdown()
+
+    interrupts = asyncio.run(run())
+    assert interrupts == [{"type": "user_input", "message": "请输入"}]
@@ -0,0 +1,43 @@
+import pytest
+from langchain_core.messages import AIMessage
+
+from lang_agent.edge.expr import compile_condition
+
+
+def test_evaluate_state_values():
+    state = {
+        "messages": [
+            AIMessage(content="3", name="counter"),
+            AIMessage(content="yes", name="judge"),
+        ],
+        "loop_count": 2,
+        "retrieve_flag": False,
+        "topic": "荷花",
+    }
+    assert compile_condition("{{loop_count}}<=2").evaluate(state)
+    assert compile_condition("{{retrieve_flag}}==False").evaluate(state)
+    assert compile_condition("True==True").evaluate(state)
+    assert compile_condition("{{messages['counter']}} > 2").evaluate(state)
+    assert compile_condition("'{{messages['judge']}}' == 'yes'").evaluate(state)
+    assert compile_condition("'荷' in '{{topic}}'").evaluate(state)
+    condition = compile_condition("len('{{topic}}') > 2 and {{loop_count}} > 0")
+    assert not condition.evaluate(state)
+
+
+def test_compiled_once():
+    assert compile_condition("{{a}}>1") is compile_condition("{{a}}>1")
+
+
+@pytest.mark.parametrize(
+    "expr",
+    [
+        "__import__('os')",
+        "().__class__",
+        "open('x')",
+        "{{a}} ** 2",
+        "[x for x in {{a}}]",
+    ],
+)
+def test_reject_unsafe_expressions(expr):
+    with pytest.raises(ValueError):
+        compile_condition(expr)
@@ -0,0 +1,53 @@
+from lang_agent.setting.graph_cache import GraphCache
+
+
+def test_make_key_is_stable():
+    a = GraphCache.make_key({"nodes": [1, 2], "edges": []}, "agent", 0)
+    b = GraphCache.make_key({"edges": [], "nodes": [1, 2]}, "agent", 0)
+    assert a == b
+    assert a != GraphCache.make_key({"edges": [], "nodes": [1, 2]}, "agent", 1)
+
+
+def test_lru_eviction_and_stats():
+    cache = GraphCache(max_size=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats() == {
+        "size": 2,
+        "max_size": 2,
+        "hits": 3,
+        "misses": 1,
+        "evictions": 1,
+    }
+    cache.clear()
+    assert cache.get("a") is None
+
+
+def test_subgraph_key_uses_agent_version():
+    from datetime import datetime
+
+    import lang_agent.db  # noqa: F401  先加载db，避免setting.manager的循环导入
+    from lang_agent.node.agent.reuse_agent_node import (
+        ReuseAgentNode,
+        ReuseAgentNodeData,
+    )
+
+    saved = datetime(2024, 1, 1)
+    a = ReuseAgentNodeData(
+        name="a", data={"nodes": [1]}, agent_id="x", updated_at=saved
+    )
+    b = ReuseAgentNodeData(
+        name="a", data={"nodes": [2]}, agent_id="x", updated_at=saved
+    )
+    assert ReuseAgentNode.cache_key("a", a) == ReuseAgentNode.cache_key("a", b)
+    b.updated_at = datetime(2024, 1, 2)
+    assert ReuseAgentNode.cache_key("a", a) != ReuseAgentNode.cache_key("a", b)
+    # 未保存的Agent按数据区分
+    c = ReuseAgentNodeData(name="a", data={"nodes": [1]})
+    d = ReuseAgentNodeData(name="a", data={"nodes": [2]})
+    assert ReuseAgentNode.cache_key("a", c) != ReuseAgentNode.cache_key("a", d)
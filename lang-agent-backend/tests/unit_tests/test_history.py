@@ -0,0 +1,60 @@
+import asyncio
+
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
+
+import lang_agent.db  # noqa: F401  先加载数据库模块，避免循环导入
+from lang_agent.node.core.history import HistoryConfig, MessageHistory
+
+
+def conversation(turns: int) -> list:
+    messages = []
+    for i in range(turns):
+        messages.append(HumanMessage(content=f"question {i} " * 20, id=f"h{i}"))
+        messages.append(AIMessage(content=f"answer {i} " * 20, id=f"a{i}"))
+    return messages
+
+
+def test_last_n_does_not_start_on_tool_result():
+    messages = conversation(3) + [
+        AIMessage(content="", tool_calls=[{"name": "t", "args": {}, "id": "c1"}]),
+        ToolMessage(content="result", tool_call_id="c1"),
+        AIMessage(content="done"),
+    ]
+    history = MessageHistory(HistoryConfig(strategy="last_n", max_messages=2))
+    selected = history.select(messages)
+    assert [m.content for m in selected] == ["done"]
+
+
+def test_token_budget_keeps_latest():
+    messages = conversation(10)
+    history = MessageHistory(HistoryConfig(strategy="token_budget", max_tokens=200))
+    selected = history.select(messages)
+    assert 0 < len(selected) < len(messages)
+    assert selected[-1] is messages[-1]
+
+
+def test_rolling_summary_reuses_cached_summary():
+    model = FakeListChatModel(responses=["summary-1", "summary-2"])
+    config = HistoryConfig(strategy="summary", max_tokens=100, keep_last=2)
+    history = MessageHistory(config, model)
+    messages = conversation(4)
+
+    selected = asyncio.run(history.aselect(messages))
+    assert isinstance(selected[0], SystemMessage)
+    assert "summary-1" in selected[0].content
+    assert selected[1:] == messages[-2:]
+
+    # 新一轮对话只把新增消息合并进已有摘要
+    messages += conversation(5)[-2:]
+    selected = asyncio.run(history.aselect(messages))
+    assert "summary-2" in selected[0].content
+    assert model.i == 0
+
+
+def test_summary_without_keep_last():
+    model = FakeListChatModel(responses=["summary"])
+    config = HistoryConfig(strategy="summary", max_tokens=10, keep_last=0)
+    selected = MessageHistory(config, model).select(conversation(2))
+    assert len(selected) == 1
+    assert "summary" in selected[0].content
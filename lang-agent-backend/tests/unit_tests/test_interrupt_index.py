@@ -0,0 +1,37 @@
+import asyncio
+import sqlite3
+
+from lang_agent.setting.interrupt_index import InterruptIndex
+
+
+def test_lookup_put_remove(tmp_path):
+    async def run():
+        index = InterruptIndex(str(tmp_path / "checkpoint.db"))
+        assert await index.lookup("t1") == (False, None)
+        config = {"configurable": {"thread_id": "t1", "checkpoint_ns": "sub:1"}}
+        await index.put("t1", config)
+        assert await index.lookup("t1") == (True, config)
+        await index.put("t1", None)
+        assert await index.lookup("t1") == (True, None)
+        await index.remove("t1")
+        assert await index.lookup("t1") == (False, None)
+        await index.close()
+
+    asyncio.run(run())
+
+
+def test_existing_threads_marked_unknown(tmp_path):
+    path = str(tmp_path / "checkpoint.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE checkpoints (thread_id TEXT, checkpoint_ns TEXT)")
+    conn.execute("INSERT INTO checkpoints VALUES ('old', '')")
+    conn.commit()
+    conn.close()
+
+    async def run():
+        index = InterruptIndex(path)
+        assert await index.lookup("old") == (True, None)
+        assert await index.lookup("new") == (False, None)
+        await index.close()
+
+    asyncio.run(run())
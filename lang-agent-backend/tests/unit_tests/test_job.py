@@ -0,0 +1,27 @@
+import asyncio
+
+import lang_agent.db  # noqa: F401  先加载db，避免setting.manager的循环导入
+from lang_agent.graph import job
+from lang_agent.graph.job import JobManager
+
+
+def test_cancel_running_job(monkeypatch):
+    requested = []
+    monkeypatch.setattr(job, "cancel_pending_job", lambda job_id: False)
+    monkeypatch.setattr(
+        job, "request_job_cancel", lambda job_id: requested.append(job_id) or True
+    )
+
+    async def run():
+        manager = JobManager()
+        task = asyncio.create_task(asyncio.sleep(10))
+        manager._running["local"] = task
+        # 本进程运行的任务直接取消，其它进程运行的任务发送取消请求
+        assert manager.cancel("local")
+        assert manager.cancel("remote")
+        await asyncio.gather(task, return_exceptions=True)
+        assert task.cancelled()
+        assert "local" in manager._cancelled
+
+    asyncio.run(run())
+    assert requested == ["remote"]
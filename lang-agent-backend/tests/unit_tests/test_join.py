@@ -0,0 +1,74 @@
+import asyncio
+import uuid
+
+import lang_agent.db  # noqa: F401  先加载db，避免setting.manager的循环导入
+from lang_agent.graph.engine import GraphEngine
+from lang_agent.setting.checkpointer import async_checkpointer_shutdown
+
+
+def edge(source: str, target: str, expr: str = None) -> dict:
+    data = {
+        "source": source,
+        "target": target,
+        "type": "default",
+        "source_name": source,
+        "target_name": target,
+    }
+    if expr is not None:
+        data.update(type="condition", data={"expr": expr, "parallel": True})
+    return data
+
+
+def counter(name: str) -> dict:
+    return {"id": name, "type": "counter", "data": {"name": name, "state_field": name}}
+
+
+AGENT = {
+    "state_schema": {
+        "messages": "list",
+        "n": "int",
+        "a": "int",
+        "b": "int",
+        "after": "int",
+    },
+    "nodes": [
+        {"id": "start", "type": "start", "data": {"name": "start"}},
+        counter("a"),
+        counter("b"),
+        {"id": "join", "type": "join", "data": {"name": "join"}},
+        counter("after"),
+        {"id": "end", "type": "end", "data": {"name": "end"}},
+    ],
+    "edges": [
+        edge("start", "a", "{{n}}>0"),
+        edge("start", "b", "{{n}}>5"),
+        edge("a", "join"),
+        edge("b", "join"),
+        edge("join", "after"),
+        edge("after", "end"),
+    ],
+}
+
+
+def test_join_waits_for_selected_branches():
+    async def run() -> list[dict]:
+        try:
+            engine = GraphEngine(agent_data=AGENT, agent_name="join")
+            await engine.compile()
+            results = []
+            for n in (1, 10):
+                config = {"configurable": {"thread_id": f"test-{uuid.uuid4().hex}"}}
+                results.append(
+                    await engine.graph.ainvoke({"messages": [], "n": n}, config=config)
+                )
+            return results
+        finally:
+            await async_checkpointer_shutdown()
+
+    partial, full = asyncio.run(run())
+    # 只选中a时汇合节点不再等待b
+    assert partial["a"] == 2 and "b" not in partial
+    assert partial["after"] == 2
+    # 两个分支都选中时汇合节点只执行一次
+    assert full["a"] == 2 and full["b"] == 2
+    assert full["after"] == 2
@@ -0,0 +1,55 @@
+import asyncio
+import time
+
+import pytest
+
+from lang_agent.setting.limiter import (
+    ModelLimiter,
+    ModelLimitError,
+    ModelLimits,
+    TokenBucket,
+)
+
+
+def test_token_bucket_wait_time():
+    bucket = TokenBucket(60)
+    assert bucket.wait_time(60) == 0
+    bucket.take(60)
+    assert bucket.wait_time(1) == pytest.approx(1, abs=0.05)
+    # 超过容量的请求按容量计，不会永远等待
+    assert bucket.wait_time(600) == pytest.approx(60, abs=0.1)
+
+
+def test_concurrency_limit_and_queue_timeout():
+    limiter = ModelLimiter("m", ModelLimits(max_concurrency=2, queue_timeout=0.15))
+    active, peak = 0, 0
+
+    async def call(duration: float):
+        nonlocal active, peak
+        async with limiter.slot():
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(duration)
+            active -= 1
+
+    async def run():
+        await asyncio.gather(*(call(0.02) for _ in range(6)))
+        assert peak == 2
+        with pytest.raises(ModelLimitError):
+            await asyncio.gather(*(call(0.2) for _ in range(3)))
+
+    asyncio.run(run())
+
+
+def test_rpm_limit():
+    limiter = ModelLimiter("m", ModelLimits(rpm=600, queue_timeout=1))
+
+    async def run():
+        start = time.perf_counter()
+        for _ in range(602):
+            async with limiter.slot():
+                pass
+        return time.perf_counter() - start
+
+    # 600 rpm即每0.1秒补充一次额度，额度用完后的两次调用需等待约0.2秒
+    assert asyncio.run(run()) >= 0.15
@@ -0,0 +1,42 @@
+import asyncio
+import json
+from pathlib import Path
+
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.messages import AIMessage, HumanMessage
+
+import lang_agent.db  # noqa: F401  先加载db，避免setting.manager的循环导入
+from lang_agent.node.core import LLMNode
+from lang_agent.setting.manager import resource_manager
+
+EXAMPLES_DIR = Path(__file__).resolve().parents[3] / "examples"
+
+
+class RecordingModel(FakeListChatModel):
+    inputs: list = []
+
+    async def ainvoke(self, input, config=None, **kwargs):
+        self.inputs.append(input)
+        return await super().ainvoke(input, config, **kwargs)
+
+
+def test_history_does_not_repeat_current_input():
+    agent = json.loads((EXAMPLES_DIR / "loop_chat.json").read_text(encoding="utf-8"))
+    [param] = [node for node in agent["data"]["nodes"] if node["type"] == "llm"]
+    param["data"]["history"] = {"strategy": "all"}
+    model = RecordingModel(responses=["好的"])
+    resource_manager.models["llm"][param["data"]["model"]] = model
+    node = LLMNode(param)
+    state = {
+        "messages": [
+            AIMessage(content="你好，有什么可以帮助你的吗？", name="start"),
+            HumanMessage(content="第一个问题", name="user_input"),
+            AIMessage(content="第一个回答", name="llm"),
+            HumanMessage(content="第二个问题", name="user_input"),
+        ]
+    }
+    asyncio.run(node.ainvoke(state))
+    contents = [message.content for message in model.inputs[0].to_messages()]
+    assert contents.count("第二个问题") == 1
+    assert contents[-1] == "第二个问题"
+    assert "第一个问题" in contents and "第一个回答" in contents
@@ -0,0 +1,144 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+import anyio
+import pytest
+
+import lang_agent.db  # noqa: F401  先加载db，避免setting.manager的循环导入
+from lang_agent.setting import mcp_pool
+from lang_agent.setting.mcp_pool import McpPoolConfig, McpSessionPool
+
+
+class FakeSession:
+    opened = 0
+
+    def __init__(self):
+        FakeSession.opened += 1
+        self.id = FakeSession.opened
+        self.closed = False
+
+    async def initialize(self):
+        pass
+
+    async def call_tool(self, name, arguments=None, **kwargs):
+        if self.closed:
+            raise anyio.ClosedResourceError
+        await asyncio.sleep(0.01)
+        return self.id
+
+    async def send_ping(self):
+        if self.closed:
+            raise anyio.ClosedResourceError
+
+
+@pytest.fixture
+def fake_sessions(monkeypatch):
+    sessions = []
+
+    @asynccontextmanager
+    async def create_session(connection):
+        session = FakeSession()
+        sessions.append(session)
+        yield session
+
+    FakeSession.opened = 0
+    monkeypatch.setattr(mcp_pool, "create_session", create_session)
+    return sessions
+
+
+def test_sessions_are_reused_and_capped(fake_sessions):
+    async def run():
+        pool = McpSessionPool("m", {}, McpPoolConfig(max_sessions=2, health_interval=0))
+        await pool.start()
+        assert [await pool.call_tool("t") for _ in range(3)] == [1, 1, 1]
+        await asyncio.gather(*(pool.call_tool("t") for _ in range(6)))
+        assert len(fake_sessions) == 2
+        await pool.close()
+
+    asyncio.run(run())
+
+
+def test_closed_session_is_replaced(fake_sessions):
+    async def run():
+        pool = McpSessionPool("m", {}, McpPoolConfig(max_sessions=1, health_interval=0))
+        await pool.start()
+        fake_sessions[0].closed = True
+        # 请求未发出时换新会话重试
+        assert await pool.call_tool("t") == 2
+        assert pool.stats()["restarts"] == 1
+        fake_sessions[1].closed = True
+        await pool._check()
+        assert pool.stats() == {
+            "idle": 1, "in_use": 0, "max_sessions": 1, "restarts": 2
+        }
+        await pool.close()
+
+    asyncio.run(run())
+
+
+def test_cancelled_init_closes_pool(fake_sessions, monkeypatch):
+    import json
+
+    from lang_agent.db.models import Mcp
+    from lang_agent.setting.manager import resource_manager
+
+    exited = []
+
+    @asynccontextmanager
+    async def create_session(connection):
+        session = FakeSession()
+        fake_sessions.append(session)
+        try:
+            yield session
+        finally:
+            exited.append(session)
+
+    async def hang(*args, **kwargs):
+        await asyncio.sleep(10)
+
+    monkeypatch.setattr(mcp_pool, "create_session", create_session)
+    monkeypatch.setattr("lang_agent.setting.manager.load_mcp_tools", hang)
+    mcp = Mcp(
+        name="slow",
+        mcp_args=json.dumps({"transport": "stdio", "command": "x", "args": []}),
+    )
+
+    async def run():
+        with pytest.raises(TimeoutError):
+            async with asyncio.timeout(0.1):
+                await resource_manager.init_mcp(mcp)
+        # 在事件循环结束前检查，会话已随初始化的取消一起关闭
+        assert len(fake_sessions) == 1
+        assert exited == fake_sessions
+        assert "slow" not in resource_manager.mcp_pools
+
+    asyncio.run(run())
+
+
+def test_partial_fill_failure_closes_opened_sessions(monkeypatch):
+    exited = []
+    attempts = 0
+
+    @asynccontextmanager
+    async def create_session(connection):
+        nonlocal attempts
+        attempts += 1
+        if attempts == 2:
+            raise ConnectionError("refused")
+        try:
+            yield FakeSession()
+        finally:
+            exited.append(attempts)
+
+    monkeypatch.setattr(mcp_pool, "create_session", create_session)
+
+    async def run():
+        pool = McpSessionPool(
+            "m", {}, McpPoolConfig(min_sessions=2, max_sessions=2, health_interval=0)
+        )
+        with pytest.raises(mcp_pool.McpPoolError):
+            await pool.start()
+        assert len(exited) == 1
+        assert pool.stats()["idle"] == 0
+
+    asyncio.run(run())
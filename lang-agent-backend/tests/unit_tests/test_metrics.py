@@ -0,0 +1,29 @@
+from lang_agent.metrics import Registry
+
+
+def test_render_counter_and_histogram():
+    registry = Registry()
+    counter = registry.counter("requests_total", "请求数", ("path",))
+    histogram = registry.histogram(
+        "latency_seconds", "耗时", ("node",), buckets=(0.1, 1)
+    )
+    counter.inc(path="/a")
+    counter.inc(2, path="/a")
+    histogram.observe(0.05, node="llm")
+    histogram.observe(0.5, node="llm")
+    histogram.observe(5, node="llm")
+
+    text = registry.render()
+    assert "# TYPE requests_total counter" in text
+    assert 'requests_total{path="/a"} 3.0' in text
+    assert 'latency_seconds_bucket{node="llm",le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{node="llm",le="1.0"} 2' in text
+    assert 'latency_seconds_bucket{node="llm",le="+Inf"} 3' in text
+    assert 'latency_seconds_count{node="llm"} 3' in text
+    assert histogram.get(node="llm") == (5.55, 3)
+
+
+def test_gauge_collect_and_label_escape():
+    registry = Registry()
+    registry.gauge("cache", "缓存", ("stat",), collect=lambda: {('a"b',): 1})
+    assert 'cache{stat="a\\"b"} 1.0' in registry.render()
@@ -0,0 +1,110 @@
+import asyncio
+import gc
+import json
+import time
+from typing import Any
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from lang_agent.db import select_model_by_name  # noqa: F401 按应用的顺序初始化模块
+from lang_agent.db.models import Model
+from lang_agent.setting.manager import resource_manager
+from lang_agent.setting.model_group import ModelGroup
+
+
+class DelayedChatModel(BaseChatModel):
+    reply: str
+    delay: float = 0.0
+    fail: bool = False
+
+    @property
+    def _llm_type(self) -> str:
+        return "delayed"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs: Any):
+        raise NotImplementedError
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs: Any):
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError(f"{self.reply} failed")
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(self.reply))])
+
+
+def _group(monkeypatch, **members) -> ModelGroup:
+    monkeypatch.setitem(resource_manager.models, "llm", members)
+    return ModelGroup(name="group", models=list(members), hedge_delay=0.05)
+
+
+def test_hedge_to_secondary(monkeypatch):
+    group = _group(
+        monkeypatch,
+        slow=DelayedChatModel(reply="slow", delay=1),
+        fast=DelayedChatModel(reply="fast", delay=0.01),
+    )
+    start = time.perf_counter()
+    assert asyncio.run(group.ainvoke("hi")).content == "fast"
+    assert time.perf_counter() - start < 0.5
+
+
+def test_fallback_on_error(monkeypatch):
+    group = _group(
+        monkeypatch,
+        broken=DelayedChatModel(reply="broken", fail=True),
+        backup=DelayedChatModel(reply="backup"),
+    )
+    assert asyncio.run(group.ainvoke("hi")).content == "backup"
+
+
+def test_loser_exception_is_retrieved(monkeypatch):
+    group = _group(
+        monkeypatch, a=DelayedChatModel(reply="a"), b=DelayedChatModel(reply="b")
+    )
+    errors = []
+
+    async def run():
+        asyncio.get_running_loop().set_exception_handler(
+            lambda loop, context: errors.append(context["message"])
+        )
+        released = asyncio.Event()
+
+        # 对冲请求返回的同时首个请求失败，两者在同一轮等待中结束
+        async def call(name: str, model: BaseChatModel):
+            if name == "a":
+                await released.wait()
+                raise RuntimeError("a failed")
+            released.set()
+            return name
+
+        for _ in range(20):
+            released.clear()
+            assert await group._race(group._members(), call, "generate") == "b"
+        await asyncio.sleep(0)
+        gc.collect()
+
+    asyncio.run(run())
+    assert errors == []
+
+
+def test_group_limits_are_enforced(monkeypatch):
+    monkeypatch.setitem(
+        resource_manager.models, "llm", {"a": DelayedChatModel(reply="a", delay=0.1)}
+    )
+    model = Model(
+        name="group",
+        type="llm",
+        channel="group",
+        model_args=json.dumps({"models": ["a"], "limits": {"max_concurrency": 1}}),
+    )
+    group = resource_manager.init_model(model)
+    assert isinstance(group, ModelGroup)
+
+    async def run():
+        return await asyncio.gather(group.ainvoke("hi"), group.ainvoke("hi"))
+
+    start = time.perf_counter()
+    assert [m.content for m in asyncio.run(run())] == ["a", "a"]
+    # 组的并发上限为1，两次调用依次执行
+    assert time.perf_counter() - start >= 0.2
@@ -0,0 +1,63 @@
+import time
+
+from langchain_core.language_models import FakeListChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration
+
+import lang_agent.db  # noqa: F401  先加载db，避免setting.manager的循环导入
+from lang_agent.setting.manager import resource_manager
+from lang_agent.setting.model_group import ModelGroup
+from lang_agent.setting.response_cache import CACHED_FLAG, ResponseCache, without_cache
+
+
+def generation(text: str) -> list[ChatGeneration]:
+    return [ChatGeneration(message=AIMessage(content=text))]
+
+
+def test_lookup_update_ttl(tmp_path):
+    cache = ResponseCache(str(tmp_path / "cache.db"), ttl=0.05)
+    assert cache.lookup("prompt", "llm") is None
+    cache.update("prompt", "llm", generation("answer"))
+    cached = cache.lookup("prompt", "llm")
+    assert cached[0].message.content == "answer"
+    assert cache.lookup("prompt", "other-llm") is None
+    time.sleep(0.1)
+    assert cache.lookup("prompt", "llm") is None
+    assert cache.stats()["hits"] == 1
+    cache.close()
+
+
+def test_lru_eviction(tmp_path):
+    cache = ResponseCache(str(tmp_path / "cache.db"), max_entries=2)
+    cache.update("a", "llm", generation("a"))
+    cache.update("b", "llm", generation("b"))
+    time.sleep(0.01)
+    assert cache.lookup("a", "llm") is not None
+    cache.update("c", "llm", generation("c"))
+    assert cache.lookup("b", "llm") is None
+    assert cache.lookup("a", "llm") is not None
+    assert cache.stats()["entries"] == 2
+    cache.close()
+
+
+def test_model_uses_cache(tmp_path):
+    cache = ResponseCache(str(tmp_path / "cache.db"))
+    model = FakeListChatModel(responses=["first", "second"], cache=cache)
+    assert model.invoke("hi").content == "first"
+    message = model.invoke("hi")
+    assert message.content == "first"
+    assert message.response_metadata[CACHED_FLAG]
+    assert without_cache(model).invoke("hi").content == "second"
+    cache.close()
+
+
+def test_group_members_skip_cache(tmp_path, monkeypatch):
+    cache = ResponseCache(str(tmp_path / "cache.db"))
+    member = FakeListChatModel(responses=["first", "second"], cache=cache)
+    monkeypatch.setitem(resource_manager.models, "llm", {"member": member})
+    group = ModelGroup(name="group", models=["member"])
+    assert group.invoke("hi").content == "first"
+    assert group.invoke("hi").content == "first"
+    # 关闭缓存的节点经路由组调用时，成员模型也不读取缓存
+    assert without_cache(group).invoke("hi").content == "second"
+    cache.close()
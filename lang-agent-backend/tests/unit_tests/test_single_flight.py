@@ -0,0 +1,76 @@
+import asyncio
+from typing import Any, AsyncIterator
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+from lang_agent.setting.single_flight import SingleFlight, SingleFlightChatModel
+
+
+class SlowChatModel(BaseChatModel):
+    calls: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "slow"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs: Any):
+        raise NotImplementedError
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs: Any):
+        self.calls += 1
+        await asyncio.sleep(0.05)
+        message = AIMessage(content=f"echo {messages[-1].content}")
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _astream(
+        self, messages, stop=None, run_manager=None, **kwargs: Any
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        self.calls += 1
+        for token in ("a", "b", "c"):
+            await asyncio.sleep(0.01)
+            yield ChatGenerationChunk(message=AIMessageChunk(content=token))
+
+
+def test_concurrent_identical_calls_share_request():
+    model = type("SlowChatModel", (SingleFlightChatModel, SlowChatModel), {})()
+
+    async def run():
+        results = await asyncio.gather(
+            *(model.ainvoke("hi") for _ in range(5)), model.ainvoke("bye")
+        )
+        assert [r.content for r in results] == ["echo hi"] * 5 + ["echo bye"]
+        assert len({r.id for r in results}) == 6
+
+        async def collect():
+            return "".join([chunk.content async for chunk in model.astream("hi")])
+
+        assert await asyncio.gather(*(collect() for _ in range(3))) == ["abc"] * 3
+
+    asyncio.run(run())
+    assert model.calls == 3
+
+
+def test_cancel_all_waiters_cancels_upstream():
+    flights = SingleFlight()
+
+    async def run():
+        started, stopped = asyncio.Event(), asyncio.Event()
+
+        async def upstream():
+            started.set()
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                stopped.set()
+                raise
+
+        waiters = [asyncio.create_task(flights.call("k", upstream)) for _ in range(2)]
+        await started.wait()
+        for waiter in waiters:
+            waiter.cancel()
+        await asyncio.wait_for(stopped.wait(), 1)
+        assert flights._flights == {}
+
+    asyncio.run(run())
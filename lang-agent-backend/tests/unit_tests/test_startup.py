@@ -0,0 +1,51 @@
+import asyncio
+
+import pytest
+
+import lang_agent.db  # noqa: F401  先加载db，避免setting.manager的循环导入
+from lang_agent.db import database
+from lang_agent.setting.manager import ResourceManager
+from lang_agent.setting.startup import ResourceStartup
+
+
+def test_concurrent_init_with_timeout():
+    startup = ResourceStartup(timeout=0.2)
+
+    async def ok():
+        await asyncio.sleep(0.1)
+        return "ok"
+
+    async def slow():
+        await asyncio.sleep(5)
+
+    async def broken():
+        raise RuntimeError("unreachable")
+
+    async def run():
+        return await asyncio.gather(
+            startup.run("mcp", "a", ok),
+            startup.run("mcp", "b", slow),
+            startup.run("vectorstore", "c", broken),
+        )
+
+    assert asyncio.run(run()) == ["ok", None, None]
+    states = {s["name"]: (s["state"], s["error"]) for s in startup.report()}
+    assert states == {
+        "a": ("ready", None),
+        "b": ("timeout", "Timeout After 0.2s"),
+        "c": ("failed", "RuntimeError: unreachable"),
+    }
+    # 并发执行，总耗时约为超时时间
+    assert all(s["seconds"] < 0.5 for s in startup.report())
+
+
+def test_init_failure_finishes_startup(monkeypatch):
+    def broken():
+        raise RuntimeError("no such table: mcp")
+
+    monkeypatch.setattr(database, "list_available_mcps", broken)
+    manager = ResourceManager()
+    with pytest.raises(RuntimeError):
+        asyncio.run(manager.init_resources())
+    # 初始化中途出错时就绪检查不再一直等待
+    assert manager.startup.ready
@@ -0,0 +1,20 @@
+from typing import get_type_hints
+
+import lang_agent.db  # noqa: F401  先加载db，避免setting.manager的循环导入
+from lang_agent.graph.state import build_state_class
+
+
+def test_build_state_class_is_memoized():
+    a = build_state_class({"messages": "list", "loop_count": "int"})
+    b = build_state_class({"loop_count": "int", "messages": "list"})
+    assert a is b
+
+
+def test_build_state_class_isolates_schemas():
+    a = build_state_class({"messages": "list", "loop_count": "int"})
+    b = build_state_class({"messages": "list", "retrieve_flag": "bool"})
+    hints_a = get_type_hints(a)
+    hints_b = get_type_hints(b)
+    assert set(hints_a) == {"messages", "loop_count"}
+    assert set(hints_b) == {"messages", "retrieve_flag"}
+    assert hints_b["retrieve_flag"] is bool
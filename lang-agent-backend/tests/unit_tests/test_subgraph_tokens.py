@@ -0,0 +1,57 @@
+import asyncio
+import json
+from pathlib import Path
+
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+import lang_agent.db  # noqa: F401  先加载db，避免setting.manager的循环导入
+from lang_agent.graph.engine import GraphEngine
+from lang_agent.setting.checkpointer import async_checkpointer_shutdown
+from lang_agent.setting.graph_cache import subgraph_cache
+from lang_agent.setting.manager import resource_manager
+
+EXAMPLES_DIR = Path(__file__).resolve().parents[3] / "examples"
+
+
+def reuse_flow(agent: dict) -> dict:
+    return {
+        "state_schema": {"messages": "list"},
+        "nodes": [
+            {"id": "s", "type": "start", "data": {"name": "start"}},
+            {
+                "id": "r",
+                "type": "reuse_agent",
+                "data": {"name": agent["name"], "data": agent["data"]},
+            },
+            {"id": "e", "type": "end", "data": {"name": "end"}},
+        ],
+        "edges": [
+            {"source": "s", "target": "r", "type": "default",
+             "source_name": "start", "target_name": agent["name"]},
+            {"source": "r", "target": "e", "type": "default",
+             "source_name": agent["name"], "target_name": "end"},
+        ],
+    }
+
+
+def test_reused_agent_token_nodes_survive_cache():
+    agent = json.loads((EXAMPLES_DIR / "poet1.json").read_text(encoding="utf-8"))
+    resource_manager.models["llm"]["qwen2.5"] = FakeListChatModel(responses=["荷"])
+    subgraph_cache.clear()
+
+    async def token_nodes() -> set[str]:
+        engine = GraphEngine(agent_data=reuse_flow(agent), agent_name="outer")
+        await engine.compile()
+        return engine._get_token_nodes()
+
+    async def run():
+        try:
+            cold = await token_nodes()
+            assert {"title_generator", "poet"} <= cold
+            # 命中子图缓存时仍能取得子Agent的token节点
+            assert await token_nodes() == cold
+            assert subgraph_cache.stats()["hits"] >= 1
+        finally:
+            await async_checkpointer_shutdown()
+
+    asyncio.run(run())
@@ -0,0 +1,41 @@
+import asyncio
+
+import pytest
+from langchain_core.tools import StructuredTool, ToolException
+
+from lang_agent.setting.tool_limiter import ToolLimiter, ToolLimits
+
+
+def test_concurrency_cap_and_timeout():
+    active, peak = 0, 0
+
+    async def work(seconds: float) -> str:
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(seconds)
+        active -= 1
+        return "done"
+
+    limiter = ToolLimiter(
+        "mcp", ToolLimits(max_concurrency=2, timeout=1, tool_timeouts={"slow": 0.05})
+    )
+    fast = limiter.wrap(
+        StructuredTool.from_function(coroutine=work, name="fast", description="fast")
+    )
+    slow = limiter.wrap(
+        StructuredTool.from_function(coroutine=work, name="slow", description="slow")
+    )
+
+    async def run():
+        results = await asyncio.gather(
+            *(fast.ainvoke({"seconds": 0.02}) for _ in range(5))
+        )
+        assert results == ["done"] * 5
+        assert peak == 2
+        with pytest.raises(ToolException):
+            await slow.ainvoke({"seconds": 0.5})
+        # 超时后额度已释放
+        assert await fast.ainvoke({"seconds": 0}) == "done"
+
+    asyncio.run(run())
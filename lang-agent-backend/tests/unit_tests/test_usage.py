@@ -0,0 +1,42 @@
+import asyncio
+
+import pytest
+
+import lang_agent.db  # noqa: F401  先加载db，避免setting.manager的循环导入
+from lang_agent.db import database
+from lang_agent.graph.usage import UsageRecorder
+
+
+def test_record_aggregates_by_key():
+    recorder = UsageRecorder(interval=0)
+    recorder.record("t1", "poet", "llm", "qwen", 0.5, input_tokens=10, output_tokens=5)
+    recorder.record("t1", "poet", "llm", "qwen", 0.25, input_tokens=4, output_tokens=1)
+    recorder.record("t1", "poet", "llm", "qwen", 0.01, cached=True)
+    recorder.record("t2", "poet", "llm", "qwen", 1.0, error=True)
+    rows = sorted(recorder.drain(), key=lambda r: r["thread_id"])
+    assert [r["thread_id"] for r in rows] == ["t1", "t2"]
+    assert rows[0]["calls"] == 3 and rows[0]["cached_calls"] == 1
+    assert rows[0]["input_tokens"] == 14 and rows[0]["output_tokens"] == 6
+    assert rows[1]["errors"] == 1
+    assert recorder.drain() == []
+
+
+def test_failed_flush_requeues_rows(monkeypatch):
+    def fail(rows):
+        raise RuntimeError("database is locked")
+
+    monkeypatch.setattr(database, "save_model_usage", fail)
+    recorder = UsageRecorder(interval=0, max_pending=2)
+    recorder.record("t1", "poet", "llm", "qwen", 0.5, input_tokens=10)
+    with pytest.raises(RuntimeError):
+        asyncio.run(recorder.flush())
+    # 失败的记录放回内存，与新记录合并
+    recorder.record("t1", "poet", "llm", "qwen", 0.5, input_tokens=5)
+    [entry] = recorder._pending.values()
+    assert entry["calls"] == 2 and entry["input_tokens"] == 15
+    # 超出max_pending时丢弃最早的记录
+    recorder.record("t2", "poet", "llm", "qwen", 0.5)
+    recorder.record("t3", "poet", "llm", "qwen", 0.5)
+    with pytest.raises(RuntimeError):
+        asyncio.run(recorder.flush())
+    assert sorted(r["thread_id"] for r in recorder.drain()) == ["t2", "t3"]
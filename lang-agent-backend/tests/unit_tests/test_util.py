@@ -1,10 +1,16 @@
-from langchain_core.messages import HumanMessage
+import asyncio
+import gc
+import weakref
+
+from langchain_core.messages import AIMessage, HumanMessage
 
 from lang_agent.util import (
     async_run,
+    compile_template,
     complete_content,
     convert_str_to_type,
     error_to_str,
+    message_index,
     parse_args,
     parse_json,
     parse_type,
@@ -51,6 +57,44 @@ def test_complete_content():
     assert result == "Hello Alice, you have 5 messages."
 
 
+def test_message_placeholders():
+    state = {
+        "messages": [
+            AIMessage(content="old", name="llm"),
+            HumanMessage(content="hi", name="user"),
+            AIMessage(content="new", name="llm"),
+        ],
+    }
+    content = "{{messages['llm']}} / {{messages['user']}} / {{messages['none']}}"
+    assert complete_content(content, state) == "new / hi / {{messages['none']}}"
+    assert parse_args(content, state) == {
+        "messages['llm']": "new",
+        "messages['user']": "hi",
+    }
+    assert compile_template(content) is compile_template(content)
+
+
+class Messages(list):
+    pass
+
+
+def test_message_index_follows_appends():
+    async def run():
+        messages = Messages([AIMessage(content="a", name="llm")])
+        index = message_index({"messages": messages})
+        assert index.get("llm").content == "a"
+        messages.append(AIMessage(content="b", name="llm"))
+        assert message_index({"messages": messages}) is index
+        assert index.get("llm").content == "b"
+        assert index.get("missing") is None
+        return weakref.ref(messages)
+
+    messages_ref = asyncio.run(run())
+    gc.collect()
+    # 任务结束后不再持有消息列表
+    assert messages_ref() is None
+
+
 def test_sync_wrapper():
     @sync_wrapper
     async def dummy_coro():
@@ -0,0 +1,40 @@
+import asyncio
+
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+import lang_agent.db  # noqa: F401  先加载db，避免setting.manager的循环导入
+from lang_agent.node.core import VLMNode
+from lang_agent.setting.manager import resource_manager
+
+
+class RecordingModel(FakeListChatModel):
+    inputs: list = []
+
+    async def ainvoke(self, input, config=None, **kwargs):
+        self.inputs.append(input)
+        return await super().ainvoke(input, config, **kwargs)
+
+
+def test_prompts_are_sent_verbatim():
+    model = RecordingModel(responses=["图中有一只猫"])
+    resource_manager.models["vlm"]["vl"] = model
+    node = VLMNode(
+        {
+            "id": "v",
+            "type": "vlm",
+            "data": {
+                "name": "v",
+                "model": "vl",
+                "system_prompt": "只回答<b>图片</b>内容 & {{不是变量}}",
+                "user_prompt": "描述\"这张\"图片",
+                "image_url": "{{url}}",
+            },
+        }
+    )
+    url = "https://example.com/a.png?x=1&y=2"
+    result = asyncio.run(node.ainvoke({"messages": [], "url": url}))
+    system, human = model.inputs[0]
+    assert system.content == "只回答<b>图片</b>内容 & {{不是变量}}"
+    assert human.content[0]["text"] == "描述\"这张\"图片"
+    assert human.content[1]["image_url"]["url"] == url
+    assert result["messages"][0].content == "图中有一只猫"
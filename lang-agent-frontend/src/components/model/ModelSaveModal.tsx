@@ -24,7 +24,10 @@ const types = [
   { id: "vlm", name: "vlm" },
 ];
 
-const channels = [{ id: "openai", name: "openai" }];
+const channels = [
+  { id: "openai", name: "openai" },
+  { id: "group", name: "group" },
+];
 
 type ModalProps = {
   id: string | undefined;